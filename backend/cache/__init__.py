@@ -0,0 +1,26 @@
+from .backends import (
+    CacheBackend,
+    MemoryBackend,
+    RedisBackend,
+    SQLiteBackend,
+    create_backend,
+    get_shared_backend,
+    set_shared_backend,
+)
+from .lru import TTLCache, cache_stats
+from .singleflight import SingleFlight
+from .swr import StaleWhileRevalidateCache
+
+__all__ = [
+    "CacheBackend",
+    "MemoryBackend",
+    "RedisBackend",
+    "SQLiteBackend",
+    "SingleFlight",
+    "StaleWhileRevalidateCache",
+    "TTLCache",
+    "cache_stats",
+    "create_backend",
+    "get_shared_backend",
+    "set_shared_backend",
+]
@@ -0,0 +1,342 @@
+"""
+backends.py
+
+Shared cache backends.
+
+Every uvicorn worker keeps its own in-memory TTLCache. A shared backend
+adds a second tier visible to all workers, so one refresh (KTC scrape,
+rosters fetch, ...) serves every process:
+
+- "memory": no shared tier (default, single worker)
+- "sqlite": a local SQLite file in DATA_DIR, for several workers on one box
+- "redis":  any Redis-protocol server (Redis, Valkey, KeyDB, ...),
+            requires the optional `redis` package
+
+Select with SLEEPER_CACHE_BACKEND and, for redis, SLEEPER_CACHE_URL.
+
+Values are pickled. Only this app writes to the backend, so it must
+not be shared with untrusted writers.
+"""
+
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+from backend.storage import data_path
+
+
+logger = logging.getLogger(__name__)
+
+
+CACHE_BACKEND = os.environ.get("SLEEPER_CACHE_BACKEND", "memory")
+CACHE_URL = os.environ.get("SLEEPER_CACHE_URL")
+
+SQLITE_CACHE_FILE = "cache.sqlite3"
+
+# Expired SQLite entries are pruned once every this many writes
+SQLITE_PRUNE_INTERVAL = 200
+
+
+class CacheBackend:
+    """
+    Interface of a shared cache tier.
+
+    Entries carry the time their value was produced (`stored_at`), so
+    workers can tell whether the shared copy is newer than their own.
+    """
+
+    def get(self, key: str, newer_than: float = 0):
+        """
+        Return (value, stored_at) if an unexpired entry newer than
+        `newer_than` exists, otherwise None.
+        """
+        raise NotImplementedError
+
+
+    def set(self, key: str, value, stored_at: float, expire: float):
+        """
+        Store a value for `expire` seconds.
+        """
+        raise NotImplementedError
+
+
+    def delete(self, key: str):
+        raise NotImplementedError
+
+
+    def acquire(self, key: str, ttl: float) -> bool:
+        """
+        Try to take a cross-worker lock; it expires after `ttl` seconds.
+        """
+        raise NotImplementedError
+
+
+    def release(self, key: str):
+        raise NotImplementedError
+
+
+class MemoryBackend(CacheBackend):
+    """
+    In-process stand-in with the same semantics as the shared backends.
+
+    Values are pickled like the real backends, so callers never share
+    mutable objects through it. Useful for single-process setups and tests.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+
+
+    def get(self, key, newer_than=0):
+        with self._lock:
+            entry = self._entries.get(key)
+
+        if entry is None:
+            return None
+
+        blob, stored_at, expires_at = entry
+        if expires_at <= time.time() or stored_at <= newer_than:
+            return None
+
+        return pickle.loads(blob), stored_at
+
+
+    def set(self, key, value, stored_at, expire):
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+        with self._lock:
+            self._entries[key] = (blob, stored_at, time.time() + expire)
+
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+    def acquire(self, key, ttl):
+        now = time.time()
+
+        with self._lock:
+            if self._locks.get(key, 0) > now:
+                return False
+
+            self._locks[key] = now + ttl
+            return True
+
+
+    def release(self, key):
+        with self._lock:
+            self._locks.pop(key, None)
+
+
+class SQLiteBackend(CacheBackend):
+    """
+    Shared cache in a local SQLite file (WAL mode, one connection per thread).
+    """
+
+    def __init__(self, path: str | None = None):
+        self.path = path or data_path(SQLITE_CACHE_FILE)
+        self._local = threading.local()
+
+        # Writes since the last prune of expired entries
+        self._writes = 0
+        self._writes_lock = threading.Lock()
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                " key TEXT PRIMARY KEY,"
+                " value BLOB NOT NULL,"
+                " stored_at REAL NOT NULL,"
+                " expires_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS cache_expires ON cache (expires_at)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS locks ("
+                " key TEXT PRIMARY KEY,"
+                " expires_at REAL NOT NULL)"
+            )
+
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            self._local.conn = conn
+
+        return conn
+
+
+    def get(self, key, newer_than=0):
+        row = self._connect().execute(
+            "SELECT value, stored_at FROM cache"
+            " WHERE key = ? AND expires_at > ? AND stored_at > ?",
+            (key, time.time(), newer_than)
+        ).fetchone()
+
+        if row is None:
+            return None
+
+        return pickle.loads(row[0]), row[1]
+
+
+    def set(self, key, value, stored_at, expire):
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        now = time.time()
+
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, stored_at, expires_at)"
+                " VALUES (?, ?, ?, ?)",
+                (key, blob, stored_at, now + expire)
+            )
+
+            # Drop expired entries now and then so the file does not grow forever
+            if self._should_prune():
+                conn.execute("DELETE FROM cache WHERE expires_at <= ?", (now,))
+
+
+    def _should_prune(self) -> bool:
+        with self._writes_lock:
+            self._writes += 1
+            if self._writes < SQLITE_PRUNE_INTERVAL:
+                return False
+
+            self._writes = 0
+            return True
+
+
+    def delete(self, key):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+
+    def acquire(self, key, ttl):
+        now = time.time()
+
+        with self._connect() as conn:
+            conn.execute(
+                "DELETE FROM locks WHERE key = ? AND expires_at <= ?",
+                (key, now)
+            )
+            cur = conn.execute(
+                "INSERT OR IGNORE INTO locks (key, expires_at) VALUES (?, ?)",
+                (key, now + ttl)
+            )
+
+        return cur.rowcount == 1
+
+
+    def release(self, key):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM locks WHERE key = ?", (key,))
+
+
+class RedisBackend(CacheBackend):
+    """
+    Shared cache on any Redis-protocol server.
+
+    Each entry is a hash with `stored_at` and the pickled `value`,
+    so freshness can be checked without transferring the value.
+    """
+
+    def __init__(self, url: str | None = None):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("RedisBackend requires the 'redis' package") from e
+
+        self._redis = redis.Redis.from_url(url or "redis://localhost:6379/0")
+
+
+    def get(self, key, newer_than=0):
+        stored_at = self._redis.hget(key, "stored_at")
+        if stored_at is None or float(stored_at) <= newer_than:
+            return None
+
+        blob = self._redis.hget(key, "value")
+        if blob is None:
+            return None
+
+        return pickle.loads(blob), float(stored_at)
+
+
+    def set(self, key, value, stored_at, expire):
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+        pipe = self._redis.pipeline()
+        pipe.hset(key, mapping={"stored_at": repr(stored_at), "value": blob})
+        pipe.expire(key, max(1, int(expire)))
+        pipe.execute()
+
+
+    def delete(self, key):
+        self._redis.delete(key)
+
+
+    def acquire(self, key, ttl):
+        return bool(self._redis.set(f"lock:{key}", b"1", nx=True, ex=max(1, int(ttl))))
+
+
+    def release(self, key):
+        self._redis.delete(f"lock:{key}")
+
+
+def create_backend(kind: str | None = None, url: str | None = None) -> CacheBackend | None:
+    """
+    Build the configured shared backend, or None for in-process caching only.
+    """
+    kind = (kind or CACHE_BACKEND).lower()
+
+    if kind == "memory":
+        return None
+
+    if kind == "sqlite":
+        return SQLiteBackend(url)
+
+    if kind == "redis":
+        return RedisBackend(url or CACHE_URL)
+
+    raise ValueError(f"Unknown cache backend: {kind}")
+
+
+# Process-wide shared backend, created on first use
+_SHARED_BACKEND = None
+_SHARED_BACKEND_LOCK = threading.Lock()
+
+
+def get_shared_backend() -> CacheBackend | None:
+    """
+    Return the process-wide shared backend, creating it on first use.
+
+    A backend that cannot be created (unknown SLEEPER_CACHE_BACKEND,
+    missing redis package, unwritable file) is logged once and the
+    process falls back to per-worker caching.
+    """
+    global _SHARED_BACKEND
+
+    with _SHARED_BACKEND_LOCK:
+        if _SHARED_BACKEND is None:
+            try:
+                _SHARED_BACKEND = create_backend() or False
+            except Exception:
+                logger.exception("Could not create the shared cache backend, caching per worker only")
+                _SHARED_BACKEND = False
+
+    return _SHARED_BACKEND or None
+
+
+def set_shared_backend(backend: CacheBackend | None):
+    """
+    Replace the process-wide shared backend (e.g. with a MemoryBackend in tests).
+    """
+    global _SHARED_BACKEND
+
+    with _SHARED_BACKEND_LOCK:
+        _SHARED_BACKEND = backend or False
@@ -0,0 +1,152 @@
+"""
+lru.py
+
+Bounded in-memory cache with per-entry TTL and LRU eviction.
+
+Every cache in the app is built on TTLCache so memory stays bounded
+as more users and leagues come through, and all of them report
+hit/miss/eviction counters through cache_stats().
+"""
+
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+
+# name -> TTLCache, for cache_stats()
+_REGISTRY = weakref.WeakValueDictionary()
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries carry their own TTL.
+
+    Expired entries are not removed on read: `lookup` still returns
+    them (flagged as not fresh) so stale-while-revalidate callers can
+    serve them. `get` treats them as misses. Memory is bounded by
+    `maxsize`; the least recently used entry is evicted first.
+    """
+
+    def __init__(self, name: str, maxsize: int, ttl: float):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+
+        # key -> (value, stored_at, ttl), least recently used first
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        _REGISTRY[name] = self
+
+
+    def lookup(self, key):
+        """
+        Return (value, stored_at, fresh) and mark the key as recently used.
+
+        Returns (None, 0, False) when the key is absent.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None:
+                self.misses += 1
+                return None, 0, False
+
+            self._entries.move_to_end(key)
+            value, stored_at, ttl = entry
+            fresh = (time.time() - stored_at) < ttl
+
+            if fresh:
+                self.hits += 1
+            else:
+                self.stale_hits += 1
+
+            return value, stored_at, fresh
+
+
+    def peek(self, key):
+        """
+        Return (value, stored_at) without touching LRU order or counters.
+        """
+        with self._lock:
+            value, stored_at, _ = self._entries.get(key, (None, 0, 0))
+            return value, stored_at
+
+
+    def is_fresh(self, key) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and (time.time() - entry[1]) < entry[2]
+
+
+    def get(self, key, default=None):
+        """
+        Return the value if present and fresh, otherwise `default`.
+        """
+        value, _, fresh = self.lookup(key)
+        return value if fresh else default
+
+
+    def set(self, key, value, ttl: float | None = None, stored_at: float | None = None):
+        """
+        Store a value, evicting least recently used entries past maxsize.
+        """
+        entry = (
+            value,
+            time.time() if stored_at is None else stored_at,
+            self.ttl if ttl is None else ttl,
+        )
+
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+    def __len__(self):
+        return len(self._entries)
+
+
+    def __contains__(self, key):
+        return key in self._entries
+
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+def cache_stats() -> dict[str, dict]:
+    """
+    Counters for every live cache, keyed by cache name.
+    """
+    return {name: cache.stats() for name, cache in sorted(_REGISTRY.items())}
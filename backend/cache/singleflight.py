@@ -0,0 +1,90 @@
+"""
+singleflight.py
+
+Keyed request coalescing.
+
+When many callers miss the same key at once, only the first (the
+leader) runs the fetch; everyone else waits for and shares its result
+or exception. Works for thread-pool callers (`do`) and asyncio callers
+(`ado`), including a mix of both on the same key.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that share a key into one execution.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+        # key -> Future of the call currently in flight
+        self._calls = {}
+
+
+    def _join(self, key) -> tuple[Future, bool]:
+        # Returns the in-flight future for key and whether we lead it
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                return future, False
+
+            future = Future()
+            self._calls[key] = future
+            return future, True
+
+
+    def _finish(self, key, future: Future, value=None, error=None):
+        with self._lock:
+            self._calls.pop(key, None)
+
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(value)
+
+
+    def in_flight(self, key) -> bool:
+        with self._lock:
+            return key in self._calls
+
+
+    def do(self, key, fn):
+        """
+        Run `fn()` once for all concurrent callers with the same key.
+        """
+        future, leader = self._join(key)
+        if not leader:
+            return future.result()
+
+        try:
+            value = fn()
+        except BaseException as error:
+            self._finish(key, future, error=error)
+            raise
+
+        self._finish(key, future, value=value)
+        return value
+
+
+    async def ado(self, key, fn):
+        """
+        Async variant of `do`; `fn` is a coroutine function.
+        """
+        future, leader = self._join(key)
+        if not leader:
+            return await asyncio.wrap_future(future)
+
+        try:
+            value = await fn()
+        except BaseException as error:
+            # Also covers cancellation, so waiters never hang
+            self._finish(key, future, error=error)
+            raise
+
+        self._finish(key, future, value=value)
+        return value
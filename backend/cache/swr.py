@@ -0,0 +1,362 @@
+"""
+swr.py
+
+Stale-while-revalidate cache.
+
+Once an entry's TTL expires, callers keep receiving the stale value
+immediately while exactly one background refresh per key replaces it.
+Only a cold (never loaded) key makes the caller wait for the loader,
+and concurrent cold callers share a single load (see singleflight.py).
+Entries live in a bounded TTLCache (see lru.py), so stale values are
+kept until the LRU bound evicts them.
+
+With a shared backend configured (see backends.py) every value is also
+written there. Workers adopt newer shared values instead of fetching,
+and a cross-worker lock lets a single worker refresh a key while the
+others wait for its result.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+
+from backend.cache.backends import CacheBackend, get_shared_backend
+from backend.cache.lru import TTLCache
+from backend.cache.singleflight import SingleFlight
+
+
+logger = logging.getLogger(__name__)
+
+# Shared entries outlive the TTL so other workers can still serve them stale
+SHARED_STALE_FACTOR = 2
+
+# Cross-worker refresh lock expiry, in case the holder dies mid-fetch
+SHARED_LOCK_TTL = 120
+
+# How long a worker waits for another worker's fetch before fetching itself
+SHARED_WAIT = 30
+SHARED_POLL_INTERVAL = 0.25
+
+
+class StaleWhileRevalidateCache:
+    """
+    Keyed, size-bounded cache with background refresh.
+
+    Loaders are zero-argument callables: plain functions for `get`,
+    coroutine functions for `aget`. Both APIs share the same entries,
+    so sync and async clients see one copy of each value.
+
+    `shared=False` keeps the cache local to the process even when a
+    shared backend is configured; `backend` overrides the backend.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        ttl: float,
+        maxsize: int = 1024,
+        shared: bool = True,
+        backend: CacheBackend | None = None
+    ):
+        self.name = name
+        self.ttl = ttl
+        self.shared = shared
+
+        # Bounded LRU storage with per-entry TTL and counters
+        self._store = TTLCache(name, maxsize=maxsize, ttl=ttl)
+        self._backend = backend
+
+        # Keys with a background refresh in progress
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+        # Coalesces concurrent cold loads of the same key
+        self._flight = SingleFlight()
+
+        # Strong references so refresh tasks are not garbage collected
+        self._tasks = set()
+
+
+    @property
+    def backend(self) -> CacheBackend | None:
+        if self._backend is not None:
+            return self._backend
+
+        return get_shared_backend() if self.shared else None
+
+
+    def peek(self, key):
+        """
+        Return (value, stored_at) for a key, or (None, 0) if it is not cached.
+        """
+        return self._store.peek(key)
+
+
+    def is_fresh(self, key) -> bool:
+        return self._store.is_fresh(key)
+
+
+    def set(self, key, value, ttl: float | None = None, stored_at: float | None = None):
+        """
+        Store a value. `ttl` overrides the cache TTL for this entry;
+        `stored_at` lets callers seed an older copy (e.g. one read
+        from disk) that is already partly expired.
+
+        Fresh values are also written to the shared backend.
+        """
+        self._store.set(key, value, ttl=ttl, stored_at=stored_at)
+
+        backend = self.backend
+        if backend is None or stored_at is not None:
+            return
+
+        _, stored_at = self._store.peek(key)
+        expire = (self.ttl if ttl is None else ttl) * SHARED_STALE_FACTOR
+
+        self._shared_call(backend.set, self._shared_key(key), value, stored_at, expire)
+
+
+    def delete(self, key):
+        self._store.delete(key)
+
+        backend = self.backend
+        if backend is not None:
+            self._shared_call(backend.delete, self._shared_key(key))
+
+
+    def stats(self) -> dict:
+        return self._store.stats()
+
+
+    def get(self, key, loader):
+        """
+        Return the cached value, loading it inline only on a cold key.
+        """
+        value, stored_at, fresh = self._store.lookup(key)
+        if fresh:
+            return value
+
+        # Another worker may already have refreshed it
+        shared = self._shared_get(key, stored_at)
+        if shared is not None:
+            value, stored_at = shared
+            if self._is_fresh_time(stored_at):
+                return value
+
+        if stored_at == 0:
+            return self._flight.do(key, lambda: self._load(key, loader))
+
+        self.refresh_in_background(key, loader)
+
+        return value
+
+
+    async def aget(self, key, loader):
+        """
+        Async variant of `get`; `loader` is a coroutine function.
+        """
+        value, stored_at, fresh = self._store.lookup(key)
+        if fresh:
+            return value
+
+        if self.backend is not None:
+            shared = await asyncio.to_thread(self._shared_get, key, stored_at)
+            if shared is not None:
+                value, stored_at = shared
+                if self._is_fresh_time(stored_at):
+                    return value
+
+        if stored_at == 0:
+            return await self._flight.ado(key, lambda: self._aload(key, loader))
+
+        self.refresh_in_background_async(key, loader)
+
+        return value
+
+
+    def _load(self, key, loader):
+        # A flight that finished just before we joined already stored it
+        value, stored_at = self.peek(key)
+        if stored_at:
+            return value
+
+        return self._fetch(key, loader)
+
+
+    async def _aload(self, key, loader):
+        value, stored_at = self.peek(key)
+        if stored_at:
+            return value
+
+        return await self._afetch(key, loader)
+
+
+    def _fetch(self, key, loader):
+        """
+        Run the loader, or wait for the worker that holds the shared lock.
+        """
+        backend = self.backend
+        if backend is None:
+            value = loader()
+            self.set(key, value)
+            return value
+
+        _, stored_at = self.peek(key)
+        lock_key = self._shared_key(key)
+
+        if not self._shared_call(backend.acquire, lock_key, SHARED_LOCK_TTL, default=True):
+            shared = self._wait_for_shared(key, stored_at)
+            if shared is not None:
+                return shared[0]
+
+            # The other worker is too slow or died; fetch ourselves
+            value = loader()
+            self.set(key, value)
+            return value
+
+        try:
+            value = loader()
+            self.set(key, value)
+            return value
+        finally:
+            self._shared_call(backend.release, lock_key)
+
+
+    async def _afetch(self, key, loader):
+        backend = self.backend
+        if backend is None:
+            value = await loader()
+            self.set(key, value)
+            return value
+
+        _, stored_at = self.peek(key)
+        lock_key = self._shared_key(key)
+
+        acquired = await asyncio.to_thread(
+            self._shared_call, backend.acquire, lock_key, SHARED_LOCK_TTL, default=True
+        )
+
+        if not acquired:
+            deadline = time.time() + SHARED_WAIT
+            while time.time() < deadline:
+                shared = await asyncio.to_thread(self._shared_get, key, stored_at)
+                if shared is not None:
+                    return shared[0]
+
+                await asyncio.sleep(SHARED_POLL_INTERVAL)
+
+            value = await loader()
+            await asyncio.to_thread(self.set, key, value)
+            return value
+
+        try:
+            value = await loader()
+            await asyncio.to_thread(self.set, key, value)
+            return value
+        finally:
+            await asyncio.to_thread(self._shared_call, backend.release, lock_key)
+
+
+    def _wait_for_shared(self, key, stored_at: float):
+        deadline = time.time() + SHARED_WAIT
+
+        while time.time() < deadline:
+            shared = self._shared_get(key, stored_at)
+            if shared is not None:
+                return shared
+
+            time.sleep(SHARED_POLL_INTERVAL)
+
+        return None
+
+
+    def _shared_get(self, key, stored_at: float):
+        """
+        Adopt the shared value if it is newer than ours.
+
+        Returns (value, stored_at) or None.
+        """
+        backend = self.backend
+        if backend is None:
+            return None
+
+        shared = self._shared_call(backend.get, self._shared_key(key), stored_at)
+        if shared is None:
+            return None
+
+        value, shared_at = shared
+        self._store.set(key, value, stored_at=shared_at)
+
+        return value, shared_at
+
+
+    def _shared_key(self, key) -> str:
+        return f"{self.name}:{key!r}"
+
+
+    def _shared_call(self, fn, *args, default=None):
+        # A broken shared backend degrades to per-worker caching
+        try:
+            return fn(*args)
+        except Exception:
+            logger.warning("Shared cache call %s failed for %s", fn.__name__, self.name, exc_info=True)
+            return default
+
+
+    def _is_fresh_time(self, stored_at: float) -> bool:
+        return (time.time() - stored_at) < self.ttl
+
+
+    def _claim(self, key) -> bool:
+        # Only the first caller after expiry starts a refresh
+        with self._lock:
+            if key in self._refreshing:
+                return False
+
+            self._refreshing.add(key)
+            return True
+
+
+    def _release(self, key):
+        with self._lock:
+            self._refreshing.discard(key)
+
+
+    def refresh_in_background(self, key, loader):
+        """
+        Reload a key in a daemon thread unless a refresh is already running.
+        """
+        if not self._claim(key):
+            return
+
+        def run():
+            try:
+                self._fetch(key, loader)
+            except Exception:
+                # Keep serving the stale value; the next caller retries
+                logger.exception("Background refresh of %s[%r] failed", self.name, key)
+            finally:
+                self._release(key)
+
+        threading.Thread(target=run, daemon=True).start()
+
+
+    def refresh_in_background_async(self, key, loader):
+        """
+        Schedule a coroutine reload unless a refresh is already running.
+        """
+        if not self._claim(key):
+            return
+
+        async def run():
+            try:
+                await self._afetch(key, loader)
+            except Exception:
+                logger.exception("Background refresh of %s[%r] failed", self.name, key)
+            finally:
+                self._release(key)
+
+        task = asyncio.get_running_loop().create_task(run())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
@@ -1,3 +1,4 @@
-from .sleeper_api import SleeperClient
+from .player_index import Player
+from .sleeper_api import AsyncSleeperClient, SleeperClient
 
-__all__ = ["SleeperClient"]
+__all__ = ["AsyncSleeperClient", "Player", "SleeperClient"]
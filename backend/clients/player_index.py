@@ -0,0 +1,64 @@
+"""
+player_index.py
+
+Compact in-memory index of Sleeper players.
+
+The raw /players/nfl payload holds ~10k nested dicts with dozens of
+fields each. The app only reads a handful of them, so each player is
+reduced to a slotted Player record and repeated strings (positions,
+teams) are interned. The raw payload can then be dropped.
+"""
+
+import sys
+from collections.abc import Mapping
+
+
+class Player:
+    """
+    Fields the app reads from a Sleeper player.
+    """
+
+    __slots__ = ("player_id", "full_name", "position", "team", "birth_date", "headshot")
+
+    def __init__(self, player_id, full_name, position, team, birth_date, headshot):
+        self.player_id = player_id
+        self.full_name = full_name
+        self.position = position
+        self.team = team
+        self.birth_date = birth_date
+        self.headshot = headshot
+
+
+    def __repr__(self):
+        return f"Player({self.player_id!r}, {self.full_name!r}, {self.position!r}, {self.team!r})"
+
+
+def _intern(value):
+    return sys.intern(value) if value else None
+
+
+def build_player_index(players: Mapping) -> dict[str, Player]:
+    """
+    Build the player_id → Player index.
+
+    Accepts either the raw Sleeper players dict or a PlayersTable
+    loaded from the on-disk store (both expose the same row shape).
+    """
+    index = {}
+
+    for player_id, p in players.items():
+        if not isinstance(p, dict):
+            continue
+
+        player_id = _intern(str(player_id))
+
+        index[player_id] = Player(
+            player_id=player_id,
+            full_name=p.get("full_name"),
+            position=_intern(p.get("position")),
+            team=_intern(p.get("team")),
+            birth_date=p.get("birth_date"),
+            headshot=(p.get("metadata") or {}).get("headshot"),
+        )
+
+    return index
@@ -0,0 +1,214 @@
+"""
+players_store.py
+
+Disk-backed store for the Sleeper /players/nfl payload.
+
+Only the fields the app reads are kept, laid out column by column
+in a single binary file:
+
+    magic    8 bytes   b"SLPLAYR1"
+    length   uint32    size of the JSON header
+    header   JSON      etag, last_modified, fetched_at, count, columns
+    columns  per column: (count + 1) uint32 offsets, then UTF-8 data
+
+The file is memory-mapped read-only, so every uvicorn worker on the
+machine shares the same page-cache copy. Rows are decoded on access.
+Writes go to a temporary file that atomically replaces the old one,
+so readers never observe a half-written store.
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+from collections.abc import Mapping
+
+from backend.storage import data_path
+
+
+MAGIC = b"SLPLAYR1"
+
+PLAYERS_STORE_FILE = "players_nfl.bin"
+
+# Columns persisted per player (player_id is always first)
+PLAYER_COLUMNS = ("player_id", "full_name", "position", "team", "birth_date", "headshot")
+
+
+class PlayersTable(Mapping):
+    """
+    Read-only, memory-mapped view of a players store file.
+
+    Behaves like the raw Sleeper players dict: maps player_id to a
+    dict with full_name, position, team, birth_date and metadata.headshot.
+    """
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self._mm[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"Not a players store: {path}")
+
+        (header_len,) = struct.unpack_from("<I", self._mm, len(MAGIC))
+        start = len(MAGIC) + 4
+        header = json.loads(self._mm[start:start + header_len])
+
+        if header.get("byteorder") != sys.byteorder:
+            raise ValueError(f"Players store written on another platform: {path}")
+
+        self.etag = header.get("etag")
+        self.last_modified = header.get("last_modified")
+        self.fetched_at = header["fetched_at"]
+
+        count = header["count"]
+        view = memoryview(self._mm)
+
+        # Each column is (offsets, data start) into the shared mapping
+        self._columns = {}
+        for name, (offsets_pos, data_pos) in zip(header["columns"], header["sections"]):
+            offsets = view[offsets_pos:offsets_pos + 4 * (count + 1)].cast("I")
+            self._columns[name] = (offsets, data_pos)
+
+        # Only the id column is decoded eagerly, to locate rows
+        self._rows = {
+            self._value("player_id", row): row
+            for row in range(count)
+        }
+
+
+    def _value(self, column: str, row: int):
+        offsets, data_pos = self._columns[column]
+        start, end = offsets[row], offsets[row + 1]
+
+        # Empty strings are stored for missing values
+        if start == end:
+            return None
+
+        return self._mm[data_pos + start:data_pos + end].decode("utf-8")
+
+
+    def __getitem__(self, player_id):
+        row = self._rows[player_id]
+
+        return {
+            "player_id": player_id,
+            "full_name": self._value("full_name", row),
+            "position": self._value("position", row),
+            "team": self._value("team", row),
+            "birth_date": self._value("birth_date", row),
+            "metadata": {"headshot": self._value("headshot", row)},
+        }
+
+
+    def __iter__(self):
+        return iter(self._rows)
+
+
+    def __len__(self):
+        return len(self._rows)
+
+
+def store_path() -> str:
+    return data_path(PLAYERS_STORE_FILE)
+
+
+def save_players(
+    players: dict,
+    etag: str | None = None,
+    last_modified: str | None = None,
+    path: str | None = None
+) -> str:
+    """
+    Write the raw Sleeper players dict to the columnar store.
+
+    Returns the path written.
+    """
+    path = path or store_path()
+
+    # Build one offsets array and one UTF-8 blob per column
+    offsets = {name: array("I", [0]) for name in PLAYER_COLUMNS}
+    blobs = {name: bytearray() for name in PLAYER_COLUMNS}
+
+    for player_id, player in players.items():
+        if not isinstance(player, dict):
+            continue
+
+        values = (
+            str(player_id),
+            player.get("full_name"),
+            player.get("position"),
+            player.get("team"),
+            player.get("birth_date"),
+            (player.get("metadata") or {}).get("headshot"),
+        )
+
+        for name, value in zip(PLAYER_COLUMNS, values):
+            blobs[name] += (value or "").encode("utf-8")
+            offsets[name].append(len(blobs[name]))
+
+    header = {
+        "etag": etag,
+        "last_modified": last_modified,
+        "fetched_at": time.time(),
+        "count": len(offsets["player_id"]) - 1,
+        "byteorder": sys.byteorder,
+        "columns": list(PLAYER_COLUMNS),
+        "sections": [],
+    }
+
+    # Section positions depend on the header length, which depends on
+    # the positions; reserve generous fixed-width digits to break the cycle
+    header["sections"] = [[10 ** 12, 10 ** 12] for _ in PLAYER_COLUMNS]
+    header_len = len(json.dumps(header).encode("utf-8"))
+
+    pos = len(MAGIC) + 4 + header_len
+    sections = []
+    for name in PLAYER_COLUMNS:
+        offsets_pos = pos
+        data_pos = offsets_pos + offsets[name].itemsize * len(offsets[name])
+        sections.append([offsets_pos, data_pos])
+        pos = data_pos + len(blobs[name])
+
+    header["sections"] = sections
+    header_bytes = json.dumps(header).encode("utf-8").ljust(header_len)
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<I", header_len))
+        f.write(header_bytes)
+
+        for name in PLAYER_COLUMNS:
+            f.write(offsets[name].tobytes())
+            f.write(blobs[name])
+
+    # Existing readers keep their mapping of the old file
+    try:
+        os.replace(tmp_path, path)
+    except OSError:
+        # Windows refuses to replace a mapped file; leave the old one
+        os.remove(tmp_path)
+        raise
+
+    return path
+
+
+def load_players(path: str | None = None, newer_than: float = 0) -> PlayersTable | None:
+    """
+    Open the players store.
+
+    Returns None if the file is missing, unreadable, or was not
+    modified after `newer_than` (a Unix timestamp).
+    """
+    path = path or store_path()
+
+    try:
+        if os.path.getmtime(path) <= newer_than:
+            return None
+
+        return PlayersTable(path)
+    except (OSError, ValueError, KeyError, struct.error):
+        return None
@@ -1,19 +1,57 @@
+import asyncio
+import json
+import logging
 import requests
-import time
+
+import httpx
+
+from backend.cache import SingleFlight, StaleWhileRevalidateCache, TTLCache
+from backend.clients.player_index import build_player_index
+from backend.clients.players_store import load_players, save_players
+
+
+logger = logging.getLogger(__name__)
 
 
 # Base URL for the Sleeper public API
 BASE_URL = "https://api.sleeper.app/v1"
 
 # Cache for Sleeper players endpoint (large and mostly static)
-PLAYERS_CACHE = None
-PLAYERS_CACHE_TIME = 0
+# Holds the compact player_id → Player index, never the raw payload.
+# Workers share it through the on-disk players store, not the cache backend.
 PLAYERS_CACHE_TTL = 3600 * 24  # 24 hours
+PLAYERS_CACHE = StaleWhileRevalidateCache(
+    "players", PLAYERS_CACHE_TTL, maxsize=1, shared=False
+)
+PLAYERS_KEY = "nfl"
+
+# Coalesces concurrent reads of the on-disk players store
+PLAYERS_DISK_FLIGHT = SingleFlight()
 
 # Cache for league rosters (short-lived for freshness)
-ROSTERS_CACHE = {}
-ROSTERS_CACHE_TIME = {}
 ROSTERS_CACHE_TTL = 60  # 60 seconds
+ROSTERS_CACHE_MAXSIZE = 2048  # leagues kept before LRU eviction
+ROSTERS_CACHE = StaleWhileRevalidateCache(
+    "rosters", ROSTERS_CACHE_TTL, maxsize=ROSTERS_CACHE_MAXSIZE
+)
+
+# Cache for the current NFL state (season/week changes at most weekly)
+NFL_STATE_CACHE_TTL = 3600  # 1 hour
+NFL_STATE_CACHE = StaleWhileRevalidateCache("nfl_state", NFL_STATE_CACHE_TTL, maxsize=1)
+NFL_STATE_KEY = "nfl"
+
+# Validators (ETag / Last-Modified) of the last full response per URL,
+# sent back as If-None-Match / If-Modified-Since on the next refresh
+VALIDATORS_TTL = 3600 * 24 * 7  # 7 days
+VALIDATORS_MAXSIZE = 4096  # URLs kept before LRU eviction
+VALIDATORS = TTLCache("validators", VALIDATORS_MAXSIZE, VALIDATORS_TTL)
+
+# HTTP settings shared by both clients
+REQUEST_TIMEOUT = 10  # seconds per request
+ACCEPT_ENCODING = "gzip, deflate"  # compressed bodies, decoded transparently
+MAX_CONNECTIONS = 100  # total sockets in the async pool
+MAX_KEEPALIVE_CONNECTIONS = 20  # idle sockets kept open for reuse
+MAX_CONCURRENT_REQUESTS = 50  # in-flight requests per async client
 
 
 class SleeperClient:
@@ -32,13 +70,38 @@ class SleeperClient:
         # Store base API URL for reuse
         self.base = BASE_URL
 
+        # One session per client so TCP/TLS connections are reused
+        self.session = requests.Session()
+        self.session.headers["Accept-Encoding"] = ACCEPT_ENCODING
+
+
+    def _get(self, url: str, headers: dict | None = None):
+        return self.session.get(url, timeout=REQUEST_TIMEOUT, headers=headers)
+
+
+    def _get_if_modified(self, url: str, cached):
+        """
+        Conditional GET for a cached resource.
+
+        Returns the response, or None when Sleeper answered 304 Not
+        Modified and `cached` is still current.
+        """
+        res = self._get(url, headers=_conditional_headers(url, cached))
+
+        if res.status_code == 304 and cached is not None:
+            return None
+
+        _remember_validators(url, res)
+
+        return res
+
 
     def get_user(self, username: str):
         """
         Fetch a Sleeper user by username.
         """
         url = f"{self.base}/user/{username}"
-        return requests.get(url).json()
+        return self._get(url).json()
 
 
     def get_user_leagues(self, user_id: str, season: int):
@@ -46,80 +109,333 @@ class SleeperClient:
         Fetch all leagues for a user for a specific NFL season.
         """
         url = f"{self.base}/user/{user_id}/leagues/nfl/{season}"
-        return requests.get(url).json()
+        return self._get(url).json()
 
 
     def get_league(self, league_id: str):
         url = f"{self.base}/league/{league_id}"
-        res = requests.get(url)
+        res = self._get(url)
         if res.status_code != 200:
             return None
 
-        data = res.json()
+        return _validate_league(res.json())
 
-        # Sleeper returns {} or error payloads sometimes
-        if not isinstance(data, dict) or "league_id" not in data:
-            return None
 
-        return data
 
+    def get_rosters(self, league_id: str):
+        url = f"{self.base}/league/{league_id}/rosters"
 
+        def load():
+            # Unchanged rosters come back as 304: keep the cached object
+            cached, _ = ROSTERS_CACHE.peek(league_id)
+            res = self._get_if_modified(url, cached)
 
-    def get_rosters(self, league_id: str):
-        global ROSTERS_CACHE, ROSTERS_CACHE_TIME
+            return cached if res is None else res.json()
+
+        # Expired rosters are served while one background refresh runs
+        return ROSTERS_CACHE.get(league_id, load)
+
+
+    def get_traded_picks(self, league_id: str):
+        """
+        Fetch traded draft picks for a league.
+        """
+        url = f"{self.base}/league/{league_id}/traded_picks"
+        return self._get(url).json()
 
-        cached = ROSTERS_CACHE.get(league_id)
-        cached_time = ROSTERS_CACHE_TIME.get(league_id)
 
-        # Cache hit: return cached rosters
-        if cached and cached_time and (time.time() - cached_time) < ROSTERS_CACHE_TTL:
+    def get_matchups(self, league_id: str, week: int):
+        """
+        Fetch weekly matchup data for a league.
+        """
+        url = f"{self.base}/league/{league_id}/matchups/{week}"
+        return self._get(url).json()
+
+
+    def get_nfl_state(self):
+        """
+        Fetch the current NFL state (season, week, season type).
+        """
+        url = f"{self.base}/state/nfl"
+
+        def load():
+            cached, _ = NFL_STATE_CACHE.peek(NFL_STATE_KEY)
+            res = self._get_if_modified(url, cached)
+
+            return cached if res is None else res.json()
+
+        return NFL_STATE_CACHE.get(NFL_STATE_KEY, load)
+
+
+    def get_players(self):
+        """
+        Fetch the Sleeper NFL players as a player_id → Player index.
+
+        Cached aggressively because the payload is large and rarely changes:
+        - In memory, backed by the shared on-disk players store
+        - A stale copy is served while a background thread refreshes it
+        """
+        _adopt_players_from_disk()
+
+        return PLAYERS_CACHE.get(PLAYERS_KEY, self._fetch_players)
+
+
+    def _fetch_players(self):
+        # Fetch fresh data from Sleeper API, unless it has not changed
+        url = f"{self.base}/players/nfl"
+        cached, _ = PLAYERS_CACHE.peek(PLAYERS_KEY)
+
+        res = self._get_if_modified(url, cached)
+        if res is None:
             return cached
 
-        # Cache miss: fetch from Sleeper
+        # Persist to disk and keep only the compact index
+        return _index_players(res.json(), res.headers)
+
+
+class AsyncSleeperClient:
+    """
+    Async counterpart of SleeperClient for use inside `async def` endpoints.
+
+    Purpose:
+    - Share one keep-alive connection pool across all requests
+    - Apply a timeout to every request
+    - Bound the number of requests in flight at once
+
+    Shares the players and rosters caches with SleeperClient.
+    This class contains no business logic.
+    """
+
+    def __init__(
+        self,
+        timeout: float = REQUEST_TIMEOUT,
+        max_connections: int = MAX_CONNECTIONS,
+        max_keepalive_connections: int = MAX_KEEPALIVE_CONNECTIONS,
+        max_concurrency: int = MAX_CONCURRENT_REQUESTS
+    ):
+        self.base = BASE_URL
+
+        self.http = httpx.AsyncClient(
+            timeout=timeout,
+            headers={"Accept-Encoding": ACCEPT_ENCODING},
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections
+            )
+        )
+
+        # Caps concurrent requests so fan-outs cannot flood Sleeper
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+
+
+    async def _get(self, url: str, headers: dict | None = None) -> httpx.Response:
+        async with self.semaphore:
+            return await self.http.get(url, headers=headers)
+
+
+    async def _get_if_modified(self, url: str, cached):
+        """
+        Conditional GET for a cached resource (see SleeperClient._get_if_modified).
+        """
+        res = await self._get(url, headers=_conditional_headers(url, cached))
+
+        if res.status_code == 304 and cached is not None:
+            return None
+
+        _remember_validators(url, res)
+
+        return res
+
+
+    async def aclose(self):
+        """
+        Close the underlying connection pool.
+        """
+        await self.http.aclose()
+
+
+    async def get_user(self, username: str):
+        """
+        Fetch a Sleeper user by username.
+        """
+        url = f"{self.base}/user/{username}"
+        return (await self._get(url)).json()
+
+
+    async def get_user_leagues(self, user_id: str, season: int):
+        """
+        Fetch all leagues for a user for a specific NFL season.
+        """
+        url = f"{self.base}/user/{user_id}/leagues/nfl/{season}"
+        return (await self._get(url)).json()
+
+
+    async def get_league(self, league_id: str):
+        url = f"{self.base}/league/{league_id}"
+        res = await self._get(url)
+        if res.status_code != 200:
+            return None
+
+        return _validate_league(res.json())
+
+
+    async def get_rosters(self, league_id: str):
         url = f"{self.base}/league/{league_id}/rosters"
-        data = requests.get(url).json()
 
-        # Store in cache
-        ROSTERS_CACHE[league_id] = data
-        ROSTERS_CACHE_TIME[league_id] = time.time()
+        async def load():
+            cached, _ = ROSTERS_CACHE.peek(league_id)
+            res = await self._get_if_modified(url, cached)
 
-        return data
-    
+            return cached if res is None else res.json()
 
-    def get_traded_picks(self, league_id: str):
+        return await ROSTERS_CACHE.aget(league_id, load)
+
+
+    async def get_traded_picks(self, league_id: str):
         """
         Fetch traded draft picks for a league.
         """
         url = f"{self.base}/league/{league_id}/traded_picks"
-        return requests.get(url).json()
+        return (await self._get(url)).json()
 
 
-    def get_matchups(self, league_id: str, week: int):
+    async def get_matchups(self, league_id: str, week: int):
         """
         Fetch weekly matchup data for a league.
         """
         url = f"{self.base}/league/{league_id}/matchups/{week}"
-        return requests.get(url).json()
+        return (await self._get(url)).json()
 
 
-    def get_players(self):
+    async def get_nfl_state(self):
+        """
+        Fetch the current NFL state (season, week, season type).
+        """
+        url = f"{self.base}/state/nfl"
+
+        async def load():
+            cached, _ = NFL_STATE_CACHE.peek(NFL_STATE_KEY)
+            res = await self._get_if_modified(url, cached)
+
+            return cached if res is None else res.json()
+
+        return await NFL_STATE_CACHE.aget(NFL_STATE_KEY, load)
+
+
+    async def get_players(self):
         """
-        Fetch the full Sleeper NFL players dictionary.
+        Fetch the Sleeper NFL players as a player_id → Player index.
 
-        Cached aggressively because the payload is large and rarely changes.
+        Uses the same memory/disk caches as SleeperClient.get_players.
         """
-        global PLAYERS_CACHE, PLAYERS_CACHE_TIME
+        # Reading the disk copy (and waiting for another thread reading
+        # it) blocks, so it runs in a worker thread; a fresh copy skips it
+        if not PLAYERS_CACHE.is_fresh(PLAYERS_KEY):
+            await asyncio.to_thread(_adopt_players_from_disk)
+
+        return await PLAYERS_CACHE.aget(PLAYERS_KEY, self._fetch_players)
 
-        # Return cached data if still valid
-        if PLAYERS_CACHE and (time.time() - PLAYERS_CACHE_TIME) < PLAYERS_CACHE_TTL:
-            return PLAYERS_CACHE
 
-        # Fetch fresh data from Sleeper API
+    async def _fetch_players(self):
         url = f"{self.base}/players/nfl"
-        data = requests.get(url).json()
+        cached, _ = PLAYERS_CACHE.peek(PLAYERS_KEY)
+
+        res = await self._get_if_modified(url, cached)
+        if res is None:
+            return cached
+
+        # The multi-megabyte body is parsed and persisted in a worker
+        # thread so the event loop keeps serving other requests
+        data = await asyncio.to_thread(json.loads, res.content)
+
+        return await asyncio.to_thread(_index_players, data, res.headers)
+
+
+# Cache and payload helpers shared by both clients
+def _validate_league(data):
+    # Sleeper returns {} or error payloads sometimes
+    if not isinstance(data, dict) or "league_id" not in data:
+        return None
+
+    return data
+
+
+def _adopt_players_from_disk():
+    """
+    Seed the players cache from the on-disk store when it is newer.
+
+    Lets a worker pick up a refresh written by another worker
+    (or a previous process) instead of downloading it again.
+    Only checked while the in-memory copy is missing or expired.
+    """
+    if PLAYERS_CACHE.is_fresh(PLAYERS_KEY):
+        return
+
+    PLAYERS_DISK_FLIGHT.do(PLAYERS_KEY, _load_players_from_disk)
+
+
+def _load_players_from_disk():
+    _, stored_at = PLAYERS_CACHE.peek(PLAYERS_KEY)
+
+    table = load_players(newer_than=stored_at)
+    if table is not None and table.fetched_at > stored_at:
+        PLAYERS_CACHE.set(
+            PLAYERS_KEY,
+            build_player_index(table),
+            stored_at=table.fetched_at
+        )
+
+        # The next refresh can then be a conditional request
+        VALIDATORS.set(f"{BASE_URL}/players/nfl", (table.etag, table.last_modified))
+
+
+def _index_players(data, headers=None):
+    """
+    Persist a fresh players payload and return its compact index.
+
+    The raw payload is not kept once the index is built.
+    """
+    headers = headers or {}
+
+    try:
+        save_players(
+            data,
+            etag=headers.get("ETag"),
+            last_modified=headers.get("Last-Modified")
+        )
+    except OSError:
+        logger.exception("Could not write players store, keeping it in memory only")
+
+    return build_player_index(data)
+
+
+
+def _conditional_headers(url: str, cached) -> dict:
+    """
+    If-None-Match / If-Modified-Since for a URL whose body is still cached.
+    """
+    if cached is None:
+        return {}
+
+    etag, last_modified = VALIDATORS.get(url) or (None, None)
+
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+
+    return headers
+
+
+def _remember_validators(url: str, res):
+    if res.status_code != 200:
+        return
 
-        # Update cache
-        PLAYERS_CACHE = data
-        PLAYERS_CACHE_TIME = time.time()
+    etag = res.headers.get("ETag")
+    last_modified = res.headers.get("Last-Modified")
 
-        return data
+    if etag or last_modified:
+        VALIDATORS.set(url, (etag, last_modified))
+    else:
+        VALIDATORS.delete(url)
@@ -6,7 +6,7 @@ FastAPI entry point for the Sleeper Dynasty Analyzer.
 Responsibilities:
 - Configure the FastAPI application
 - Register middleware (CORS)
-- Initialize shared clients (SleeperClient)
+- Initialize shared clients (SleeperClient, AsyncSleeperClient)
 - Define HTTP endpoints
 - Delegate business logic to service modules
 
@@ -16,25 +16,81 @@ uvicorn backend.main:app --reload
 
 """
 
-from fastapi import FastAPI, Request
-from fastapi.responses import HTMLResponse
+import asyncio
+import json
+import logging
+import sqlite3
+from contextlib import asynccontextmanager
+
+from fastapi import Body, FastAPI, Query, Request
+from fastapi.responses import HTMLResponse, StreamingResponse
 from fastapi.templating import Jinja2Templates
 from fastapi.middleware.cors import CORSMiddleware
 
-from backend.clients.sleeper_api import SleeperClient
+from backend.cache import cache_stats
+from backend.clients.sleeper_api import AsyncSleeperClient, SleeperClient
 
 # Service modules contain all non-trivial logic
+from backend.services.extract_data import build_dynasty_snapshot
+from backend.services.history import get_snapshot_store, record_snapshot
+from backend.services.ktc_history import movers
+from backend.services.league_values import build_league_values
+from backend.services.matchups import get_matchup_stats
+from backend.services.roster_sync import ROSTER_SYNC
+from backend.services.trade_finder import DEFAULT_SUGGESTIONS, find_trades
+from backend.services.trades import evaluate_trade, evaluate_trades, get_league_value_index
+from backend.services.portfolio import build_portfolio, fetch_portfolio_snapshots
+from backend.services.valuation import group_by_position
 from backend.services.ktc import *
 from backend.services.leagues import *
 from backend.services.players import *
 from backend.services.lineup import *
 
 
+logger = logging.getLogger(__name__)
+
+# Single shared client for all Sleeper API requests
+client = SleeperClient()
+
+# Async client used by async endpoints (one pooled connection set per worker)
+aclient = AsyncSleeperClient()
+
+
+async def warm_caches():
+    """
+    Load the large shared caches (players, KTC) before the first request needs them.
+    """
+    results = await asyncio.gather(
+        aclient.get_players(),
+        asyncio.to_thread(get_ktc_values),
+        return_exceptions=True
+    )
+
+    for result in results:
+        if isinstance(result, Exception):
+            logger.error("Cache warm-up failed: %r", result)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Pre-warm caches on startup and release pooled connections on shutdown.
+    """
+    # Warm in the background so startup is not delayed by a scrape
+    warmup = asyncio.create_task(warm_caches())
+
+    yield
+
+    warmup.cancel()
+    await aclient.aclose()
+
+
 # Create the FastAPI application
 app = FastAPI(
     title="Sleeper API",
     description="Sleeper Dynasty League Analyzer",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Enable cross-origin requests so frontend JS can call API endpoints
@@ -48,12 +104,9 @@ app.add_middleware(
 # Jinja2 template engine for HTML rendering
 templates = Jinja2Templates(directory="backend/templates")
 
-# Single shared client for all Sleeper API requests
-client = SleeperClient()
-
 
 @app.get("/user_leagues")
-def user_leagues(username: str):
+async def user_leagues(username: str):
     """
     Return all dynasty leagues for a user, grouped by league name.
 
@@ -61,14 +114,198 @@ def user_leagues(username: str):
     after the user enters their username.
     """
     # Resolve username → user_id
-    user = client.get_user(username)
+    user = await aclient.get_user(username)
 
-    # Sleeper returns an object without user_id when user is invalid
-    if "user_id" not in user:
+    # Sleeper returns null or an object without user_id when user is invalid
+    if not user or "user_id" not in user:
         return {"error": "User not found"}
 
     # Delegate season scanning & dynasty filtering to the service layer
-    return get_all_user_leagues(client, user["user_id"])
+    return await get_all_user_leagues_async(aclient, user["user_id"])
+
+
+@app.get("/user_leagues_stream")
+async def user_leagues_stream(username: str):
+    """
+    Stream a user's dynasty leagues as NDJSON, one record per line.
+
+    Records are emitted as each season's fetch completes, so the
+    frontend can show the first leagues before the slowest season
+    returns (see stream_user_leagues_async for the record types).
+    """
+    user = await aclient.get_user(username)
+
+    async def records():
+        if not user or "user_id" not in user:
+            yield json.dumps({"type": "error", "error": "User not found"}) + "\n"
+            return
+
+        async for record in stream_user_leagues_async(aclient, user["user_id"]):
+            yield json.dumps(record) + "\n"
+
+    return StreamingResponse(records(), media_type="application/x-ndjson")
+
+
+@app.get("/league_values")
+def league_values(league_id: str):
+    """
+    Return KTC values, per-position totals and rankings for every team in a league.
+
+    One request values the whole league: league, rosters, players and
+    KTC data are fetched once and shared by all teams.
+    """
+    try:
+        snapshot = build_dynasty_snapshot(client, league_id)
+    except ValueError as e:
+        return {"error": str(e)}
+
+    ktc_data = get_ktc_values()
+
+    values = build_league_values(
+        snapshot,
+        ktc_index=get_ktc_index(client.get_players(), ktc_data),
+        pick_index=get_ktc_pick_index(ktc_data)
+    )
+
+    # Keep a local history for trend charts; never fail the request over it
+    try:
+        record_snapshot(snapshot, values)
+    except sqlite3.Error as e:
+        logger.error("Recording snapshot of league %s failed: %r", league_id, e)
+
+    return values
+
+
+@app.get("/trade_eval")
+def trade_eval(league_id: str, a: list[str] = Query(...), b: list[str] = Query(...)):
+    """
+    Evaluate one trade: assets `a` (one team) for assets `b` (another team).
+
+    Assets are player_ids or picks as "pick:<season>:<round>:<original owner_id>".
+    Served from the league's cached value index.
+    """
+    try:
+        index = get_league_value_index(client, league_id)
+        return evaluate_trade(index, a, b)
+    except ValueError as e:
+        return {"error": str(e)}
+
+
+@app.post("/trade_eval")
+def trade_eval_batch(payload: dict = Body(...)):
+    """
+    Evaluate many candidate trades of one league in a single request.
+
+    Body: {"league_id": "...", "trades": [{"a": [...], "b": [...]}, ...]}
+    Results keep the order of `trades`; invalid trades get an "error".
+    Batches over MAX_BATCH_TRADES are rejected as a whole.
+    """
+    try:
+        index = get_league_value_index(client, str(payload.get("league_id")))
+        return {"results": evaluate_trades(index, payload.get("trades") or [])}
+    except ValueError as e:
+        return {"error": str(e)}
+
+
+@app.get("/trade_finder")
+def trade_finder(league_id: str, owner_id: str, limit: int = DEFAULT_SUGGESTIONS):
+    """
+    Suggest balanced trades (1-for-1 up to 3-for-2, players and picks)
+    between one team and every other team of a league.
+    """
+    try:
+        index = get_league_value_index(client, league_id)
+        return {"trades": find_trades(index, owner_id, limit)}
+    except ValueError as e:
+        return {"error": str(e)}
+
+
+@app.get("/matchup_stats")
+async def matchup_stats(league_id: str):
+    """
+    Return all-play records, luck index, points-for percentiles and max
+    possible points for every team of a league's current season.
+
+    Weeks are stored locally; only new or still open weeks are fetched.
+    """
+    try:
+        return await get_matchup_stats(aclient, league_id)
+    except ValueError as e:
+        return {"error": str(e)}
+
+
+@app.get("/roster_activity")
+def roster_activity(league_id: str, since: float = 0):
+    """
+    Return player adds / drops and owner changes seen between roster
+    syncs of a league, oldest first.
+
+    Events are recorded in memory whenever the league's rosters are
+    refreshed for a snapshot (e.g. by /league_values).
+    """
+    return ROSTER_SYNC.events(league_id, since)
+
+
+@app.get("/league_history")
+def league_history(league_id: str, owner_id: str | None = None, since: float = 0):
+    """
+    Return recorded team totals over time for a league (or one team),
+    read from the local snapshot history.
+    """
+    return get_snapshot_store().team_value_history(league_id, owner_id, since)
+
+
+@app.get("/player_history")
+def player_history(player_id: str, league_id: str | None = None, since: float = 0):
+    """
+    Return recorded KTC value and owner changes of a player, read from
+    the local snapshot history.
+    """
+    return get_snapshot_store().player_value_history(player_id, league_id, since)
+
+
+@app.get("/portfolio")
+async def portfolio(username: str):
+    """
+    Return a user's standing in every current dynasty league and their
+    exposure to each player across those leagues.
+
+    All leagues are fetched concurrently and valued with the shared
+    players and KTC indexes.
+    """
+    user = await aclient.get_user(username)
+
+    if not user or "user_id" not in user:
+        return {"error": "User not found"}
+
+    (snapshots, errors), ktc_data, players = await asyncio.gather(
+        fetch_portfolio_snapshots(aclient, user["user_id"]),
+        asyncio.to_thread(get_ktc_values),
+        aclient.get_players()
+    )
+
+    # Valuing every league (and a possible KTC index rebuild) is CPU
+    # and SQLite work; keep it off the event loop
+    def value_portfolio():
+        return build_portfolio(
+            user["user_id"],
+            snapshots,
+            ktc_index=get_ktc_index(players, ktc_data),
+            pick_index=get_ktc_pick_index(ktc_data)
+        )
+
+    result = await asyncio.to_thread(value_portfolio)
+    result["errors"] = errors
+
+    return result
+
+
+@app.get("/cache_stats")
+def cache_statistics():
+    """
+    Return size, hit/miss and eviction counters for every cache.
+    """
+    return cache_stats()
 
 
 @app.get("/", response_class=HTMLResponse)
@@ -89,7 +326,7 @@ def home(request: Request):
 
 
 @app.get("/show_roster", response_class=HTMLResponse)
-def show_roster(request: Request, username: str, league_id: str):
+async def show_roster(request: Request, username: str, league_id: str):
     """
     Render the roster breakdown for a specific league.
 
@@ -99,9 +336,15 @@ def show_roster(request: Request, username: str, league_id: str):
     - Shape data for template consumption
     """
 
-    # Fetch and validate the user
-    user = client.get_user(username)
-    if "user_id" not in user:
+    # Fetch user, league metadata and rosters concurrently
+    user, league, rosters = await asyncio.gather(
+        aclient.get_user(username),
+        aclient.get_league(league_id),
+        aclient.get_rosters(league_id)
+    )
+
+    # Validate the user
+    if not user or "user_id" not in user:
         return templates.TemplateResponse(
             "roster.html",
             {
@@ -113,16 +356,8 @@ def show_roster(request: Request, username: str, league_id: str):
 
     user_id = user["user_id"]
 
-    # Fetch league metadata to confirm validity and extract season
-    league = client.get_league(league_id)
-
-    # Fetch number of roster slots for each position, bench, IR & TAXI
-    roster_slots = normalize_roster_slots(
-        league.get("roster_positions", []),
-        league.get("settings", {})
-    )
-
-    if "league_id" not in league:
+    # Confirm the league is valid before reading its settings
+    if not league or "league_id" not in league:
         return templates.TemplateResponse(
             "roster.html",
             {
@@ -132,12 +367,17 @@ def show_roster(request: Request, username: str, league_id: str):
             }
         )
 
+    # Fetch number of roster slots for each position, bench, IR & TAXI
+    roster_slots = normalize_roster_slots(
+        league.get("roster_positions", []),
+        league.get("settings", {})
+    )
+
     season = league.get("season")
 
     # Identify the roster owned by this user in the league
-    rosters = client.get_rosters(league_id)
     roster = next(
-        (r for r in rosters if r.get("owner_id") == user_id),
+        (r for r in rosters or [] if r.get("owner_id") == user_id),
         None
     )
 
@@ -151,26 +391,18 @@ def show_roster(request: Request, username: str, league_id: str):
             }
         )
 
-    # Fetch KeepTradeCut values (cached to avoid repeated scraping)
-    ktc_data = get_ktc_values()
-
-    # Build a fast lookup table using normalized player names
-    ktc_by_name = {
-        normalize_name(item["name"]): item
-        for item in ktc_data
-    }
+    # Fetch KeepTradeCut values (cached; scraping runs in a worker thread)
+    # and the global Sleeper player index at the same time
+    ktc_data, players = await asyncio.gather(
+        asyncio.to_thread(get_ktc_values),
+        aclient.get_players()
+    )
 
-    # Fetch the global Sleeper player dictionary
-    players = client.get_players()
+    # Sleeper player_id → KTC entry (rebuilt only when a cache refreshes;
+    # a rebuild reads the match store, so it runs in a worker thread)
+    ktc_index = await asyncio.to_thread(get_ktc_index, players, ktc_data)
 
-    # Buckets used to group players for display
-    positions = {
-        "QB": [],
-        "RB": [],
-        "WR": [],
-        "TE": [],
-        "OTHER": []
-    }
+    player_infos = []
 
     # Translate raw player IDs into display-ready player objects
     for pid in roster.get("players", []):
@@ -179,50 +411,45 @@ def show_roster(request: Request, username: str, league_id: str):
             continue
 
         # Team and team logo (skip free agents)
-        team = player.get("team", "FA")
+        team = player.team or "FA"
         team_logo = (
             f"https://a.espncdn.com/i/teamlogos/nfl/500/{team.lower()}.png"
-            if team not in [None, "FA"]
+            if team != "FA"
             else None
         )
 
         # Prefer Sleeper headshot, fall back to default CDN
         headshot = (
-            player.get("metadata", {}).get("headshot")
+            player.headshot
             or f"https://sleepercdn.com/content/nfl/players/thumb/{pid}.jpg"
         )
 
-        # Match Sleeper player to KTC value using normalized names
-        norm_name = normalize_name(player.get("full_name"))
-        lookup_name = resolve_player_name(norm_name)
-
-        ktc_entry = ktc_by_name.get(lookup_name)
-
+        # Match Sleeper player to KTC value via the precomputed join index
+        ktc_entry = ktc_index.get(player.player_id)
 
         player_info = {
             "id": pid,
-            "name": player.get("full_name"),
-            "position": player.get("position"),
+            "name": player.full_name,
+            "position": player.position,
             "team": team,
             "headshot": headshot,
             "team_logo": team_logo,
             "ktc_value": ktc_entry["value"] if ktc_entry else 0,
-            "ktc_pos_rank": ktc_entry["pos_rank"] if ktc_entry else None
-        }
+            "ktc_pos_rank": ktc_entry["pos_rank"] if ktc_entry else None,
 
-        # Assign player to the appropriate position bucket
-        pos = player_info["position"]
-        positions[pos if pos in positions else "OTHER"].append(player_info)
+            # Value change over 7 / 30 days, precomputed per scrape
+            "ktc_delta_7": ktc_entry.get("delta_7") if ktc_entry else None,
+            "ktc_delta_30": ktc_entry.get("delta_30") if ktc_entry else None
+        }
 
-    # Sort each position group by descending KTC value
-    for lst in positions.values():
-        lst.sort(key=lambda p: p["ktc_value"], reverse=True)
+        player_infos.append(player_info)
 
-    # Compute total KTC value per position group
-    totals = {
-        pos: sum(p["ktc_value"] for p in lst)
-        for pos, lst in positions.items()
-    }
+    # Group by position (unknown positions go to OTHER), sort each
+    # group by descending KTC value and total it
+    positions, totals = group_by_position(
+        player_infos,
+        groups=("QB", "RB", "WR", "TE", "OTHER")
+    )
 
     # Final object passed to the template renderer
     data = {
@@ -236,6 +463,9 @@ def show_roster(request: Request, username: str, league_id: str):
         "totals": totals
     }
 
+    # Biggest 7-day KTC movers on the roster
+    data["risers"], data["fallers"] = movers(player_infos, key="ktc_delta_7")
+
     return templates.TemplateResponse(
         "roster.html",
         {
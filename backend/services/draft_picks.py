@@ -5,15 +5,18 @@ Draft pick domain logic.
 
 Responsibilities:
 - Determine which draft seasons are relevant
-- Generate default draft picks for all teams
-- Apply traded pick mutations
+- Keep a compact pick table per league (see PickTable)
+- Apply traded pick mutations incrementally
 - Return picks grouped by owner_id
 
 This module contains NO API calls.
 """
 
+import threading
 from collections import defaultdict
 
+from backend.cache import TTLCache
+
 
 # Internal helpers
 def _collect_pick_seasons(league: dict, traded_picks: list[dict]) -> list[int]:
@@ -35,110 +38,155 @@ def _collect_pick_seasons(league: dict, traded_picks: list[dict]) -> list[int]:
     return sorted(seasons)
 
 
-def _generate_default_picks(
-    league: dict,
-    rosters: list[dict],
-    seasons: list[int]
-) -> list[dict]:
+class PickTable:
     """
-    Generate all default draft picks assuming no trades occurred.
+    Draft pick universe of one league.
+
+    `owners` maps (season, round, original roster_id) to the roster_id
+    currently holding the pick; untraded picks map to themselves.
+    Trades are applied incrementally: only traded_picks records that
+    changed since the previous call touch the table.
     """
-    picks = []
-    draft_rounds = league["settings"]["draft_rounds"]
 
-    for season in seasons:
-        for r in rosters:
-            roster_id = r["roster_id"]
+    def __init__(self, seasons: list[int], draft_rounds: int, roster_ids: list[int]):
+        self.seasons = tuple(sorted(seasons))
+        self.draft_rounds = draft_rounds
+        self.roster_ids = tuple(sorted(roster_ids))
+
+        self.owners = {
+            (season, rd, roster_id): roster_id
+            for season in self.seasons
+            for rd in range(1, draft_rounds + 1)
+            for roster_id in self.roster_ids
+        }
+
+        # key → owner of the last traded_picks applied
+        self._applied = {}
+
+        self.lock = threading.Lock()
+
+
+    def matches(self, seasons: list[int], draft_rounds: int, roster_ids: list[int]) -> bool:
+        """
+        True if the table covers exactly this pick universe.
+        """
+        return (
+            self.seasons == tuple(sorted(seasons))
+            and self.draft_rounds == draft_rounds
+            and self.roster_ids == tuple(sorted(roster_ids))
+        )
+
+
+    def apply_trades(self, traded_picks: list[dict]) -> set[tuple]:
+        """
+        Bring pick ownership in line with Sleeper's traded_picks list.
+
+        Returns the keys whose owner changed.
+        """
+        current = {}
+
+        for tp in traded_picks:
+            key = (int(tp["season"]), int(tp["round"]), int(tp["roster_id"]))
+
+            if key in self.owners:
+                current[key] = int(tp["owner_id"])
+
+        changed = set()
+
+        for key, owner in current.items():
+            if self._applied.get(key) != owner:
+                self.owners[key] = owner
+                changed.add(key)
+
+        # Records that disappeared revert to the original owner
+        for key in self._applied.keys() - current.keys():
+            self.owners[key] = key[2]
+            changed.add(key)
+
+        self._applied = current
+
+        return changed
 
-            for rd in range(1, draft_rounds + 1):
-                picks.append({
-                    "season": season,
-                    "round": rd,
-                    "original_owner_roster_id": roster_id,
-                    "current_owner_roster_id": roster_id,
-                    "source": "generated"
-                })
 
-    return picks
+    def is_traded(self, key: tuple) -> bool:
+        return key in self._applied
 
 
-def _apply_traded_picks(
-    default_picks: list[dict],
+# league_id → PickTable, reused across requests
+PICK_TABLES_TTL = 3600 * 6  # 6 hours
+PICK_TABLES_MAXSIZE = 1024  # leagues kept before LRU eviction
+PICK_TABLES = TTLCache("pick_tables", PICK_TABLES_MAXSIZE, PICK_TABLES_TTL)
+
+
+def get_pick_table(
+    league: dict,
+    rosters: list[dict],
     traded_picks: list[dict]
-) -> list[dict]:
+) -> PickTable:
     """
-    Apply traded pick mutations to the default pick universe.
+    Return the league's pick table with the latest trades applied.
+
+    The table is built once per league and kept while its seasons,
+    rounds and rosters stay the same; later calls only re-apply
+    traded_picks records that changed.
     """
-    index = {
-        (p["season"], p["round"], p["original_owner_roster_id"]): p
-        for p in default_picks
-    }
-
-    for tp in traded_picks:
-        key = (
-            int(tp["season"]),
-            int(tp["round"]),
-            int(tp["roster_id"])
-        )
+    seasons = _collect_pick_seasons(league, traded_picks)
+    draft_rounds = league["settings"]["draft_rounds"]
+    roster_ids = [r["roster_id"] for r in rosters]
 
-        if key not in index:
-            continue
+    league_id = league.get("league_id")
+    table = PICK_TABLES.get(league_id) if league_id else None
 
-        index[key]["current_owner_roster_id"] = int(tp["owner_id"])
-        index[key]["source"] = "traded"
-        index[key]["previous_owner_roster_id"] = int(
-            tp.get("previous_owner_id", tp["roster_id"])
-        )
+    if table is None or not table.matches(seasons, draft_rounds, roster_ids):
+        table = PickTable(seasons, draft_rounds, roster_ids)
+
+        if league_id:
+            PICK_TABLES.set(league_id, table)
 
-    return list(index.values())
+    with table.lock:
+        table.apply_trades(traded_picks)
+
+    return table
 
 
 def build_league_picks(
     league: dict,
     rosters: list[dict],
-    traded_picks: list[dict]
+    traded_picks: list[dict],
+    roster_id_to_owner: dict[int, str] | None = None
 ) -> dict[str, list[dict]]:
     """
     Build all draft picks for a league and group them by owner_id.
-    """
-    seasons = _collect_pick_seasons(league, traded_picks)
-
-    default_picks = _generate_default_picks(
-        league=league,
-        rosters=rosters,
-        seasons=seasons
-    )
 
-    all_picks = _apply_traded_picks(default_picks, traded_picks)
+    Callers that already walked the rosters can pass their
+    roster_id → owner_id map to avoid building it again.
+    """
+    table = get_pick_table(league, rosters, traded_picks)
 
     # Map roster_id -> owner_id
-    roster_id_to_owner = {
-        r["roster_id"]: str(r.get("owner_id"))
-        for r in rosters
-    }
+    if roster_id_to_owner is None:
+        roster_id_to_owner = {
+            r["roster_id"]: str(r.get("owner_id"))
+            for r in rosters
+        }
 
     picks_by_owner = defaultdict(list)
 
-    for raw_pick in all_picks:
-        pick = _normalize_pick(raw_pick, roster_id_to_owner)
-
-        # Only attach if ownership resolved correctly
-        if pick["current_owner_id"]:
-            picks_by_owner[pick["current_owner_id"]].append(pick)
+    with table.lock:
+        for key, current_roster_id in table.owners.items():
+            season, rd, original_roster_id = key
+            owner_id = roster_id_to_owner.get(current_roster_id)
 
-    return dict(picks_by_owner)
+            # Only attach if ownership resolved correctly
+            if not owner_id:
+                continue
 
+            picks_by_owner[owner_id].append({
+                "season": season,
+                "round": rd,
+                "original_owner_id": roster_id_to_owner.get(original_roster_id),
+                "current_owner_id": owner_id,
+                "source": "traded" if table.is_traded(key) else "generated"
+            })
 
-def _normalize_pick(pick: dict, roster_id_to_owner: dict) -> dict:
-    return {
-        "season": int(pick["season"]),
-        "round": int(pick["round"]),
-        "original_owner_id": roster_id_to_owner.get(
-            int(pick["original_owner_roster_id"])
-        ),
-        "current_owner_id": roster_id_to_owner.get(
-            int(pick["current_owner_roster_id"])
-        ),
-        "source": pick.get("source", "generated")
-    }
-
+    return dict(picks_by_owner)
@@ -1,6 +1,9 @@
+import asyncio
+
 from backend.services.lineup import normalize_roster_slots
 from backend.services.draft_picks import build_league_picks
 from backend.services.leagues import normalize_league_settings
+from backend.services.roster_sync import ROSTER_SYNC
 
 
 def build_dynasty_snapshot(client, league_id: str) -> dict:
@@ -22,6 +25,38 @@ def build_dynasty_snapshot(client, league_id: str) -> dict:
     players_db = client.get_players()
     traded_picks = client.get_traded_picks(league_id)
 
+    return assemble_dynasty_snapshot(league_id, league, rosters, traded_picks, players_db)
+
+
+async def build_dynasty_snapshot_async(client, league_id: str) -> dict:
+    """
+    Async variant of build_dynasty_snapshot for AsyncSleeperClient.
+
+    League, rosters, traded picks and players are fetched concurrently.
+    """
+    league, rosters, traded_picks, players_db = await asyncio.gather(
+        client.get_league(league_id),
+        client.get_rosters(league_id),
+        client.get_traded_picks(league_id),
+        client.get_players()
+    )
+
+    if not league or "league_id" not in league:
+        raise ValueError(f"Invalid league_id or league not found: {league_id}")
+
+    return assemble_dynasty_snapshot(league_id, league, rosters, traded_picks, players_db)
+
+
+def assemble_dynasty_snapshot(
+    league_id: str,
+    league: dict,
+    rosters: list[dict],
+    traded_picks: list[dict],
+    players_db: dict
+) -> dict:
+    """
+    Shape already-fetched league data into a dynasty snapshot.
+    """
     # Build league metadata
     snapshot = {
         "league": {
@@ -40,56 +75,83 @@ def build_dynasty_snapshot(client, league_id: str) -> dict:
         "teams": {}
     }
 
-    # Build teams + players
-    for r in rosters:
-        owner_id = str(r.get("owner_id"))
+    # Only rosters that changed since the last sync are rebuilt;
+    # a new players index (daily refresh) rebuilds every team
+    teams_by_roster, _ = ROSTER_SYNC.sync(
+        league_id,
+        rosters,
+        lambda r: _build_team(r, players_db),
+        token=players_db
+    )
+
+    # roster_id → owner_id, shared with build_league_picks
+    roster_id_to_owner = {
+        roster_id: team["owner_id"]
+        for roster_id, team in teams_by_roster.items()
+    }
+
+    # Build draft picks next to the players
+    picks_by_owner = build_league_picks(
+        league=league,
+        rosters=rosters,
+        traded_picks=traded_picks,
+        roster_id_to_owner=roster_id_to_owner
+    )
+
+    # Synced teams are shared between snapshots; attach picks to a copy
+    for team in teams_by_roster.values():
+        owner_id = team["owner_id"]
 
         snapshot["teams"][owner_id] = {
-            "roster_id": r["roster_id"],
+            "roster_id": team["roster_id"],
 
             "assets": {
-                "players": [],
-                "picks": []
-            },
-
-            "lineup": {
-                "starters": r.get("starters", []),
-                "reserve": r.get("reserve", [])
+                "players": team["players"],
+                "picks": picks_by_owner.get(owner_id, [])
             },
 
-            "record": {
-                "wins": r.get("settings", {}).get("wins"),
-                "losses": r.get("settings", {}).get("losses"),
-                "ties": r.get("settings", {}).get("ties"),
-                "fpts": r.get("settings", {}).get("fpts"),
-                "fpts_against": r.get("settings", {}).get("fpts_against"),
-            }
+            "lineup": team["lineup"],
+            "record": team["record"]
         }
 
+    return snapshot
 
-        for pid in r.get("players", []):
-            player = players_db.get(str(pid))
-            if not player:
-                continue
-
-            snapshot["teams"][owner_id]["assets"]["players"].append({
-                "player_id": str(pid),
-                "name": player.get("full_name"),
-                "position": player.get("position"),
-                "team": player.get("team", "FA"),
-                "birth_date": player.get("birth_date"),
-            })
-
-
-    # Build and attach draft picks
-    picks_by_owner = build_league_picks(
-        league=league,
-        rosters=rosters,
-        traded_picks=traded_picks
-    )
 
-    for owner_id, picks in picks_by_owner.items():
-        if owner_id in snapshot["teams"]:
-            snapshot["teams"][owner_id]["picks"] = picks
+def _build_team(r: dict, players_db: dict) -> dict:
+    """
+    Build the roster-derived part of a team (everything except picks).
+    """
+    settings = r.get("settings") or {}
+
+    players = []
+    for pid in r.get("players") or []:
+        player = players_db.get(str(pid))
+        if not player:
+            continue
+
+        players.append({
+            "player_id": str(pid),
+            "name": player.full_name,
+            "position": player.position,
+            "team": player.team or "FA",
+            "birth_date": player.birth_date,
+        })
+
+    return {
+        "owner_id": str(r.get("owner_id")),
+        "roster_id": r["roster_id"],
+        "players": players,
+
+        "lineup": {
+            "starters": r.get("starters", []),
+            "reserve": r.get("reserve", [])
+        },
 
-    return snapshot
+        "record": {
+            "wins": settings.get("wins"),
+            "losses": settings.get("losses"),
+            "ties": settings.get("ties"),
+            "fpts": settings.get("fpts"),
+            "fpts_against": settings.get("fpts_against"),
+        }
+    }
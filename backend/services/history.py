@@ -0,0 +1,404 @@
+"""
+history.py
+
+Local, append-only history of league snapshots.
+
+Every recorded snapshot gets a row keyed by (league_id, taken_at).
+Snapshots are delta encoded: a full copy (keyframe) is stored every
+KEYFRAME_INTERVAL snapshots and the ones in between only hold the
+teams that changed since the previous snapshot.
+
+Values are kept in indexed tables so trend charts are plain local reads:
+
+- team_values:   totals per team and snapshot ("team value over time")
+- player_values: one row each time a player's owner or KTC value
+                 changes in a league ("player KTC trend")
+
+This module contains NO API calls.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+import zlib
+
+from backend.cache import TTLCache
+from backend.storage import data_path
+
+
+HISTORY_FILE = "history.sqlite3"
+
+# A full snapshot every N snapshots of a league bounds reconstruction cost
+KEYFRAME_INTERVAL = 30
+
+# Minimum seconds between two recorded snapshots of the same league
+SNAPSHOT_MIN_INTERVAL = 3600
+
+# Team totals persisted per snapshot
+TEAM_VALUE_COLUMNS = ("QB", "RB", "WR", "TE", "OTHER", "PICKS", "PLAYERS", "TOTAL")
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY,
+    league_id TEXT NOT NULL,
+    taken_at REAL NOT NULL,
+    season INTEGER,
+    keyframe INTEGER NOT NULL,
+    data BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS snapshots_league_time ON snapshots (league_id, taken_at);
+
+CREATE TABLE IF NOT EXISTS team_values (
+    snapshot_id INTEGER NOT NULL,
+    league_id TEXT NOT NULL,
+    owner_id TEXT NOT NULL,
+    taken_at REAL NOT NULL,
+    qb REAL, rb REAL, wr REAL, te REAL, other REAL,
+    picks REAL, players REAL, total REAL
+);
+CREATE INDEX IF NOT EXISTS team_values_league_owner
+    ON team_values (league_id, owner_id, taken_at);
+
+CREATE TABLE IF NOT EXISTS player_values (
+    snapshot_id INTEGER NOT NULL,
+    league_id TEXT NOT NULL,
+    player_id TEXT NOT NULL,
+    taken_at REAL NOT NULL,
+    owner_id TEXT,
+    ktc_value REAL
+);
+CREATE INDEX IF NOT EXISTS player_values_player
+    ON player_values (player_id, taken_at);
+
+CREATE TABLE IF NOT EXISTS player_state (
+    league_id TEXT NOT NULL,
+    player_id TEXT NOT NULL,
+    owner_id TEXT,
+    ktc_value REAL,
+    PRIMARY KEY (league_id, player_id)
+);
+"""
+
+
+def _encode(data) -> bytes:
+    return zlib.compress(json.dumps(data, separators=(",", ":")).encode("utf-8"))
+
+
+def _decode(blob: bytes):
+    return json.loads(zlib.decompress(blob))
+
+
+def diff_snapshots(previous: dict, current: dict) -> dict:
+    """
+    Teams (and league metadata) of `current` that differ from `previous`.
+    """
+    delta = {
+        "teams": {
+            owner_id: team
+            for owner_id, team in current["teams"].items()
+            if previous["teams"].get(owner_id) != team
+        },
+        "removed": [
+            owner_id for owner_id in previous["teams"]
+            if owner_id not in current["teams"]
+        ]
+    }
+
+    if previous["league"] != current["league"]:
+        delta["league"] = current["league"]
+
+    return delta
+
+
+def apply_delta(previous: dict, delta: dict) -> dict:
+    """
+    Rebuild a snapshot from the previous one and its delta.
+    """
+    teams = {
+        owner_id: team
+        for owner_id, team in previous["teams"].items()
+        if owner_id not in delta["removed"]
+    }
+    teams.update(delta["teams"])
+
+    return {"league": delta.get("league", previous["league"]), "teams": teams}
+
+
+class SnapshotStore:
+    """
+    SQLite-backed snapshot history (WAL mode, one connection per thread).
+    """
+
+    def __init__(self, path: str | None = None):
+        self.path = path or data_path(HISTORY_FILE)
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+
+        # league_id → (snapshot_id, snapshot, snapshots since keyframe)
+        self._heads = TTLCache("history_heads", maxsize=256, ttl=3600 * 6)
+
+        conn = self._connect()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+
+        return conn
+
+
+    def append(
+        self,
+        snapshot: dict,
+        values: dict | None = None,
+        taken_at: float | None = None,
+        min_interval: float = 0
+    ) -> int | None:
+        """
+        Record a snapshot, and optionally its build_league_values output,
+        unless the league has one from the last `min_interval` seconds.
+
+        Returns the new snapshot id, or None if it was skipped.
+        """
+        league_id = snapshot["league"]["league_id"]
+        taken_at = time.time() if taken_at is None else taken_at
+
+        # Most calls are skipped: check without taking the write lock first
+        if min_interval and taken_at - self.last_taken_at(league_id) < min_interval:
+            return None
+
+        with self._write_lock, self._connect() as conn:
+            # Serialize writers across workers, so deltas chain in id order
+            conn.execute("BEGIN IMMEDIATE")
+
+            # Authoritative check: another worker may have recorded meanwhile
+            if min_interval and taken_at - self.last_taken_at(league_id) < min_interval:
+                return None
+
+            head = self._head(league_id)
+
+            if head is None or head[2] + 1 >= KEYFRAME_INTERVAL:
+                keyframe, data, since_keyframe = 1, snapshot, 0
+            else:
+                keyframe, data, since_keyframe = 0, diff_snapshots(head[1], snapshot), head[2] + 1
+
+            cur = conn.execute(
+                "INSERT INTO snapshots (league_id, taken_at, season, keyframe, data)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (league_id, taken_at, snapshot["league"].get("season"), keyframe, _encode(data))
+            )
+            snapshot_id = cur.lastrowid
+
+            if values is not None:
+                self._record_values(conn, snapshot_id, league_id, taken_at, values)
+
+        self._heads.set(league_id, (snapshot_id, snapshot, since_keyframe))
+
+        return snapshot_id
+
+
+    def _record_values(self, conn, snapshot_id, league_id, taken_at, values):
+        conn.executemany(
+            "INSERT INTO team_values (snapshot_id, league_id, owner_id, taken_at,"
+            " qb, rb, wr, te, other, picks, players, total)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (snapshot_id, league_id, owner_id, taken_at,
+                 *(team["totals"][col] for col in TEAM_VALUE_COLUMNS))
+                for owner_id, team in values["teams"].items()
+            ]
+        )
+
+        # Only players whose owner or value moved get a history row
+        state = {
+            row["player_id"]: (row["owner_id"], row["ktc_value"])
+            for row in conn.execute(
+                "SELECT player_id, owner_id, ktc_value FROM player_state WHERE league_id = ?",
+                (league_id,)
+            )
+        }
+
+        current = {
+            p["player_id"]: (owner_id, p["ktc_value"])
+            for owner_id, team in values["teams"].items()
+            for p in team["players"]
+        }
+
+        # Dropped players keep their last value with no owner
+        for player_id, (owner_id, value) in state.items():
+            if player_id not in current and owner_id is not None:
+                current[player_id] = (None, value)
+
+        changes = [
+            (player_id, owner_id, value)
+            for player_id, (owner_id, value) in current.items()
+            if state.get(player_id) != (owner_id, value)
+        ]
+
+        conn.executemany(
+            "INSERT INTO player_values (snapshot_id, league_id, player_id, taken_at, owner_id, ktc_value)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            [(snapshot_id, league_id, pid, taken_at, owner, value) for pid, owner, value in changes]
+        )
+        conn.executemany(
+            "INSERT OR REPLACE INTO player_state (league_id, player_id, owner_id, ktc_value)"
+            " VALUES (?, ?, ?, ?)",
+            [(league_id, pid, owner, value) for pid, owner, value in changes]
+        )
+
+
+    def _head(self, league_id: str):
+        """
+        Latest (snapshot_id, snapshot, snapshots since keyframe) of a league.
+        """
+        row = self._connect().execute(
+            "SELECT MAX(id) FROM snapshots WHERE league_id = ?",
+            (league_id,)
+        ).fetchone()
+
+        if row[0] is None:
+            return None
+
+        # Reuse the cached head unless another worker appended since
+        head = self._heads.get(league_id)
+        if head is not None and head[0] == row[0]:
+            return head
+
+        return self._reconstruct(league_id, row[0])
+
+
+    def _reconstruct(self, league_id: str, snapshot_id: int):
+        conn = self._connect()
+
+        # Nearest keyframe at or before the requested snapshot
+        rows = conn.execute(
+            "SELECT id, keyframe, data FROM snapshots"
+            " WHERE league_id = ? AND id <= ?"
+            "   AND id >= (SELECT MAX(id) FROM snapshots"
+            "              WHERE league_id = ? AND id <= ? AND keyframe = 1)"
+            " ORDER BY id",
+            (league_id, snapshot_id, league_id, snapshot_id)
+        ).fetchall()
+
+        if not rows:
+            return None
+
+        snapshot = _decode(rows[0]["data"])
+        for row in rows[1:]:
+            snapshot = apply_delta(snapshot, _decode(row["data"]))
+
+        return snapshot_id, snapshot, len(rows) - 1
+
+
+    def last_taken_at(self, league_id: str) -> float:
+        row = self._connect().execute(
+            "SELECT MAX(taken_at) FROM snapshots WHERE league_id = ?",
+            (league_id,)
+        ).fetchone()
+
+        return row[0] or 0
+
+
+    def load(self, league_id: str, at: float | None = None) -> dict | None:
+        """
+        Return the latest snapshot of a league taken at or before `at`
+        (default: now), or None.
+        """
+        row = self._connect().execute(
+            "SELECT id, taken_at FROM snapshots WHERE league_id = ? AND taken_at <= ?"
+            " ORDER BY id DESC LIMIT 1",
+            (league_id, time.time() if at is None else at)
+        ).fetchone()
+
+        if row is None:
+            return None
+
+        _, snapshot, _ = self._reconstruct(league_id, row["id"])
+
+        return {**snapshot, "taken_at": row["taken_at"]}
+
+
+    def list_snapshots(self, league_id: str) -> list[dict]:
+        return [
+            dict(row) for row in self._connect().execute(
+                "SELECT id, taken_at, season FROM snapshots WHERE league_id = ? ORDER BY taken_at",
+                (league_id,)
+            )
+        ]
+
+
+    def team_value_history(
+        self,
+        league_id: str,
+        owner_id: str | None = None,
+        since: float = 0
+    ) -> list[dict]:
+        """
+        Team totals over time, oldest first.
+        """
+        query = (
+            "SELECT owner_id, taken_at, qb, rb, wr, te, other, picks, players, total"
+            " FROM team_values WHERE league_id = ? AND taken_at >= ?"
+        )
+        params = [league_id, since]
+
+        if owner_id is not None:
+            query += " AND owner_id = ?"
+            params.append(owner_id)
+
+        return [dict(row) for row in self._connect().execute(query + " ORDER BY taken_at", params)]
+
+
+    def player_value_history(
+        self,
+        player_id: str,
+        league_id: str | None = None,
+        since: float = 0
+    ) -> list[dict]:
+        """
+        Change points of a player's owner and KTC value, oldest first.
+
+        Values hold until the next row, so charts fill forward.
+        """
+        query = (
+            "SELECT league_id, taken_at, owner_id, ktc_value"
+            " FROM player_values WHERE player_id = ? AND taken_at >= ?"
+        )
+        params = [player_id, since]
+
+        if league_id is not None:
+            query += " AND league_id = ?"
+            params.append(league_id)
+
+        return [dict(row) for row in self._connect().execute(query + " ORDER BY taken_at", params)]
+
+
+# Process-wide store, opened on first use
+_STORE = None
+_STORE_LOCK = threading.Lock()
+
+
+def get_snapshot_store() -> SnapshotStore:
+    global _STORE
+
+    with _STORE_LOCK:
+        if _STORE is None:
+            _STORE = SnapshotStore()
+
+    return _STORE
+
+
+def record_snapshot(snapshot: dict, values: dict | None = None, min_interval: float = SNAPSHOT_MIN_INTERVAL):
+    """
+    Append a snapshot unless the league was recorded in the last `min_interval` seconds.
+
+    Returns the new snapshot id, or None if it was skipped.
+    """
+    return get_snapshot_store().append(snapshot, values, min_interval=min_interval)
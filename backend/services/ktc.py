@@ -5,78 +5,143 @@ Credits to "ees4" for the KTC Scraper:
 https://github.com/ees4/KeepTradeCut-Scraper/blob/main
 
 This module is responsible for:
-- Scraping player dynasty values from KeepTradeCut (Superflex)
+- Scraping player dynasty values from KeepTradeCut (Superflex), pages in parallel
 - Cleaning and normalizing scraped player names
 - Assigning positional ranks based on value
-- Caching results to avoid repeated scraping
+- Caching results to avoid repeated scraping or rebuilding unchanged rankings
+- Recording every scrape in the per-day KTC history (value trends)
 """
 
+import hashlib
+import logging
 import requests
-import time
-from bs4 import BeautifulSoup
+import sqlite3
+from bs4 import BeautifulSoup, SoupStrainer
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+
+from backend.cache import SingleFlight, StaleWhileRevalidateCache
+from backend.services.ktc_history import MIN_SCRAPE_RATIO, get_ktc_history_store
+
+
+logger = logging.getLogger(__name__)
 
 
 # Base URL for KeepTradeCut Superflex dynasty rankings
-# Filters restrict results to QB, WR, RB, TE only
-KTC_URL = "https://keeptradecut.com/dynasty-rankings?page={page}&filters=QB|WR|RB|TE&format=0"
+# Filters restrict results to QB, WR, RB, TE and rookie draft picks (RDP)
+KTC_URL = "https://keeptradecut.com/dynasty-rankings?page={page}&filters=QB|WR|RB|TE|RDP&format=0"
 
+# Number of ranking pages scraped (50 rows each): 10 pages cover the
+# player pool, 2 more make room for the rookie pick rows mixed in
+KTC_PAGES = 12
 
-def scrape_ktc_sf():
+# Pages fetched at the same time
+KTC_MAX_WORKERS = 10
+
+# Seconds to wait for a single page
+KTC_REQUEST_TIMEOUT = 15
+
+# Pooled session so concurrent page fetches reuse TLS connections
+KTC_SESSION = requests.Session()
+KTC_SESSION.mount("https://", HTTPAdapter(pool_maxsize=KTC_MAX_WORKERS))
+
+# lxml is much faster than the pure-Python parser; use it when installed
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
+# Only build the tree for player rows, skip the rest of the page
+PLAYER_ROWS = SoupStrainer(class_="onePlayer")
+
+
+def fetch_ktc_pages() -> list[bytes]:
     """
-    Scrape KeepTradeCut Superflex dynasty rankings.
+    Download all ranking pages concurrently over the pooled session.
 
-    Returns a flat list of players with:
-    - name (cleaned for matching)
-    - position
-    - value
-    - pos_rank (assigned later)
+    Raises on any non-2xx page (rate limits, outages), so a partial
+    scrape never replaces the cached values.
+    """
+    def fetch(page):
+        res = KTC_SESSION.get(KTC_URL.format(page=page), timeout=KTC_REQUEST_TIMEOUT)
+        res.raise_for_status()
+        return res.content
+
+    with ThreadPoolExecutor(max_workers=KTC_MAX_WORKERS) as pool:
+        return list(pool.map(fetch, range(KTC_PAGES)))
+
+
+def hash_ktc_rows(page_rows: list[list[dict]]) -> list[str]:
+    """
+    Hash the parsed ranking rows of each page.
+
+    Hashing rows rather than raw HTML ignores per-request noise in
+    headers, footers and scripts while covering every row.
+    """
+    return [
+        hashlib.sha1(
+            "\n".join(f"{p['name']}|{p['position']}|{p['value']}" for p in rows).encode("utf-8")
+        ).hexdigest()
+        for rows in page_rows
+    ]
+
+
+def parse_ktc_page(html: bytes) -> list[dict]:
+    """
+    Extract player rows (name, position, value) from one ranking page.
     """
     players = []
 
-    # Scrape the first 10 pages of rankings (covers full player pool)
-    for page in range(10):
-        url = KTC_URL.format(page=page)
-        html = requests.get(url).content
-        soup = BeautifulSoup(html, "html.parser")
+    soup = BeautifulSoup(html, HTML_PARSER, parse_only=PLAYER_ROWS)
+
+    # Each player row is represented by a "onePlayer" element
+    player_elements = soup.find_all(class_="onePlayer")
 
-        # Each player row is represented by a "onePlayer" element
-        player_elements = soup.find_all(class_="onePlayer")
+    for el in player_elements:
+        name_el   = el.find(class_="player-name")
+        pos_el    = el.find(class_="position")
+        value_el  = el.find(class_="value")
 
-        for el in player_elements:
-            name_el   = el.find(class_="player-name")
-            pos_el    = el.find(class_="position")
-            value_el  = el.find(class_="value")
+        # Skip malformed or non-player rows
+        if not name_el or not pos_el or not value_el:
+            continue
 
-            # Skip malformed or non-player rows
-            if not name_el or not pos_el or not value_el:
-                continue
+        raw_name = name_el.get_text(strip=True)
 
-            raw_name = name_el.get_text(strip=True)
+        # Remove trailing team or status suffixes (e.g., BUF, FA, RFA)
+        team_suffix = raw_name[-3:]
+        if team_suffix in ["FA", "RFA"] or team_suffix.isupper():
+            name = raw_name.replace(team_suffix, "").strip()
+        else:
+            name = raw_name
 
-            # Remove trailing team or status suffixes (e.g., BUF, FA, RFA)
-            team_suffix = raw_name[-3:]
-            if team_suffix in ["FA", "RFA"] or team_suffix.isupper():
-                name = raw_name.replace(team_suffix, "").strip()
-            else:
-                name = raw_name
+        # Remove rookie "R" suffix if present
+        if name.endswith("R"):
+            name = name[:-1].strip()
 
-            # Remove rookie "R" suffix if present
-            if name.endswith("R"):
-                name = name[:-1].strip()
+        # Extract position from positional ranking (e.g., "RB12" → "RB")
+        pos_rank = pos_el.get_text(strip=True)
+        position = pos_rank[:2]
 
-            # Extract position from positional ranking (e.g., "RB12" → "RB")
-            pos_rank = pos_el.get_text(strip=True)
-            position = pos_rank[:2]
+        # Convert KTC value into integer for sorting and aggregation
+        value = int(value_el.get_text(strip=True))
 
-            # Convert KTC value into integer for sorting and aggregation
-            value = int(value_el.get_text(strip=True))
+        players.append({
+            "name": name,
+            "position": position,
+            "value": value
+        })
+
+    return players
 
-            players.append({
-                "name": name,
-                "position": position,
-                "value": value
-            })
+
+def build_ktc_players(page_rows: list[list[dict]]) -> list[dict]:
+    """
+    Flatten parsed pages and assign positional ranks.
+    """
+    players = [p for rows in page_rows for p in rows]
 
     # Group players by position to assign positional ranks
     pos_groups = defaultdict(list)
@@ -93,33 +158,179 @@ def scrape_ktc_sf():
     return players
 
 
-# Cached KTC dataset (in-memory)
-KTC_CACHE = None
+def scrape_ktc_sf():
+    """
+    Scrape KeepTradeCut Superflex dynasty rankings.
+
+    Returns a flat list of players with:
+    - name (cleaned for matching)
+    - position
+    - value
+    - pos_rank
+    """
+    return build_ktc_players([parse_ktc_page(html) for html in fetch_ktc_pages()])
 
-# Timestamp of last successful scrape
-KTC_CACHE_TIME = 0
 
 # Cache time-to-live: 12 hours
 KTC_CACHE_TTL = 3600 * 12
 
+# Cached KTC dataset (in-memory); expired values are served
+# while one background scrape replaces them
+KTC_CACHE = StaleWhileRevalidateCache("ktc", KTC_CACHE_TTL, maxsize=1)
+KTC_KEY = "superflex"
+
+# Coalesces concurrent warm-ups from the KTC history
+KTC_STORE_FLIGHT = SingleFlight()
+
+# Per-page content hashes of the scrape behind KTC_CACHE
+KTC_PAGE_HASHES = None
+
+# Draft pick name → KTC entry, rebuilt when the KTC list object changes
+KTC_PICK_INDEX = {}
+KTC_PICK_INDEX_SOURCE = None
+
 
 def get_ktc_values():
     """
     Public entry point for retrieving KTC values.
 
     Uses cached data when available to avoid unnecessary scraping.
+    Only the very first call waits for a scrape; afterwards an
+    expired list is returned immediately and refreshed in the background.
     """
-    global KTC_CACHE, KTC_CACHE_TIME
+    # After a restart, serve the latest stored scrape instead of waiting
+    _, stored_at = KTC_CACHE.peek(KTC_KEY)
+    if not stored_at:
+        KTC_STORE_FLIGHT.do(KTC_KEY, _load_ktc_from_history)
 
-    # Return cached data if it is still fresh
-    if KTC_CACHE and (time.time() - KTC_CACHE_TIME) < KTC_CACHE_TTL:
-        return KTC_CACHE
+    return KTC_CACHE.get(KTC_KEY, refresh_ktc_values)
 
-    # Cache is missing or expired, scrape fresh data
-    data = scrape_ktc_sf()
 
-    # Update cache and timestamp
-    KTC_CACHE = data
-    KTC_CACHE_TIME = time.time()
+def refresh_ktc_values():
+    """
+    Scrape KTC and return the new value list.
+
+    When the pages are unchanged since the last scrape, the cached
+    list is returned as-is (same object, so dependent indexes stay valid).
+    Empty or truncated scrapes (see MIN_SCRAPE_RATIO) raise, so the
+    cache keeps serving the last good list.
+    """
+    global KTC_PAGE_HASHES
+
+    cached, _ = KTC_CACHE.peek(KTC_KEY)
+
+    page_rows = [parse_ktc_page(html) for html in fetch_ktc_pages()]
+
+    # An empty scrape means the page layout changed or KTC is blocking us
+    if not any(page_rows):
+        raise ValueError("KTC scrape returned no players")
+
+    hashes = hash_ktc_rows(page_rows)
+
+    # Rankings unchanged: keep the cached list (and indexes built on it)
+    if cached and hashes == KTC_PAGE_HASHES:
+        data = cached
+    else:
+        data = build_ktc_players(page_rows)
+
+        # Some pages came back empty (blocked, layout change): keep the old list
+        if cached and len(data) < len(cached) * MIN_SCRAPE_RATIO:
+            raise ValueError(
+                f"KTC scrape returned {len(data)} players, {len(cached)} cached"
+            )
+
+        KTC_PAGE_HASHES = hashes
+
+    _record_ktc_history(data)
 
     return data
+
+
+def _record_ktc_history(ktc_data: list[dict]):
+    """
+    Store today's values and attach 7/30-day deltas to every entry.
+    """
+    try:
+        store = get_ktc_history_store()
+        store.save(ktc_data)
+        store.annotate_trends(ktc_data)
+    except sqlite3.Error:
+        logger.exception("Could not record KTC history")
+
+
+def _load_ktc_from_history():
+    """
+    Seed an empty KTC cache with the latest stored scrape.
+
+    The copy keeps its original scrape time, so an old one is served
+    while a background scrape replaces it.
+    """
+    _, stored_at = KTC_CACHE.peek(KTC_KEY)
+    if stored_at:
+        return
+
+    try:
+        store = get_ktc_history_store()
+        latest = store.latest()
+
+        if latest is None:
+            return
+
+        data, scraped_at = latest
+        store.annotate_trends(data, scraped_at)
+    except sqlite3.Error:
+        logger.exception("Could not read KTC history")
+        return
+
+    KTC_CACHE.set(KTC_KEY, data, stored_at=scraped_at)
+
+
+def get_ktc_pick_index(ktc_data: list[dict]) -> dict[str, dict]:
+    """
+    Return the draft pick index for the current KTC list, built once per scrape.
+    """
+    global KTC_PICK_INDEX, KTC_PICK_INDEX_SOURCE
+
+    if KTC_PICK_INDEX_SOURCE is not ktc_data:
+        KTC_PICK_INDEX = build_ktc_pick_index(ktc_data)
+        KTC_PICK_INDEX_SOURCE = ktc_data
+
+    return KTC_PICK_INDEX
+
+
+def build_ktc_pick_index(ktc_data: list[dict]) -> dict[str, dict]:
+    """
+    Index KTC draft pick entries by lowercased name (e.g. "2026 mid 1st").
+
+    Picks are kept out of normalize_name, which would drop the
+    early/mid/late qualifier and merge distinct picks.
+    """
+    return {
+        item["name"].lower(): item
+        for item in ktc_data
+        if item["name"][:4].isdigit()
+    }
+
+
+def ordinal(n: int) -> str:
+    """
+    1 → "1st", 2 → "2nd", 3 → "3rd", 4 → "4th", ...
+    """
+    if 10 <= n % 100 <= 20:
+        return f"{n}th"
+
+    suffix = {1: "st", 2: "nd", 3: "rd"}.get(n % 10, "th")
+    return f"{n}{suffix}"
+
+
+def ktc_pick_entry(pick_index: dict, season: int, rd: int, tier: str = "mid"):
+    """
+    Find the KTC entry for a draft pick.
+
+    KTC lists the nearest drafts by tier ("2026 Early 1st") and later
+    ones by round only ("2028 1st"); both forms are tried.
+    """
+    return (
+        pick_index.get(f"{season} {tier} {ordinal(rd)}")
+        or pick_index.get(f"{season} {ordinal(rd)}")
+    )
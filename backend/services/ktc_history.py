@@ -0,0 +1,227 @@
+"""
+ktc_history.py
+
+Per-day history of KeepTradeCut values.
+
+Every scrape is stored as one row per player and day (a later scrape on
+the same day replaces that day's rows). After each store, 7 and 30 day
+value deltas are computed once and attached to the KTC entries, so
+request handlers read trends with a plain lookup.
+
+The latest stored scrape also seeds the KTC cache after a restart,
+instead of waiting for a fresh scrape.
+
+This module contains NO API calls.
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+
+from backend.storage import data_path
+
+
+logger = logging.getLogger(__name__)
+
+
+KTC_HISTORY_FILE = "ktc_history.sqlite3"
+
+# Trend windows in days, exposed as delta_<days> on each KTC entry
+TREND_WINDOWS = (7, 30)
+
+# A scrape smaller than this share of the latest stored one is treated
+# as truncated (blocked or broken pages) and not stored
+MIN_SCRAPE_RATIO = 0.8
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS ktc_days (
+    day TEXT PRIMARY KEY,
+    scraped_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS ktc_values (
+    day TEXT NOT NULL,
+    name TEXT NOT NULL,
+    position TEXT NOT NULL,
+    rank INTEGER NOT NULL,
+    value INTEGER NOT NULL,
+    pos_rank INTEGER,
+    PRIMARY KEY (day, name, position)
+) WITHOUT ROWID;
+"""
+
+
+def _day(ts: float) -> str:
+    return time.strftime("%Y-%m-%d", time.gmtime(ts))
+
+
+class KTCHistoryStore:
+    """
+    SQLite-backed KTC history (WAL mode, one connection per thread).
+    """
+
+    def __init__(self, path: str | None = None):
+        self.path = path or data_path(KTC_HISTORY_FILE)
+        self._local = threading.local()
+
+        conn = self._connect()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            self._local.conn = conn
+
+        return conn
+
+
+    def save(self, ktc_data: list[dict], scraped_at: float | None = None) -> str | None:
+        """
+        Store a scrape as the values of its day. Returns the day.
+
+        Empty or truncated scrapes (see MIN_SCRAPE_RATIO) are refused,
+        so they cannot replace a good copy of the day; returns None then.
+        """
+        scraped_at = time.time() if scraped_at is None else scraped_at
+        day = _day(scraped_at)
+
+        with self._connect() as conn:
+            (previous,) = conn.execute(
+                "SELECT COUNT(*) FROM ktc_values"
+                " WHERE day = (SELECT MAX(day) FROM ktc_days)"
+            ).fetchone()
+
+            if not ktc_data or len(ktc_data) < previous * MIN_SCRAPE_RATIO:
+                logger.warning(
+                    "Not storing KTC scrape of %d entries (latest stored: %d)",
+                    len(ktc_data), previous
+                )
+                return None
+
+            conn.execute("DELETE FROM ktc_values WHERE day = ?", (day,))
+            conn.executemany(
+                "INSERT OR REPLACE INTO ktc_values (day, name, position, rank, value, pos_rank)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (day, p["name"], p["position"], rank, p["value"], p.get("pos_rank"))
+                    for rank, p in enumerate(ktc_data)
+                ]
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO ktc_days (day, scraped_at) VALUES (?, ?)",
+                (day, scraped_at)
+            )
+
+        return day
+
+
+    def values_on(self, day: str) -> dict[tuple, int]:
+        """
+        (name, position) → value for the latest stored day on or before `day`.
+        """
+        conn = self._connect()
+
+        row = conn.execute("SELECT MAX(day) FROM ktc_days WHERE day <= ?", (day,)).fetchone()
+        if row[0] is None:
+            return {}
+
+        return {
+            (name, position): value
+            for name, position, value in conn.execute(
+                "SELECT name, position, value FROM ktc_values WHERE day = ?",
+                (row[0],)
+            )
+        }
+
+
+    def latest(self) -> tuple[list[dict], float] | None:
+        """
+        Return (ktc_data, scraped_at) of the newest stored scrape, or None.
+        """
+        conn = self._connect()
+
+        row = conn.execute(
+            "SELECT day, scraped_at FROM ktc_days ORDER BY day DESC LIMIT 1"
+        ).fetchone()
+
+        if row is None:
+            return None
+
+        day, scraped_at = row
+
+        data = [
+            {"name": name, "position": position, "value": value, "pos_rank": pos_rank}
+            for name, position, value, pos_rank in conn.execute(
+                "SELECT name, position, value, pos_rank FROM ktc_values"
+                " WHERE day = ? ORDER BY rank",
+                (day,)
+            )
+        ]
+
+        return data, scraped_at
+
+
+    def history(self, name: str, position: str | None = None, since: str = "") -> list[dict]:
+        """
+        Daily values of one KTC entry, oldest first.
+        """
+        query = "SELECT day, position, value, pos_rank FROM ktc_values WHERE name = ? AND day >= ?"
+        params = [name, since]
+
+        if position is not None:
+            query += " AND position = ?"
+            params.append(position)
+
+        return [
+            {"day": day, "position": pos, "value": value, "pos_rank": pos_rank}
+            for day, pos, value, pos_rank in self._connect().execute(query + " ORDER BY day", params)
+        ]
+
+
+    def annotate_trends(self, ktc_data: list[dict], scraped_at: float | None = None):
+        """
+        Set delta_7 / delta_30 on every KTC entry (None without history).
+
+        Entries are updated in place so indexes built on the list stay valid.
+        """
+        now = time.time() if scraped_at is None else scraped_at
+
+        for days in TREND_WINDOWS:
+            past = self.values_on(_day(now - days * 86400))
+
+            for p in ktc_data:
+                old = past.get((p["name"], p["position"]))
+                p[f"delta_{days}"] = p["value"] - old if old is not None else None
+
+
+# Process-wide store, opened on first use
+_STORE = None
+_STORE_LOCK = threading.Lock()
+
+
+def get_ktc_history_store() -> KTCHistoryStore:
+    global _STORE
+
+    with _STORE_LOCK:
+        if _STORE is None:
+            _STORE = KTCHistoryStore()
+
+    return _STORE
+
+
+def movers(players: list[dict], key: str, limit: int = 3) -> tuple[list[dict], list[dict]]:
+    """
+    Split players into top risers and fallers by a precomputed delta.
+    """
+    moved = [p for p in players if p.get(key)]
+    moved.sort(key=lambda p: p[key], reverse=True)
+
+    risers = [p for p in moved if p[key] > 0][:limit]
+    fallers = [p for p in reversed(moved) if p[key] < 0][:limit]
+
+    return risers, fallers
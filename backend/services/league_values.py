@@ -0,0 +1,192 @@
+"""
+league_values.py
+
+League-wide dynasty valuation.
+
+Responsibilities:
+- Enrich every team's players and draft picks with KTC values
+- Compute per-position totals for every team
+- Rank all teams per position, for picks and overall
+- Solve every team's optimal starting lineup ("starter strength")
+
+Works on a snapshot from build_dynasty_snapshot, so a whole league
+costs one set of Sleeper calls instead of one per owner.
+
+This module contains NO API calls.
+"""
+
+from backend.cache import TTLCache
+from backend.services.lineup import league_lineups
+from backend.services.pick_values import projected_draft_slots, value_picks
+from backend.services.valuation import (
+    POSITION_GROUPS,
+    RosterValues,
+    percentiles,
+    rank_desc,
+    summary_columns,
+)
+
+
+# Categories ranked across the league
+RANK_CATEGORIES = POSITION_GROUPS + ("PLAYERS", "TOTAL")
+
+# (league_id, owner_id) → (players, ktc_index, enriched players, roster value)
+# Reused while the team's synced player list and the KTC index are unchanged
+TEAM_VALUES_CACHE_TTL = 3600 * 6  # 6 hours
+TEAM_VALUES_CACHE_MAXSIZE = 16384  # teams kept before LRU eviction
+TEAM_VALUES_CACHE = TTLCache("team_values", TEAM_VALUES_CACHE_MAXSIZE, TEAM_VALUES_CACHE_TTL)
+
+
+def build_league_values(
+    snapshot: dict,
+    ktc_index: dict[str, dict],
+    pick_index: dict[str, dict]
+) -> dict:
+    """
+    Value every team in a league snapshot.
+
+    Args:
+        snapshot: output of build_dynasty_snapshot
+        ktc_index: Sleeper player_id → KTC entry (see get_ktc_index)
+        pick_index: KTC pick name → KTC entry (see build_ktc_pick_index)
+
+    Returns a dict with league metadata, per-team enriched assets,
+    totals, ranks and percentiles, and per-category rankings
+    (1 = most valuable).
+    """
+    owner_ids = list(snapshot["teams"])
+
+    # One row per asset across the whole league
+    assets, team_idx, positions = [], [], []
+
+    # Record and roster value per team, to project draft order
+    strength = {}
+
+    for i, owner_id in enumerate(owner_ids):
+        team = snapshot["teams"][owner_id]
+
+        players, roster_value = enrich_team_players(
+            snapshot["league"]["league_id"],
+            owner_id,
+            team["assets"]["players"],
+            ktc_index
+        )
+
+        assets.extend(players)
+        team_idx.extend([i] * len(players))
+        positions.extend(p["position"] for p in players)
+
+        strength[owner_id] = {**team["record"], "value": roster_value}
+
+    # Picks are priced early/mid/late by the original owner's projected slot
+    slots = projected_draft_slots(strength)
+
+    for i, owner_id in enumerate(owner_ids):
+        picks = value_picks(
+            snapshot["teams"][owner_id]["assets"]["picks"],
+            slots,
+            len(owner_ids),
+            pick_index
+        )
+
+        assets.extend(picks)
+        team_idx.extend([i] * len(picks))
+        positions.extend(["PICKS"] * len(picks))
+
+    values = [a["ktc_value"] for a in assets]
+    frame = RosterValues.from_rows(owner_ids, zip(team_idx, positions, values))
+
+    # Grouped reductions for every team at once
+    columns = summary_columns(frame.totals())
+    ranks = {cat: rank_desc(columns[cat]) for cat in RANK_CATEGORIES}
+    pcts = {cat: percentiles(ranks[cat]) for cat in RANK_CATEGORIES}
+
+    # Rank of each player among all rostered players at his position
+    league_pos_ranks = frame.group_ranks(by_team=False)
+
+    teams = {
+        owner_id: {
+            "roster_id": snapshot["teams"][owner_id]["roster_id"],
+            "players": [],
+            "picks": [],
+            "totals": {cat: int(columns[cat][i]) for cat in RANK_CATEGORIES},
+            "ranks": {cat: int(ranks[cat][i]) for cat in RANK_CATEGORIES},
+            "percentiles": {cat: round(float(pcts[cat][i]), 1) for cat in RANK_CATEGORIES}
+        }
+        for i, owner_id in enumerate(owner_ids)
+    }
+
+    # Walk assets sorted by team, group and value to fill display lists
+    for row in frame.order():
+        team = teams[owner_ids[frame.team_idx[row]]]
+
+        if positions[row] == "PICKS":
+            team["picks"].append(assets[row])
+        else:
+            team["players"].append({
+                **assets[row],
+                "league_pos_rank": int(league_pos_ranks[row])
+            })
+
+    for team in teams.values():
+        team["players"].sort(key=lambda p: p["ktc_value"], reverse=True)
+        team["picks"].sort(key=lambda p: (p["season"], p["round"]))
+
+    lineups = league_lineups(
+        {owner_id: team["players"] for owner_id, team in teams.items()},
+        snapshot["league"]["roster_slots"]
+    )
+
+    for owner_id, lineup in lineups.items():
+        teams[owner_id]["starters"] = lineup
+
+    rankings = {
+        cat: [owner_ids[i] for i in ranks[cat].argsort()]
+        for cat in RANK_CATEGORIES
+    }
+    rankings["STARTERS"] = sorted(lineups, key=lambda owner_id: lineups[owner_id]["rank"])
+
+    return {
+        "league": snapshot["league"],
+        "teams": teams,
+        "rankings": rankings
+    }
+
+
+def enrich_team_players(
+    league_id: str,
+    owner_id: str,
+    players: list[dict],
+    ktc_index: dict[str, dict]
+) -> tuple[list[dict], int]:
+    """
+    Attach KTC value and positional rank to one team's players.
+
+    Snapshots share the player list of teams whose roster did not
+    change (see roster_sync), so only changed teams are enriched again.
+
+    Returns the enriched players and their total value.
+    """
+    key = (league_id, owner_id)
+
+    cached = TEAM_VALUES_CACHE.get(key)
+    if cached is not None and cached[0] is players and cached[1] is ktc_index:
+        return cached[2], cached[3]
+
+    enriched = []
+    roster_value = 0
+
+    for p in players:
+        ktc_entry = ktc_index.get(p["player_id"])
+        value = ktc_entry["value"] if ktc_entry else 0
+
+        enriched.append({
+            **p,
+            "ktc_value": value,
+            "ktc_pos_rank": ktc_entry["pos_rank"] if ktc_entry else None
+        })
+        roster_value += value
+
+    TEAM_VALUES_CACHE.set(key, (players, ktc_index, enriched, roster_value))
+
+    return enriched, roster_value
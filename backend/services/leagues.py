@@ -1,74 +1,251 @@
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
 import time
 
+from backend.cache import StaleWhileRevalidateCache
+
 
 # User Leagues Cache
 # Cache is keyed by user_id because leagues are user-specific
-USER_LEAGUES_CACHE = {}
-USER_LEAGUES_CACHE_TIME = {}
 USER_LEAGUES_CACHE_TTL = 3600 * 6  # 6 hours
+USER_LEAGUES_CACHE_MAXSIZE = 4096  # users kept before LRU eviction
+USER_LEAGUES_CACHE = StaleWhileRevalidateCache(
+    "user_leagues", USER_LEAGUES_CACHE_TTL, maxsize=USER_LEAGUES_CACHE_MAXSIZE
+)
+
+# First season Sleeper supports for dynasty leagues
+FIRST_SEASON = 2018
 
+# Maximum number of seasons fetched at the same time
+USER_LEAGUES_MAX_CONCURRENCY = 8
 
-def get_all_user_leagues(client, user_id: str, start_year=2018, end_year=2025):
+
+def get_all_user_leagues(
+    client,
+    user_id: str,
+    start_year=FIRST_SEASON,
+    end_year=None,
+    max_concurrency=USER_LEAGUES_MAX_CONCURRENCY
+):
     """
     Retrieve and group all dynasty leagues for a user across multiple seasons.
 
     Responsibilities:
-    - Query Sleeper for user leagues season-by-season
+    - Query Sleeper for user leagues, all seasons concurrently
     - Filter out non-dynasty leagues
     - Group leagues by league name
     - Preserve league_id and season for frontend selection
     - Sort seasons newest → oldest for usability
     """
 
-    # --------------------------------------------------
-    # Cache check (fast exit)
-    # --------------------------------------------------
-    cached = USER_LEAGUES_CACHE.get(user_id)
-    cached_time = USER_LEAGUES_CACHE_TIME.get(user_id)
+    def load():
+        # Default the range to the latest season Sleeper knows about
+        last = end_year
+        if last is None:
+            last = latest_season(client.get_nfl_state())
 
-    if cached and cached_time and (time.time() - cached_time) < USER_LEAGUES_CACHE_TTL:
-        # print("CACHE HIT: user leagues", user_id)
-        return cached
-    
-    # print("CACHE MISS: user leagues", user_id)
+        seasons = list(range(start_year, last + 1))
 
-    # Dictionary keyed by league name, each value is a list of seasons
-    grouped = defaultdict(list)
+        # Fetch every season in parallel, capped at max_concurrency threads
+        workers = max(1, min(max_concurrency, len(seasons)))
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = pool.map(
+                lambda season: client.get_user_leagues(user_id, season),
+                seasons
+            )
+            leagues_by_season = dict(zip(seasons, results))
+
+        return _group_dynasty_leagues(leagues_by_season)
+
+    # Cached per user; concurrent misses for one user share one scan
+    return USER_LEAGUES_CACHE.get((user_id, start_year, end_year), load)
+
+
+async def get_all_user_leagues_async(
+    client,
+    user_id: str,
+    start_year=FIRST_SEASON,
+    end_year=None,
+    max_concurrency=USER_LEAGUES_MAX_CONCURRENCY
+):
+    """
+    Async variant of get_all_user_leagues for AsyncSleeperClient.
+
+    Shares the same cache and grouping rules as the sync version.
+    """
+
+    async def load():
+        leagues_by_season = {
+            season: leagues
+            async for season, leagues in _scan_user_leagues_async(
+                client, user_id, start_year, end_year, max_concurrency
+            )
+        }
+
+        return _group_dynasty_leagues(leagues_by_season)
+
+    return await USER_LEAGUES_CACHE.aget((user_id, start_year, end_year), load)
 
-    # Iterate through each NFL season in the configured range
-    for season in range(start_year, end_year + 1):
-        leagues = client.get_user_leagues(user_id, season)
 
-        for league in leagues:
+async def stream_user_leagues_async(
+    client,
+    user_id: str,
+    start_year=FIRST_SEASON,
+    end_year=None,
+    max_concurrency=USER_LEAGUES_MAX_CONCURRENCY
+):
+    """
+    Yield a user's dynasty leagues season by season, as each fetch completes.
+
+    Records:
+        {"type": "league", "name", "league_id", "season", "avatar"}
+        {"type": "season", "season", "count"} once a season is complete
+        {"type": "done"} after the last season
+
+    Seasons arrive in completion order, not chronological order. A
+    cached scan (even a stale one) is yielded at once; a completed scan
+    is stored in the same cache as get_all_user_leagues.
+    """
+    key = (user_id, start_year, end_year)
+
+    cached, _ = USER_LEAGUES_CACHE.peek(key)
+    if cached is not None:
+        # Stale entries are served as-is and refreshed in the background
+        grouped = await get_all_user_leagues_async(
+            client, user_id, start_year, end_year, max_concurrency
+        )
+
+        for name, seasons in grouped.items():
+            for entry in seasons:
+                yield {"type": "league", "name": name, **entry}
+
+        yield {"type": "done"}
+        return
+
+    leagues_by_season = {}
 
-            # Sleeper league type:
-            # 2 = dynasty, other values represent redraft / bestball / etc.
-            if league.get("settings", {}).get("type") != 2:
-                continue
+    async for season, leagues in _scan_user_leagues_async(
+        client, user_id, start_year, end_year, max_concurrency
+    ):
+        leagues_by_season[season] = leagues
+
+        entries = _dynasty_league_entries(season, leagues)
+        for entry in entries:
+            yield {"type": "league", **entry}
+
+        yield {"type": "season", "season": season, "count": len(entries)}
+
+    USER_LEAGUES_CACHE.set(key, _group_dynasty_leagues(leagues_by_season))
+
+    yield {"type": "done"}
+
+
+async def _scan_user_leagues_async(client, user_id, start_year, end_year, max_concurrency):
+    """
+    Fetch every season of a user's leagues concurrently and yield
+    (season, leagues) pairs in completion order.
+    """
+    last = end_year
+    if last is None:
+        last = latest_season(await client.get_nfl_state())
 
-            # Store only the fields needed by the frontend
-            grouped[league["name"]].append({
-                "league_id": league["league_id"],
-                "season": season,
-                "avatar": league.get("avatar")
-            })
+    seasons = list(range(start_year, last + 1))
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def fetch(season):
+        async with semaphore:
+            return season, await client.get_user_leagues(user_id, season)
+
+    # All seasons in flight at once, so a cold lookup costs ~one round-trip
+    for next_done in asyncio.as_completed([fetch(season) for season in seasons]):
+        yield await next_done
+
+
+def latest_season(nfl_state: dict) -> int:
+    """
+    Determine the newest season that can contain user leagues.
+
+    During the offseason Sleeper already creates leagues for the
+    upcoming year, which is reported as league_create_season.
+    """
+    candidates = [
+        nfl_state.get(key)
+        for key in ("season", "league_season", "league_create_season")
+    ] if isinstance(nfl_state, dict) else []
+
+    seasons = [int(s) for s in candidates if s]
+
+    # Fall back to the calendar year if Sleeper returned nothing usable
+    return max(seasons) if seasons else time.gmtime().tm_year
+
+
+def current_leagues(grouped: dict, season: int) -> list[dict]:
+    """
+    Pick the current season of every dynasty league of a user.
+
+    Args:
+        grouped: output of get_all_user_leagues (name → seasons, newest first)
+        season: latest season (see latest_season)
+
+    Leagues whose newest season is older than the previous season are
+    dormant and skipped. During the offseason some leagues are already
+    renewed for the new year and others are not, so the previous season
+    still counts as current.
+    """
+    return [
+        {"name": name, **seasons[0]}
+        for name, seasons in grouped.items()
+        if seasons and seasons[0]["season"] >= season - 1
+    ]
+
+
+def _group_dynasty_leagues(leagues_by_season: dict[int, list]) -> dict:
+    """
+    Filter dynasty leagues and group them by league name.
+    """
+    # Dictionary keyed by league name, each value is a list of seasons
+    grouped = defaultdict(list)
+
+    # Seasons may arrive in completion order; group them oldest first
+    for season, leagues in sorted(leagues_by_season.items()):
+        for entry in _dynasty_league_entries(season, leagues):
+            grouped[entry.pop("name")].append(entry)
 
     # Sort each league's seasons from newest to oldest
     # This allows the UI to default to the most recent season
     for lst in grouped.values():
         lst.sort(key=lambda x: x["season"], reverse=True)
 
-    # --------------------------------------------------
-    # Store result in cache
-    # --------------------------------------------------
-    if user_id not in USER_LEAGUES_CACHE:
-        USER_LEAGUES_CACHE[user_id] = grouped
-        USER_LEAGUES_CACHE_TIME[user_id] = time.time()
-
     return grouped
 
 
+def _dynasty_league_entries(season: int, leagues: list | None) -> list[dict]:
+    """
+    Keep the dynasty leagues of one season, reduced to the fields the
+    frontend needs.
+    """
+    entries = []
+
+    for league in leagues or []:
+
+        # Sleeper league type:
+        # 2 = dynasty, other values represent redraft / bestball / etc.
+        if league.get("settings", {}).get("type") != 2:
+            continue
+
+        # Store only the fields needed by the frontend
+        entries.append({
+            "name": league["name"],
+            "league_id": league["league_id"],
+            "season": season,
+            "avatar": league.get("avatar")
+        })
+
+    return entries
+
+
 def normalize_league_settings(settings: dict) -> dict:
     """
     Extract only league settings relevant for dynasty analysis.
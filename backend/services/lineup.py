@@ -29,3 +29,254 @@ def normalize_roster_slots(roster_positions: list[str], settings: dict) -> dict:
         roster_slots["TAXI"] = taxi_slots
 
     return dict(roster_slots)
+
+
+# Positions each flex slot accepts, most restrictive first
+FLEX_ELIGIBILITY = {
+    "REC_FLEX": ("WR", "TE"),
+    "WRRB_FLEX": ("RB", "WR"),
+    "FLEX": ("RB", "WR", "TE"),
+    "SUPER_FLEX": ("QB", "RB", "WR", "TE"),
+    "IDP_FLEX": ("DL", "LB", "DB"),
+}
+
+# Dedicated starter slots valued by KTC
+STARTER_POSITIONS = ("QB", "RB", "WR", "TE")
+
+# Slot counts that are not starting slots
+NON_STARTER_SLOTS = ("BN", "IR", "TAXI")
+
+
+def starter_slots(roster_slots: dict) -> tuple[list[str], list[str]]:
+    """
+    Split starting slots into dedicated positions and flex slots.
+
+    Returns (dedicated positions, flex slots), one entry per slot
+    count for flex, most restrictive flex first.
+    """
+    dedicated = [
+        slot for slot in roster_slots
+        if slot not in FLEX_ELIGIBILITY and slot not in NON_STARTER_SLOTS
+    ]
+    flex = [slot for slot in FLEX_ELIGIBILITY for _ in range(roster_slots.get(slot, 0))]
+
+    return dedicated, flex
+
+
+def _nested(flex: list[str]) -> bool:
+    """
+    True when each flex slot accepts a subset of the next one's positions,
+    the case where filling the most restrictive slot first is optimal.
+    """
+    return all(
+        set(FLEX_ELIGIBILITY[a]) <= set(FLEX_ELIGIBILITY[b])
+        for a, b in zip(flex, flex[1:])
+    )
+
+
+def _flex_positions(flex: list[str]) -> list[str]:
+    """
+    Positions accepted by any of the flex slots, in slot order.
+    """
+    return list(dict.fromkeys(pos for slot in flex for pos in FLEX_ELIGIBILITY[slot]))
+
+
+def _min_cost_assignment(cost: list[list[float]]) -> list[int]:
+    """
+    Hungarian algorithm: column assigned to each row at minimum total cost.
+
+    Requires at least as many columns as rows. O(rows² · columns).
+    """
+    n, m = len(cost), len(cost[0])
+    inf = float("inf")
+
+    # Row / column potentials and the row matched to each column (1-based, 0 = none)
+    u, v = [0.0] * (n + 1), [0.0] * (m + 1)
+    match, way = [0] * (m + 1), [0] * (m + 1)
+
+    for row in range(1, n + 1):
+        match[0] = row
+        col = 0
+        minv = [inf] * (m + 1)
+        used = [False] * (m + 1)
+
+        # Grow an alternating path until it reaches a free column
+        while match[col]:
+            used[col] = True
+            i = match[col]
+            delta, next_col = inf, 0
+
+            for j in range(1, m + 1):
+                if not used[j]:
+                    reduced = cost[i - 1][j - 1] - u[i] - v[j]
+                    if reduced < minv[j]:
+                        minv[j], way[j] = reduced, col
+                    if minv[j] < delta:
+                        delta, next_col = minv[j], j
+
+            for j in range(m + 1):
+                if used[j]:
+                    u[match[j]] += delta
+                    v[j] -= delta
+                else:
+                    minv[j] -= delta
+
+            col = next_col
+
+        # Flip the path
+        while col:
+            prev = way[col]
+            match[col] = match[prev]
+            col = prev
+
+    assigned = [0] * n
+    for j in range(1, m + 1):
+        if match[j]:
+            assigned[match[j] - 1] = j - 1
+
+    return assigned
+
+
+def _fill_flex(leftover: dict[str, list], flex: list[str]) -> list[tuple[str, str, int]]:
+    """
+    Best (slot, position, index into leftover[position]) flex fill.
+
+    Nested flex slots are filled greedily; otherwise (e.g. REC_FLEX with
+    WRRB_FLEX) the fill is solved as an assignment problem.
+    """
+    if not flex:
+        return []
+
+    if _nested(flex):
+        taken = {pos: 0 for pos in leftover}
+        filled = []
+
+        for slot in flex:
+            best = max(
+                (pos for pos in FLEX_ELIGIBILITY[slot] if taken.get(pos, 0) < len(leftover.get(pos, ()))),
+                key=lambda pos: leftover[pos][taken[pos]],
+                default=None
+            )
+            if best is not None:
+                filled.append((slot, best, taken[best]))
+                taken[best] += 1
+
+        return filled
+
+    # Only the len(flex) best leftovers of a position can start
+    candidates = [
+        (pos, i)
+        for pos in _flex_positions(flex)
+        for i in range(min(len(flex), len(leftover.get(pos, ()))))
+    ]
+
+    # Ineligible pairs cost more than leaving a slot empty (one dummy column per slot)
+    blocked = 1 + sum(leftover[pos][i] for pos, i in candidates)
+    cost = [
+        [-leftover[pos][i] if pos in FLEX_ELIGIBILITY[slot] else blocked for pos, i in candidates]
+        + [0] * len(flex)
+        for slot in flex
+    ]
+
+    return [
+        (slot, *candidates[col])
+        for row, (slot, col) in enumerate(zip(flex, _min_cost_assignment(cost)))
+        if col < len(candidates) and cost[row][col] != blocked
+    ]
+
+
+def solve_lineup(values_by_pos: dict[str, list], roster_slots: dict) -> list[tuple[str, str, int]]:
+    """
+    Optimal starting lineup as (slot, position, index into values_by_pos[position]).
+
+    Args:
+        values_by_pos: position → player values, highest first
+        roster_slots: output of normalize_roster_slots
+
+    Dedicated slots always take the best players of their position
+    (any flex alternative can be swapped in without loss); the flex
+    slots are then filled from what is left.
+    """
+    dedicated, flex = starter_slots(roster_slots)
+
+    lineup = []
+    used = {pos: 0 for pos in (*STARTER_POSITIONS, *_flex_positions(flex))}
+
+    for pos in dedicated:
+        used[pos] = min(roster_slots[pos], len(values_by_pos.get(pos, ())))
+        lineup.extend((pos, pos, i) for i in range(used[pos]))
+
+    leftover = {pos: values_by_pos.get(pos, [])[n:] for pos, n in used.items()}
+
+    for slot, pos, i in _fill_flex(leftover, flex):
+        lineup.append((slot, pos, used[pos] + i))
+
+    return lineup
+
+
+def starter_value(values_by_pos: dict[str, list], roster_slots: dict) -> int:
+    """
+    Total value of the best starting lineup.
+
+    Args:
+        values_by_pos: position → player values, highest first
+        roster_slots: output of normalize_roster_slots
+    """
+    return sum(values_by_pos[pos][i] for _, pos, i in solve_lineup(values_by_pos, roster_slots))
+
+
+def optimal_lineup(players: list[dict], roster_slots: dict, value_key: str = "ktc_value") -> dict:
+    """
+    Assign rostered players to starting slots, maximizing `value_key`
+    (KTC value, projected points, ...).
+
+    Returns:
+        starters: [{"slot", "player_id", "name", "position", "value"}]
+        total: summed value of the starters
+    """
+    by_pos = defaultdict(list)
+    for p in players:
+        by_pos[p.get("position")].append(p)
+
+    for group in by_pos.values():
+        group.sort(key=lambda p: p.get(value_key) or 0, reverse=True)
+
+    values_by_pos = {
+        pos: [p.get(value_key) or 0 for p in group]
+        for pos, group in by_pos.items()
+    }
+
+    starters = [
+        {
+            "slot": slot,
+            "player_id": by_pos[pos][i].get("player_id"),
+            "name": by_pos[pos][i].get("name"),
+            "position": pos,
+            "value": values_by_pos[pos][i]
+        }
+        for slot, pos, i in solve_lineup(values_by_pos, roster_slots)
+    ]
+
+    return {"starters": starters, "total": sum(s["value"] for s in starters)}
+
+
+def league_lineups(teams: dict[str, list], roster_slots: dict, value_key: str = "ktc_value") -> dict:
+    """
+    Optimal lineups of every team of a league, ranked by starter strength.
+
+    Args:
+        teams: owner_id → players
+        roster_slots: the league's normalize_roster_slots output
+
+    Returns owner_id → optimal_lineup result plus "rank" (1 = strongest).
+    """
+    lineups = {
+        owner_id: optimal_lineup(players, roster_slots, value_key)
+        for owner_id, players in teams.items()
+    }
+
+    strongest = sorted(lineups, key=lambda owner_id: lineups[owner_id]["total"], reverse=True)
+    for rank, owner_id in enumerate(strongest, start=1):
+        lineups[owner_id]["rank"] = rank
+
+    return lineups
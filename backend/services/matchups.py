@@ -0,0 +1,336 @@
+"""
+matchups.py
+
+Weekly matchup ingestion and scoring analytics.
+
+Responsibilities:
+- Fetch a league's regular-season weeks concurrently
+- Store each week locally as columns keyed by (league, season, week)
+- After the first sync, fetch only weeks that are new or still open
+- Compute all-play records, points-for percentiles, luck index and
+  max possible points
+
+Weeks before the current NFL week (or of a finished season) are final
+and never fetched again. Max possible points are solved once per week
+at ingestion, from players_points and the league's roster slots.
+"""
+
+import asyncio
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from backend.cache import StaleWhileRevalidateCache
+from backend.services.lineup import normalize_roster_slots, optimal_lineup
+from backend.services.valuation import percentiles, rank_desc
+from backend.storage import data_path
+
+
+MATCHUPS_FILE = "matchups.sqlite3"
+
+# Sleeper's default when a league does not set playoff_week_start
+DEFAULT_PLAYOFF_WEEK_START = 15
+
+# Analytics per league; a sync runs at most this often
+MATCHUP_STATS_CACHE_TTL = 300  # seconds
+MATCHUP_STATS_CACHE_MAXSIZE = 512
+MATCHUP_STATS_CACHE = StaleWhileRevalidateCache(
+    "matchup_stats", MATCHUP_STATS_CACHE_TTL, maxsize=MATCHUP_STATS_CACHE_MAXSIZE, shared=False
+)
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS matchup_weeks (
+    league_id TEXT NOT NULL,
+    season INTEGER NOT NULL,
+    week INTEGER NOT NULL,
+    final INTEGER NOT NULL,
+    synced_at REAL NOT NULL,
+    roster_ids BLOB NOT NULL,
+    matchup_ids BLOB NOT NULL,
+    points BLOB NOT NULL,
+    max_points BLOB NOT NULL,
+    PRIMARY KEY (league_id, season, week)
+) WITHOUT ROWID;
+"""
+
+# Column dtypes of a stored week, one value per roster
+WEEK_COLUMNS = {
+    "roster_ids": np.int32,
+    "matchup_ids": np.int32,  # 0 = no opponent (bye, median week)
+    "points": np.float64,
+    "max_points": np.float64,
+}
+
+
+class MatchupStore:
+    """
+    SQLite-backed matchup weeks (WAL mode, one connection per thread).
+    """
+
+    def __init__(self, path: str | None = None):
+        self.path = path or data_path(MATCHUPS_FILE)
+        self._local = threading.local()
+
+        conn = self._connect()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            self._local.conn = conn
+
+        return conn
+
+
+    def final_weeks(self, league_id: str, season: int) -> set[int]:
+        return {
+            week for (week,) in self._connect().execute(
+                "SELECT week FROM matchup_weeks WHERE league_id = ? AND season = ? AND final = 1",
+                (league_id, season)
+            )
+        }
+
+
+    def save_weeks(self, league_id: str, season: int, weeks: dict[int, dict], final: set[int]):
+        """
+        Store weeks (week → columns, see WEEK_COLUMNS), replacing earlier copies.
+        """
+        now = time.time()
+
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO matchup_weeks"
+                " (league_id, season, week, final, synced_at, roster_ids, matchup_ids, points, max_points)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (league_id, season, week, int(week in final), now,
+                     *(np.asarray(columns[name], dtype=dtype).tobytes() for name, dtype in WEEK_COLUMNS.items()))
+                    for week, columns in weeks.items()
+                ]
+            )
+
+
+    def load(self, league_id: str, season: int) -> dict[int, dict]:
+        """
+        week → columns (NumPy arrays) of every stored week of a season.
+        """
+        weeks = {}
+
+        for week, *blobs in self._connect().execute(
+            "SELECT week, roster_ids, matchup_ids, points, max_points FROM matchup_weeks"
+            " WHERE league_id = ? AND season = ? ORDER BY week",
+            (league_id, season)
+        ):
+            weeks[week] = {
+                name: np.frombuffer(blob, dtype=dtype)
+                for (name, dtype), blob in zip(WEEK_COLUMNS.items(), blobs)
+            }
+
+        return weeks
+
+
+# Process-wide store, opened on first use
+_STORE = None
+_STORE_LOCK = threading.Lock()
+
+
+def get_matchup_store() -> MatchupStore:
+    global _STORE
+
+    with _STORE_LOCK:
+        if _STORE is None:
+            _STORE = MatchupStore()
+
+    return _STORE
+
+
+def scoring_weeks(league: dict, nfl_state: dict) -> tuple[int, int]:
+    """
+    Return (last week with matchups so far, last final week) of a
+    league's regular season.
+    """
+    season = int(league["season"])
+    state_season = int(nfl_state.get("season") or season)
+
+    playoff_start = (league.get("settings") or {}).get("playoff_week_start") or DEFAULT_PLAYOFF_WEEK_START
+    last_regular = playoff_start - 1
+
+    season_type = nfl_state.get("season_type")
+
+    # Past seasons, and the current one once the regular season is over
+    # (postseason, offseason), are final; an unknown state finalizes nothing
+    if season < state_season or (season == state_season and season_type not in (None, "pre", "regular")):
+        return last_regular, last_regular
+
+    if season > state_season or season_type != "regular":
+        return 0, 0
+
+    week = min(int(nfl_state.get("week") or 0), last_regular)
+
+    return week, week - 1
+
+
+def week_columns(matchups: list[dict], roster_slots: dict, players_db: dict) -> dict:
+    """
+    Columns of one week's matchups payload, max possible points included.
+    """
+    matchups = sorted(matchups, key=lambda m: m["roster_id"])
+
+    max_points = []
+    for m in matchups:
+        players = [
+            {"player_id": pid, "position": getattr(players_db.get(pid), "position", None), "points": pts}
+            for pid, pts in (m.get("players_points") or {}).items()
+        ]
+        max_points.append(optimal_lineup(players, roster_slots, value_key="points")["total"])
+
+    return {
+        "roster_ids": [m["roster_id"] for m in matchups],
+        "matchup_ids": [m.get("matchup_id") or 0 for m in matchups],
+        "points": [m.get("points") or 0 for m in matchups],
+        "max_points": max_points,
+    }
+
+
+async def sync_matchups(client, league_id: str) -> tuple[dict, dict[int, dict]]:
+    """
+    Bring the local weeks of a league's current season up to date.
+
+    Missing and open weeks are fetched concurrently (AsyncSleeperClient
+    caps requests in flight); final weeks are read from the store.
+
+    Returns the league and its stored weeks (see MatchupStore.load).
+    """
+    league, nfl_state = await asyncio.gather(client.get_league(league_id), client.get_nfl_state())
+    if not league:
+        raise ValueError(f"Invalid league_id or league not found: {league_id}")
+
+    store = get_matchup_store()
+    season = int(league["season"])
+    last_week, last_final = scoring_weeks(league, nfl_state)
+
+    done = await asyncio.to_thread(store.final_weeks, league_id, season)
+    todo = [week for week in range(1, last_week + 1) if week not in done]
+
+    if todo:
+        players_db, *payloads = await asyncio.gather(
+            client.get_players(),
+            *(client.get_matchups(league_id, week) for week in todo)
+        )
+
+        roster_slots = normalize_roster_slots(league.get("roster_positions") or [], league.get("settings") or {})
+
+        # Weeks Sleeper has nothing for yet come back empty
+        weeks = {
+            week: week_columns(matchups, roster_slots, players_db)
+            for week, matchups in zip(todo, payloads)
+            if matchups
+        }
+
+        await asyncio.to_thread(
+            store.save_weeks, league_id, season, weeks, {w for w in weeks if w <= last_final}
+        )
+
+    return league, await asyncio.to_thread(store.load, league_id, season)
+
+
+def matchup_stats(weeks: dict[int, dict]) -> dict:
+    """
+    Season analytics per roster_id from stored weeks.
+
+    - record: actual wins / losses / ties against the scheduled opponent
+    - all_play: record as if every team played every other team each week
+    - expected_wins: weekly all-play win share (ties count half), summed
+    - luck: actual wins minus expected wins
+    - points_for / points_against, max_points_for and efficiency (pf / max)
+    - pf_percentile: league percentile of points for (100 = most)
+    """
+    # Only weeks with points scored count
+    weeks = {w: cols for w, cols in weeks.items() if cols["points"].any()}
+
+    roster_ids = sorted({int(r) for cols in weeks.values() for r in cols["roster_ids"]})
+    if not roster_ids:
+        return {"weeks": [], "teams": {}}
+
+    col = {rid: i for i, rid in enumerate(roster_ids)}
+    n_weeks, n_teams = len(weeks), len(roster_ids)
+
+    # Weeks × teams matrices; teams missing from a week are masked out
+    points = np.zeros((n_weeks, n_teams))
+    max_points = np.zeros((n_weeks, n_teams))
+    matchup_ids = np.zeros((n_weeks, n_teams), dtype=np.int32)
+    present = np.zeros((n_weeks, n_teams), dtype=bool)
+
+    for w, cols in enumerate(weeks.values()):
+        idx = [col[int(r)] for r in cols["roster_ids"]]
+        points[w, idx] = cols["points"]
+        max_points[w, idx] = cols["max_points"]
+        matchup_ids[w, idx] = cols["matchup_ids"]
+        present[w, idx] = True
+
+    pair = present[:, :, None] & present[:, None, :] & ~np.eye(n_teams, dtype=bool)
+    above = points[:, :, None] > points[:, None, :]
+    below = points[:, :, None] < points[:, None, :]
+
+    # All-play: every other team that week
+    ap_wins = (above & pair).sum(axis=(0, 2))
+    ap_losses = (below & pair).sum(axis=(0, 2))
+    ap_ties = (pair & ~above & ~below).sum(axis=(0, 2))
+
+    weekly_share = ((above & pair).sum(axis=2) + 0.5 * (pair & ~above & ~below).sum(axis=2)) / np.maximum(pair.sum(axis=2), 1)
+    expected_wins = weekly_share.sum(axis=0)
+
+    # Scheduled opponent: the other team with the same matchup_id
+    opponent = pair & (matchup_ids[:, :, None] == matchup_ids[:, None, :]) & (matchup_ids[:, :, None] != 0)
+    wins = (above & opponent).sum(axis=(0, 2))
+    losses = (below & opponent).sum(axis=(0, 2))
+    ties = (opponent & ~above & ~below).sum(axis=(0, 2))
+    points_against = np.einsum("wij,wj->i", opponent, points)
+
+    points_for = points.sum(axis=0)
+    max_points_for = max_points.sum(axis=0)
+    pf_pct = percentiles(rank_desc(points_for))
+
+    teams = {
+        rid: {
+            "record": {"wins": int(wins[i]), "losses": int(losses[i]), "ties": int(ties[i])},
+            "all_play": {"wins": int(ap_wins[i]), "losses": int(ap_losses[i]), "ties": int(ap_ties[i])},
+            "expected_wins": round(float(expected_wins[i]), 2),
+            "luck": round(float(wins[i] + 0.5 * ties[i] - expected_wins[i]), 2),
+            "points_for": round(float(points_for[i]), 2),
+            "points_against": round(float(points_against[i]), 2),
+            "max_points_for": round(float(max_points_for[i]), 2),
+            "efficiency": round(float(points_for[i] / max_points_for[i]), 3) if max_points_for[i] else None,
+            "pf_percentile": round(float(pf_pct[i]), 1),
+        }
+        for rid, i in col.items()
+    }
+
+    return {"weeks": list(weeks), "teams": teams}
+
+
+async def get_matchup_stats(client, league_id: str) -> dict:
+    """
+    Sync a league's matchups and compute its analytics, cached per league.
+    """
+    async def load():
+        (league, weeks), rosters = await asyncio.gather(
+            sync_matchups(client, league_id),
+            client.get_rosters(league_id)
+        )
+
+        stats = matchup_stats(weeks)
+        owners = {r["roster_id"]: r.get("owner_id") for r in rosters or []}
+
+        for roster_id, team in stats["teams"].items():
+            team["owner_id"] = owners.get(roster_id)
+
+        return {"league_id": league_id, "season": int(league["season"]), **stats}
+
+    return await MATCHUP_STATS_CACHE.aget(league_id, load)
@@ -0,0 +1,234 @@
+"""
+name_matching.py
+
+Fuzzy fallback for joining player names across data sources.
+
+Exact normalized names resolve nearly every player. What is left
+(e.g. "Chig" vs "Chigoziem", stray suffixes) goes through a blocking
+index: candidates must share the position and either the last name or
+several name trigrams. Each lookup therefore scores a handful of names
+instead of the whole player list.
+
+Resolved matches are stored on disk and reused by later index builds
+until they expire (MATCH_TTL) or their source entry no longer needs a
+fuzzy match.
+
+This module contains NO API calls.
+"""
+
+import sqlite3
+import threading
+import time
+from collections import Counter, defaultdict
+
+from backend.storage import data_path
+
+
+MATCHES_FILE = "name_matches.sqlite3"
+
+# Lowest trigram similarity accepted as the same player
+MATCH_THRESHOLD = 0.6
+
+# Two candidates closer than this are ambiguous and left unmatched
+AMBIGUITY_MARGIN = 0.05
+
+# Stored matches are re-resolved after this many seconds, so a wrong
+# or outdated match does not stick forever
+MATCH_TTL = 3600 * 24 * 30
+
+# Trigram-blocked candidates scored per lookup, and trigrams they must share
+MAX_TRIGRAM_CANDIDATES = 10
+MIN_SHARED_TRIGRAMS = 3
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS name_matches (
+    source_name TEXT NOT NULL,
+    position TEXT NOT NULL,
+    player_id TEXT NOT NULL,
+    score REAL NOT NULL,
+    matched_at REAL NOT NULL,
+    PRIMARY KEY (source_name, position)
+) WITHOUT ROWID;
+"""
+
+
+def trigrams(name: str) -> frozenset:
+    """
+    Character trigrams of a normalized name, padded so word starts count.
+    """
+    padded = f"  {name} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def similarity(a: frozenset, b: frozenset) -> float:
+    """
+    Dice coefficient of two trigram sets (1 = identical).
+    """
+    if not a or not b:
+        return 0.0
+
+    return 2 * len(a & b) / (len(a) + len(b))
+
+
+class NameIndex:
+    """
+    Blocking index over normalized names, by position.
+
+    Entries are (key, normalized name, position, active); `active`
+    (e.g. on an NFL team) breaks ties between equally close names.
+    """
+
+    def __init__(self, entries):
+        self.entries = {}
+        self.by_last = defaultdict(list)
+        self.by_trigram = defaultdict(list)
+
+        for key, name, position, active in entries:
+            if not name:
+                continue
+
+            grams = trigrams(name)
+            self.entries[key] = (grams, active)
+            self.by_last[(position, name.split()[-1])].append(key)
+
+            for gram in grams:
+                self.by_trigram[(position, gram)].append(key)
+
+
+    def candidates(self, name: str, position: str) -> set:
+        """
+        Keys sharing the position and the last name or several trigrams.
+        """
+        found = set(self.by_last.get((position, name.split()[-1]), ()))
+
+        shared = Counter()
+        for gram in trigrams(name):
+            shared.update(self.by_trigram.get((position, gram), ()))
+
+        found.update(
+            key for key, count in shared.most_common(MAX_TRIGRAM_CANDIDATES)
+            if count >= MIN_SHARED_TRIGRAMS
+        )
+
+        return found
+
+
+    def best(self, name: str, position: str) -> tuple[str, float] | None:
+        """
+        Return (key, score) of the closest entry, or None when nothing
+        clears MATCH_THRESHOLD or the closest ones are too close to call.
+        """
+        if not name:
+            return None
+
+        grams = trigrams(name)
+
+        scored = sorted(
+            (
+                (similarity(grams, self.entries[key][0]), self.entries[key][1], key)
+                for key in self.candidates(name, position)
+            ),
+            reverse=True
+        )
+
+        if not scored or scored[0][0] < MATCH_THRESHOLD:
+            return None
+
+        close = [s for s in scored if scored[0][0] - s[0] < AMBIGUITY_MARGIN]
+
+        # Among near-equal names an only active one wins
+        if len(close) > 1:
+            close = [s for s in close if s[1]]
+            if len(close) != 1:
+                return None
+
+        score, _, key = close[0]
+
+        return key, score
+
+
+class MatchStore:
+    """
+    SQLite-backed resolved matches (WAL mode, one connection per thread).
+    """
+
+    def __init__(self, path: str | None = None):
+        self.path = path or data_path(MATCHES_FILE)
+        self._local = threading.local()
+
+        conn = self._connect()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            self._local.conn = conn
+
+        return conn
+
+
+    def load(self, max_age: float = MATCH_TTL) -> dict[tuple, str]:
+        """
+        (source name, position) → matched player_id, for matches made
+        in the last `max_age` seconds.
+        """
+        return {
+            (name, position): player_id
+            for name, position, player_id in self._connect().execute(
+                "SELECT source_name, position, player_id FROM name_matches WHERE matched_at > ?",
+                (time.time() - max_age,)
+            )
+        }
+
+
+    def retain(self, keys: set[tuple]):
+        """
+        Delete matches whose (source name, position) is not in `keys`,
+        e.g. entries that left the source or now match exactly.
+        """
+        conn = self._connect()
+
+        stale = [
+            key for key in conn.execute("SELECT source_name, position FROM name_matches")
+            if key not in keys
+        ]
+
+        if stale:
+            with conn:
+                conn.executemany(
+                    "DELETE FROM name_matches WHERE source_name = ? AND position = ?",
+                    stale
+                )
+
+
+    def save(self, matches: list[tuple[str, str, str, float]]):
+        """
+        Store (source name, position, player_id, score) matches.
+        """
+        now = time.time()
+
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO name_matches (source_name, position, player_id, score, matched_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                [(*match, now) for match in matches]
+            )
+
+
+# Process-wide store, opened on first use
+_STORE = None
+_STORE_LOCK = threading.Lock()
+
+
+def get_match_store() -> MatchStore:
+    global _STORE
+
+    with _STORE_LOCK:
+        if _STORE is None:
+            _STORE = MatchStore()
+
+    return _STORE
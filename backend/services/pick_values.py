@@ -0,0 +1,98 @@
+"""
+pick_values.py
+
+Draft pick valuation.
+
+KTC prices near drafts by tier ("2026 Early 1st") and later drafts
+by round only ("2028 1st"). A pick's tier follows the projected finish
+of the team that originally owned it: the weakest teams pick early.
+
+Responsibilities:
+- Project each team's draft slot from standings or roster value
+- Map draft slots to early / mid / late tiers
+- Value picks through the KTC pick index, one lookup per
+  (season, round, tier)
+
+This module contains NO API calls.
+"""
+
+from backend.services.ktc import ktc_pick_entry
+
+
+PICK_TIERS = ("early", "mid", "late")
+
+
+def projected_draft_slots(teams: dict) -> dict:
+    """
+    Project the draft slot of every team (1 = first pick).
+
+    Args:
+        teams: team key → {"wins", "losses", "ties", "fpts", "value"}
+
+    Once games have been played the current record decides (points
+    for breaks ties); before that the roster's KTC value stands in
+    for team strength.
+    """
+    season_started = any(
+        (t.get("wins") or 0) + (t.get("losses") or 0) + (t.get("ties") or 0)
+        for t in teams.values()
+    )
+
+    def strength(key):
+        t = teams[key]
+
+        if season_started:
+            games = (t.get("wins") or 0) + (t.get("losses") or 0) + (t.get("ties") or 0)
+            win_pct = ((t.get("wins") or 0) + 0.5 * (t.get("ties") or 0)) / max(games, 1)
+            return (win_pct, t.get("fpts") or 0)
+
+        return (t.get("value") or 0, 0)
+
+    # Weakest team first
+    order = sorted(teams, key=strength)
+
+    return {key: slot for slot, key in enumerate(order, start=1)}
+
+
+def pick_tier(slot: int | None, n_teams: int) -> str:
+    """
+    Split a draft round into thirds: early, mid and late.
+    """
+    if not slot or n_teams < 3:
+        return "mid"
+
+    return PICK_TIERS[min(2, (slot - 1) * 3 // n_teams)]
+
+
+def value_picks(
+    picks: list[dict],
+    slots: dict,
+    n_teams: int,
+    pick_index: dict[str, dict]
+) -> list[dict]:
+    """
+    Attach tier and KTC value to picks.
+
+    Args:
+        picks: picks with season, round and original_owner_id
+        slots: original_owner_id → projected draft slot
+        n_teams: teams in the league
+        pick_index: KTC pick name → KTC entry (see build_ktc_pick_index)
+
+    Returns new pick dicts with "tier" and "ktc_value".
+    """
+    # Many picks share a (season, round, tier); look each up once
+    values = {}
+    valued = []
+
+    for pick in picks:
+        tier = pick_tier(slots.get(pick["original_owner_id"]), n_teams)
+        key = (pick["season"], pick["round"], tier)
+
+        if key not in values:
+            ktc_entry = ktc_pick_entry(pick_index, *key)
+            values[key] = ktc_entry["value"] if ktc_entry else 0
+
+        valued.append({**pick, "tier": tier, "ktc_value": values[key]})
+
+    return valued
@@ -4,6 +4,9 @@ player_aliases.py
 Central registry for cross-platform player name mismatches.
 
 All names MUST be normalized using normalize_name().
+
+Only needed for names too different to match fuzzily (see
+name_matching), e.g. nicknames.
 """
 
 PLAYER_NAME_ALIASES = {
@@ -11,6 +14,5 @@ PLAYER_NAME_ALIASES = {
     "chig okonkwo": "chigoziem okonkwo",
 
     # Future examples:
-    # "gabe davis": "gabriel davis",
-    # "dj moore": "d j moore",
+    # "hollywood brown": "marquise brown",
 }
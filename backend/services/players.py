@@ -1,5 +1,28 @@
+import logging
 import re
+import sqlite3
+
+from backend.services.name_matching import (
+    MATCH_THRESHOLD,
+    NameIndex,
+    get_match_store,
+    similarity,
+    trigrams,
+)
 from backend.services.player_aliases import PLAYER_NAME_ALIASES
+from backend.services.valuation import group_by_position
+
+
+logger = logging.getLogger(__name__)
+
+
+# Positions ranked by KeepTradeCut; other Sleeper players never match
+KTC_POSITIONS = {"QB", "RB", "WR", "TE"}
+
+# Sleeper player_id → KTC entry join index.
+# Rebuilt only when the players or KTC cache object changes.
+KTC_INDEX = {}
+KTC_INDEX_SOURCES = (None, None)
 
 
 def build_roster_positions(client, roster, ktc_data):
@@ -17,16 +40,15 @@ def build_roster_positions(client, roster, ktc_data):
         positions (dict): Players grouped by position
         totals (dict): Total KTC value per position
     """
-    # Fetch the global Sleeper player dictionary (id → player data)
+    # Fetch the global Sleeper player index (id → Player)
     players = client.get_players()
 
-    # Build a lookup table for KTC players using normalized names
-    ktc_by_name = {
-        normalize_name(p["name"]): p for p in ktc_data
-    }
+    # Sleeper player_id → KTC entry (built once per data refresh)
+    ktc_index = get_ktc_index(players, ktc_data)
 
     # Position buckets used by the UI
-    positions = {"QB": [], "RB": [], "WR": [], "TE": []}
+    groups = ("QB", "RB", "WR", "TE")
+    player_infos = []
 
     # Iterate through player IDs owned by the roster
     for pid in roster.get("players", []):
@@ -34,32 +56,143 @@ def build_roster_positions(client, roster, ktc_data):
         if not p:
             continue
 
-        # Normalize Sleeper player name for KTC matching
-        norm_name = normalize_name(p.get("full_name"))
-        ktc_entry = ktc_by_name.get(norm_name)
+        # Only offensive skill positions are displayed
+        if p.position not in groups:
+            continue
+
+        ktc_entry = ktc_index.get(p.player_id)
 
         # Append player info enriched with KTC data
-        positions[p["position"]].append({
+        player_infos.append({
             "id": pid,
-            "name": p.get("full_name"),
-            "position": p.get("position"),
-            "team": p.get("team", "FA"),
-            "headshot": p.get("metadata", {}).get("headshot"),
+            "name": p.full_name,
+            "position": p.position,
+            "team": p.team or "FA",
+            "headshot": p.headshot,
             "ktc_value": ktc_entry["value"] if ktc_entry else 0,
             "ktc_pos_rank": ktc_entry["pos_rank"] if ktc_entry else None
         })
 
     # Sort players within each position by descending KTC value
-    for lst in positions.values():
-        lst.sort(key=lambda p: p["ktc_value"], reverse=True)
+    # and compute total KTC value per position
+    return group_by_position(player_infos, groups=groups)
+
+
+def get_ktc_index(players: dict, ktc_data: list[dict]) -> dict[str, dict]:
+    """
+    Return the Sleeper player_id → KTC entry index for the current caches.
+
+    The index is rebuilt only when either cache has been refreshed
+    (i.e. a different object is passed in), so request-time enrichment
+    is a single dict lookup per player.
+    """
+    global KTC_INDEX, KTC_INDEX_SOURCES
+
+    cached_players, cached_ktc = KTC_INDEX_SOURCES
+    if cached_players is players and cached_ktc is ktc_data:
+        return KTC_INDEX
+
+    index = build_ktc_index(players, ktc_data)
+
+    KTC_INDEX = index
+    KTC_INDEX_SOURCES = (players, ktc_data)
+
+    return index
+
+
+def build_ktc_index(players: dict, ktc_data: list[dict]) -> dict[str, dict]:
+    """
+    Join Sleeper players to KTC entries.
+
+    1. Exact normalized (and aliased) name, same position first
+    2. KTC entries still unmatched are matched fuzzily against the
+       unmatched Sleeper players (see name_matching)
+
+    Only players with a KTC-ranked position are considered.
+    """
+    ktc_by_name = {}
+    for item in ktc_data:
+        name = normalize_name(item["name"])
+        ktc_by_name.setdefault((name, item["position"]), item)
+        ktc_by_name.setdefault((name, None), item)
+
+    index = {}
+    unmatched = {}
+
+    for player_id, player in players.items():
+        if player.position not in KTC_POSITIONS:
+            continue
+
+        lookup_name = resolve_player_name(normalize_name(player.full_name))
+        ktc_entry = ktc_by_name.get((lookup_name, player.position)) or ktc_by_name.get((lookup_name, None))
+
+        if ktc_entry:
+            index[player_id] = ktc_entry
+        else:
+            unmatched[player_id] = player
 
-    # Compute total KTC value per position
-    totals = {
-        pos: sum(p["ktc_value"] for p in lst)
-        for pos, lst in positions.items()
-    }
+    matched = {id(entry) for entry in index.values()}
+    leftover = [
+        item for item in ktc_data
+        if item["position"] in KTC_POSITIONS and id(item) not in matched
+    ]
 
-    return positions, totals
+    if leftover and unmatched:
+        try:
+            index.update(match_unmatched_ktc(leftover, unmatched))
+        except sqlite3.Error:
+            logger.exception("Name match store unavailable, skipping fuzzy matches")
+
+    return index
+
+
+def match_unmatched_ktc(leftover: list[dict], unmatched: dict) -> dict[str, dict]:
+    """
+    Fuzzy-match KTC entries without an exact Sleeper name.
+
+    Unexpired matches from earlier builds are reused from the match store
+    while the player still has no exact match and the names still agree;
+    matches of entries that no longer need one are deleted. The blocking
+    index is only built when something is left to resolve.
+
+    Returns Sleeper player_id → KTC entry.
+    """
+    store = get_match_store()
+    store.retain({(item["name"], item["position"]) for item in leftover})
+    known = store.load()
+
+    resolved = {}
+    new_matches = []
+    name_index = None
+
+    for item in leftover:
+        player_id = known.get((item["name"], item["position"]))
+
+        if player_id in unmatched and player_id not in resolved and similarity(
+            trigrams(normalize_name(item["name"])),
+            trigrams(normalize_name(unmatched[player_id].full_name))
+        ) >= MATCH_THRESHOLD:
+            resolved[player_id] = item
+            continue
+
+        if name_index is None:
+            name_index = NameIndex(
+                (pid, normalize_name(p.full_name), p.position, p.team is not None)
+                for pid, p in unmatched.items()
+            )
+
+        match = name_index.best(normalize_name(item["name"]), item["position"])
+        if match is None or match[0] in resolved:
+            continue
+
+        player_id, score = match
+        resolved[player_id] = item
+        new_matches.append((item["name"], item["position"], player_id, score))
+
+    if new_matches:
+        store.save(new_matches)
+
+    return resolved
 
 
 def normalize_name(name: str) -> str:
@@ -68,11 +201,11 @@ def normalize_name(name: str) -> str:
 
     This function removes:
     - Capitalization differences
-    - Punctuation
-    - Short tokens (team abbreviations, noise)
+    - Punctuation (so "D.J." and "DJ" agree)
     - Common suffixes (Jr, Sr, III, etc.)
 
-    The output is designed for fuzzy name matching, not display.
+    Short tokens are kept: they are often real name parts ("DJ Moore",
+    "Amon-Ra St. Brown"). The output is a matching key, not for display.
     """
     if not name:
         return ""
@@ -83,9 +216,6 @@ def normalize_name(name: str) -> str:
     # Remove punctuation and special characters
     name = re.sub(r"[^a-z0-9\s]", "", name)
 
-    # Remove short tokens (often team abbreviations or noise)
-    name = re.sub(r"\b[a-z]{2,3}\b", "", name)
-
     # Remove generational suffixes
     suffixes = {"jr", "sr", "ii", "iii", "iv", "v"}
     parts = [p for p in name.split() if p not in suffixes]
@@ -0,0 +1,145 @@
+"""
+portfolio.py
+
+Multi-league portfolio for one user.
+
+Responsibilities:
+- Fetch every current dynasty league of a user concurrently
+- Value each league with the shared players / KTC indexes
+- Report the user's standing in each league
+- Aggregate exposure per player across leagues
+"""
+
+import asyncio
+import logging
+
+from backend.services.extract_data import build_dynasty_snapshot_async
+from backend.services.league_values import RANK_CATEGORIES, build_league_values
+from backend.services.leagues import (
+    current_leagues,
+    get_all_user_leagues_async,
+    latest_season,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+async def fetch_portfolio_snapshots(client, user_id: str) -> tuple[list[dict], list[dict]]:
+    """
+    Build a dynasty snapshot for every current league of a user.
+
+    All leagues are fetched at the same time (AsyncSleeperClient caps
+    concurrent requests), so the total time is about that of the
+    slowest league.
+
+    Returns:
+        snapshots (list): one snapshot per league that loaded
+        errors (list): league_id and message of leagues that failed
+    """
+    grouped, nfl_state = await asyncio.gather(
+        get_all_user_leagues_async(client, user_id),
+        client.get_nfl_state()
+    )
+
+    leagues = current_leagues(grouped, latest_season(nfl_state))
+
+    results = await asyncio.gather(
+        *(build_dynasty_snapshot_async(client, league["league_id"]) for league in leagues),
+        return_exceptions=True
+    )
+
+    snapshots, errors = [], []
+
+    # One bad league must not fail the whole portfolio
+    for league, result in zip(leagues, results):
+        if isinstance(result, Exception):
+            logger.warning("Portfolio league %s failed: %r", league["league_id"], result)
+            errors.append({"league_id": league["league_id"], "error": str(result)})
+        else:
+            snapshots.append(result)
+
+    return snapshots, errors
+
+
+def build_portfolio(
+    user_id: str,
+    snapshots: list[dict],
+    ktc_index: dict[str, dict],
+    pick_index: dict[str, dict]
+) -> dict:
+    """
+    Aggregate a user's teams across leagues.
+
+    Args:
+        user_id: Sleeper user_id of the portfolio owner
+        snapshots: output of build_dynasty_snapshot, one per league
+        ktc_index: Sleeper player_id → KTC entry (see get_ktc_index)
+        pick_index: KTC pick name → KTC entry (see build_ktc_pick_index)
+
+    Returns a dict with:
+        leagues: the user's totals, ranks and percentiles per league
+        totals: summed totals per category across leagues
+        exposure: players owned, most total value first, with the
+                  leagues they are rostered in and the share of leagues
+    """
+    leagues = []
+    totals = dict.fromkeys(RANK_CATEGORIES, 0)
+    exposure = {}
+
+    for snapshot in snapshots:
+        values = build_league_values(snapshot, ktc_index, pick_index)
+        team = values["teams"].get(str(user_id))
+
+        # The user may only be a commissioner in this league
+        if not team:
+            continue
+
+        league = values["league"]
+
+        leagues.append({
+            "league_id": league["league_id"],
+            "name": league["name"],
+            "season": league["season"],
+            "total_rosters": len(values["teams"]),
+            "totals": team["totals"],
+            "ranks": team["ranks"],
+            "percentiles": team["percentiles"]
+        })
+
+        for cat in RANK_CATEGORIES:
+            totals[cat] += team["totals"][cat]
+
+        for p in team["players"]:
+            entry = exposure.get(p["player_id"])
+
+            if entry is None:
+                entry = exposure[p["player_id"]] = {
+                    "player_id": p["player_id"],
+                    "name": p["name"],
+                    "position": p["position"],
+                    "team": p["team"],
+                    "ktc_value": p["ktc_value"],
+                    "ktc_pos_rank": p["ktc_pos_rank"],
+                    "leagues": []
+                }
+
+            entry["leagues"].append(league["league_id"])
+
+    for entry in exposure.values():
+        entry["count"] = len(entry["leagues"])
+        entry["share"] = round(entry["count"] / len(leagues), 3)
+        entry["total_value"] = entry["ktc_value"] * entry["count"]
+
+    leagues.sort(key=lambda l: l["totals"]["TOTAL"], reverse=True)
+
+    return {
+        "user_id": str(user_id),
+        "leagues": leagues,
+        "totals": totals,
+        "exposure": sorted(
+            exposure.values(),
+            key=lambda e: (e["total_value"], e["count"]),
+            reverse=True
+        )
+    }
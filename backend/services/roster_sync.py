@@ -0,0 +1,206 @@
+"""
+roster_sync.py
+
+Incremental roster synchronization.
+
+Sleeper only serves whole rosters arrays, so every refresh downloads
+all teams of a league. RosterSync diffs each new payload against the
+previous one by roster_id and keeps the per-team results built from
+it. Only rosters whose content changed are rebuilt, and player moves
+are recorded as add / drop events.
+
+This module contains NO API calls.
+"""
+
+import threading
+import time
+from collections import deque
+
+from backend.cache import TTLCache
+
+
+# Leagues tracked before LRU eviction, and how long an idle one is kept
+ROSTER_SYNC_MAXSIZE = 2048
+ROSTER_SYNC_TTL = 3600 * 24
+
+# Events kept per league
+ROSTER_EVENTS_MAXLEN = 500
+
+
+def roster_fingerprint(roster: dict) -> tuple:
+    """
+    Everything a team is built from; equal fingerprints mean equal teams.
+    """
+    settings = roster.get("settings") or {}
+
+    return (
+        roster.get("owner_id"),
+        frozenset(map(str, roster.get("players") or [])),
+        tuple(roster.get("starters") or []),
+        tuple(roster.get("reserve") or []),
+        tuple(sorted(settings.items())),
+    )
+
+
+class RosterDiff:
+    """
+    Result of one sync.
+
+    Attributes:
+        changed: roster_ids that are new or whose content changed
+        removed: roster_ids no longer in the league
+        events: add / drop / owner events, oldest first
+        initial: True on the first sync of a league (no events)
+    """
+
+    __slots__ = ("changed", "removed", "events", "initial")
+
+    def __init__(self, changed=(), removed=(), events=(), initial=False):
+        self.changed = set(changed)
+        self.removed = set(removed)
+        self.events = list(events)
+        self.initial = initial
+
+
+    def __bool__(self):
+        return bool(self.changed or self.removed)
+
+
+class _LeagueState:
+    __slots__ = ("source", "token", "fingerprints", "teams", "events", "lock")
+
+    def __init__(self):
+        self.source = None
+        self.token = None
+        self.fingerprints = {}
+        self.teams = {}
+        self.events = deque(maxlen=ROSTER_EVENTS_MAXLEN)
+        self.lock = threading.Lock()
+
+
+class RosterSync:
+    """
+    Per-league roster state, diffed on every sync.
+    """
+
+    def __init__(self, maxsize: int = ROSTER_SYNC_MAXSIZE, ttl: float = ROSTER_SYNC_TTL):
+        self._leagues = TTLCache("roster_sync", maxsize, ttl)
+        self._lock = threading.Lock()
+
+
+    def _state(self, league_id: str) -> _LeagueState:
+        with self._lock:
+            state = self._leagues.get(league_id)
+
+            if state is None:
+                state = _LeagueState()
+
+            # Re-set on every access so active leagues never expire
+            self._leagues.set(league_id, state)
+
+            return state
+
+
+    def sync(self, league_id: str, rosters: list[dict], build_team, token=None) -> tuple[dict, RosterDiff]:
+        """
+        Bring a league's teams in line with a rosters payload.
+
+        Args:
+            league_id: Sleeper league id
+            rosters: rosters payload from Sleeper
+            build_team: roster → team, called only for changed rosters
+            token: inputs of build_team besides the roster (e.g. the
+                   players index); when it changes every team is rebuilt
+
+        Returns:
+            teams (dict): roster_id → team, unchanged teams are the same objects
+            diff (RosterDiff)
+        """
+        state = self._state(league_id)
+
+        with state.lock:
+            # Same cached payload as last time: nothing can have changed
+            if rosters is state.source and token is state.token:
+                return state.teams, RosterDiff()
+
+            initial = state.source is None
+            rebuild_all = token is not state.token
+
+            fingerprints, teams, changed = {}, {}, set()
+
+            for r in rosters or []:
+                roster_id = r["roster_id"]
+                fingerprint = roster_fingerprint(r)
+                fingerprints[roster_id] = fingerprint
+
+                if rebuild_all or state.fingerprints.get(roster_id) != fingerprint:
+                    teams[roster_id] = build_team(r)
+                else:
+                    teams[roster_id] = state.teams[roster_id]
+
+                if state.fingerprints.get(roster_id) != fingerprint:
+                    changed.add(roster_id)
+
+            removed = state.fingerprints.keys() - fingerprints.keys()
+
+            events = [] if initial else _roster_events(
+                state.fingerprints, fingerprints, changed, time.time()
+            )
+
+            state.source = rosters
+            state.token = token
+            state.fingerprints = fingerprints
+            state.teams = teams
+            state.events.extend(events)
+
+            return teams, RosterDiff(changed, removed, events, initial)
+
+
+    def events(self, league_id: str, since: float = 0) -> list[dict]:
+        """
+        Recorded events of a league newer than `since`, oldest first.
+        """
+        state = self._leagues.get(league_id)
+        if state is None:
+            return []
+
+        with state.lock:
+            return [e for e in state.events if e["at"] > since]
+
+
+def _roster_events(previous: dict, current: dict, changed: set, at: float) -> list[dict]:
+    """
+    Player adds / drops and owner changes of the changed rosters.
+    """
+    events = []
+
+    for roster_id in sorted(changed):
+        old = previous.get(roster_id)
+        new = current[roster_id]
+
+        old_owner, old_players = (old[0], old[1]) if old else (None, frozenset())
+        owner, players = new[0], new[1]
+
+        if old is not None and owner != old_owner:
+            events.append({
+                "type": "owner", "at": at, "roster_id": roster_id,
+                "owner_id": owner, "previous_owner_id": old_owner
+            })
+
+        for player_id in sorted(players - old_players):
+            events.append({
+                "type": "add", "at": at, "roster_id": roster_id,
+                "owner_id": owner, "player_id": player_id
+            })
+
+        for player_id in sorted(old_players - players):
+            events.append({
+                "type": "drop", "at": at, "roster_id": roster_id,
+                "owner_id": owner, "player_id": player_id
+            })
+
+    return events
+
+
+# Process-wide roster state shared by every snapshot build
+ROSTER_SYNC = RosterSync()
@@ -0,0 +1,223 @@
+"""
+trade_finder.py
+
+Trade suggestions for one team against every other roster of a league.
+
+Candidate packages (1 to 3 assets, players and picks) are enumerated
+once per team into value arrays sorted by adjusted value. Packages of
+two teams are then matched with binary searches over those arrays:
+only pairs inside the fair value band are ever materialized, and the
+band is narrowed until the candidate count stays bounded. Roster fit
+is computed for the surviving candidates only.
+
+This module contains NO API calls.
+"""
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import combinations
+
+import numpy as np
+
+from backend.services.trades import (
+    FAIR_MARGIN,
+    REPLACEMENT_VALUE,
+    LeagueValueIndex,
+    evaluate_trade,
+    roster_fit,
+)
+
+
+# (assets given, assets received) shapes searched, 1-for-1 up to 3-for-2
+PACKAGE_SHAPES = ((1, 1), (1, 2), (2, 1), (2, 2), (1, 3), (3, 1), (2, 3), (3, 2))
+
+# Most valuable assets per team used to build packages
+MAX_PACKAGE_ASSETS = 20
+
+# Candidates kept per partner team before roster fit is computed
+MAX_CANDIDATES_PER_TEAM = 300
+
+# Suggestions returned by default, and at most
+DEFAULT_SUGGESTIONS = 10
+MAX_SUGGESTIONS = 100
+
+
+@lru_cache(maxsize=None)
+def _combinations(n: int, k: int) -> np.ndarray:
+    return np.array(list(combinations(range(n), k)), dtype=np.intp).reshape(-1, k)
+
+
+def team_packages(index: LeagueValueIndex, owner_id: str) -> tuple[list[str], dict]:
+    """
+    Tradeable packages of one team.
+
+    Returns:
+        tokens: the team's assets used in packages, most valuable first
+        packages: size → (members, adjusted values), sorted by value;
+                  members are rows of indexes into tokens
+    """
+    owned = sorted(
+        (
+            (value - REPLACEMENT_VALUE, token)
+            for token, (_, _, value, owner) in index.assets.items()
+            # Assets at or below replacement add nothing to a package
+            if owner == owner_id and value > REPLACEMENT_VALUE
+        ),
+        reverse=True
+    )[:MAX_PACKAGE_ASSETS]
+
+    tokens = [token for _, token in owned]
+    values = np.array([value for value, _ in owned], dtype=np.float64)
+
+    packages = {}
+    for k in range(1, 4):
+        if len(tokens) < k:
+            break
+
+        members = _combinations(len(tokens), k)
+        sums = values[members].sum(axis=1)
+        order = np.argsort(sums, kind="stable")
+
+        packages[k] = (members[order], sums[order])
+
+    return tokens, packages
+
+
+def match_packages(gives: dict, gets: dict, limit: int = MAX_CANDIDATES_PER_TEAM) -> np.ndarray:
+    """
+    Pairs of packages whose adjusted values are within the fair band.
+
+    Args:
+        gives: packages of the searching team (see team_packages)
+        gets: packages of the partner team
+        limit: most pairs returned, closest values first; each shape's
+               band is narrowed until it holds about this many
+
+    Returns an (n, 4) array of (shape index, give row, get row, difference).
+    """
+    found = []
+
+    for shape, (n_give, n_get) in enumerate(PACKAGE_SHAPES):
+        if n_give not in gives or n_get not in gets:
+            continue
+
+        give_sums = gives[n_give][1]
+        get_sums = gets[n_get][1]
+
+        # |give - get| <= margin * max(give, get), as in evaluate_trade
+        margin = FAIR_MARGIN
+        while True:
+            lo = np.searchsorted(give_sums, get_sums * (1 - margin), side="left")
+            hi = np.searchsorted(give_sums, get_sums / (1 - margin), side="right")
+            counts = hi - lo
+
+            if counts.sum() <= limit or margin < 1e-4:
+                break
+            margin /= 2
+
+        total = int(counts.sum())
+        if not total:
+            continue
+
+        get_rows = np.repeat(np.arange(len(get_sums)), counts)
+        starts = np.repeat(lo - (np.cumsum(counts) - counts), counts)
+        give_rows = starts + np.arange(total)
+
+        found.append(np.column_stack((
+            np.full(total, shape),
+            give_rows,
+            get_rows,
+            give_sums[give_rows] - get_sums[get_rows]
+        )))
+
+    if not found:
+        return np.empty((0, 4))
+
+    pairs = np.concatenate(found)
+
+    if len(pairs) > limit:
+        pairs = pairs[np.argpartition(np.abs(pairs[:, 3]), limit)[:limit]]
+
+    return pairs
+
+
+def _match_worker(args):
+    return match_packages(*args)
+
+
+def find_trades(
+    index: LeagueValueIndex,
+    owner_id: str,
+    limit: int = DEFAULT_SUGGESTIONS,
+    max_workers: int | None = None
+) -> list[dict]:
+    """
+    Top balanced trades for one team against every other team.
+
+    Args:
+        index: league value index (see get_league_value_index)
+        owner_id: team to find trades for
+        limit: suggestions returned
+        max_workers: match partner teams in a process pool of this size;
+                     only worth it for bulk jobs, a pool costs more to
+                     start than a single league takes to search
+
+    Candidates are balanced on adjusted value. Trades that lower
+    owner_id's starting lineup value are dropped; the rest are ranked by
+    owner_id's lineup gain, then the partner's, then by closeness.
+    Returns evaluate_trade results, side A being owner_id's.
+    """
+    if owner_id not in index.rosters:
+        raise ValueError(f"Unknown team: {owner_id}")
+
+    limit = max(1, min(limit, MAX_SUGGESTIONS))
+
+    tokens, gives = team_packages(index, owner_id)
+    partners = [o for o in index.rosters if o != owner_id]
+    partner_packages = [team_packages(index, o) for o in partners]
+
+    jobs = [(gives, packages) for _, packages in partner_packages]
+
+    if max_workers and max_workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(
+            max_workers=min(max_workers, len(jobs)),
+            mp_context=multiprocessing.get_context("spawn")
+        ) as pool:
+            matches = list(pool.map(_match_worker, jobs))
+    else:
+        matches = [match_packages(*job) for job in jobs]
+
+    candidates = []
+
+    for partner, (partner_tokens, packages), pairs in zip(partners, partner_packages, matches):
+        for shape, give_row, get_row, difference in pairs:
+            n_give, n_get = PACKAGE_SHAPES[int(shape)]
+
+            side_a = [tokens[i] for i in gives[n_give][0][int(give_row)]]
+            side_b = [partner_tokens[i] for i in packages[n_get][0][int(get_row)]]
+
+            fit = roster_fit(index, owner_id, side_a, partner, side_b)
+
+            # Never suggest trades that weaken the searching team's lineup
+            if fit[owner_id] < 0:
+                continue
+
+            candidates.append(((-fit[owner_id], -fit[partner], abs(difference)), side_a, side_b))
+
+    candidates.sort(key=lambda c: c[0])
+
+    suggestions, seen = [], set()
+
+    for _, side_a, side_b in candidates:
+        key = (tuple(sorted(side_a)), tuple(sorted(side_b)))
+        if key in seen:
+            continue
+
+        seen.add(key)
+        suggestions.append(evaluate_trade(index, side_a, side_b))
+
+        if len(suggestions) == limit:
+            break
+
+    return suggestions
@@ -0,0 +1,257 @@
+"""
+trades.py
+
+Trade evaluation.
+
+Responsibilities:
+- Build a per-league value index (players, picks, rosters) once
+- Evaluate trades against it: value totals, value adjustment and
+  roster-fit (starting lineup) deltas
+- Evaluate many candidate trades per request
+
+Assets are referenced by token:
+- a Sleeper player_id, e.g. "4046"
+- a draft pick, "pick:<season>:<round>:<original owner_id>",
+  e.g. "pick:2026:1:123456"
+"""
+
+from backend.cache import StaleWhileRevalidateCache
+from backend.services.extract_data import build_dynasty_snapshot
+from backend.services.ktc import get_ktc_pick_index, get_ktc_values, ordinal
+from backend.services.league_values import build_league_values
+from backend.services.lineup import STARTER_POSITIONS, starter_value
+from backend.services.players import get_ktc_index
+
+
+# Value index per league; rebuilt at most as often as rosters refresh
+TRADE_INDEX_CACHE_TTL = 60  # seconds, same as rosters
+TRADE_INDEX_CACHE_MAXSIZE = 512  # leagues kept before LRU eviction
+TRADE_INDEX_CACHE = StaleWhileRevalidateCache(
+    "trade_index", TRADE_INDEX_CACHE_TTL, maxsize=TRADE_INDEX_CACHE_MAXSIZE, shared=False
+)
+
+# Value of a freely available player. Every asset costs a roster spot,
+# so only value above this level counts in the adjusted totals; this is
+# what makes two mid players worth less than one star of the same sum.
+REPLACEMENT_VALUE = 1000
+
+# Trades whose adjusted totals differ by at most this share of the
+# larger side are reported as fair
+FAIR_MARGIN = 0.05
+
+# Most trades evaluated in one batch request
+MAX_BATCH_TRADES = 1000
+
+
+class LeagueValueIndex:
+    """
+    Everything a trade evaluation reads, keyed for direct lookups.
+
+    Attributes:
+        league_id: Sleeper league id
+        roster_slots: league starter slots (see normalize_roster_slots)
+        assets: token → (name, position, value, current owner_id)
+        rosters: owner_id → {position: values, highest first}
+        starters: owner_id → current starting lineup value
+    """
+
+    __slots__ = ("league_id", "roster_slots", "assets", "rosters", "starters")
+
+    def __init__(self, league_values: dict):
+        league = league_values["league"]
+
+        self.league_id = league["league_id"]
+        self.roster_slots = league["roster_slots"]
+        self.assets = {}
+        self.rosters = {}
+        self.starters = {}
+
+        for owner_id, team in league_values["teams"].items():
+            by_pos = {pos: [] for pos in STARTER_POSITIONS}
+
+            for p in team["players"]:
+                self.assets[p["player_id"]] = (p["name"], p["position"], p["ktc_value"], owner_id)
+
+                if p["position"] in by_pos:
+                    by_pos[p["position"]].append(p["ktc_value"])
+
+            for pick in team["picks"]:
+                self.assets[pick_token(pick)] = (
+                    pick_name(pick), "PICK", pick["ktc_value"], owner_id
+                )
+
+            for values in by_pos.values():
+                values.sort(reverse=True)
+
+            self.rosters[owner_id] = by_pos
+            self.starters[owner_id] = starter_value(by_pos, self.roster_slots)
+
+
+    def roster_after(self, owner_id: str, gives: list[str], gets: list[str]) -> dict[str, list]:
+        """
+        Position → values (highest first) of a roster after a trade.
+        """
+        by_pos = {pos: list(values) for pos, values in self.rosters[owner_id].items()}
+
+        for token in gives:
+            _, pos, value, _ = self.assets[token]
+            if pos in by_pos:
+                by_pos[pos].remove(value)
+
+        for token in gets:
+            _, pos, value, _ = self.assets[token]
+            if pos in by_pos:
+                by_pos[pos].append(value)
+                by_pos[pos].sort(reverse=True)
+
+        return by_pos
+
+
+def pick_token(pick: dict) -> str:
+    return f"pick:{pick['season']}:{pick['round']}:{pick['original_owner_id']}"
+
+
+def pick_name(pick: dict) -> str:
+    tier = pick.get("tier")
+    prefix = f"{pick['season']} {tier.title()}" if tier else str(pick["season"])
+
+    return f"{prefix} {ordinal(pick['round'])}"
+
+
+def build_league_value_index(client, league_id: str) -> LeagueValueIndex:
+    """
+    Value a league with the shared caches and index it for trades.
+    """
+    snapshot = build_dynasty_snapshot(client, league_id)
+    ktc_data = get_ktc_values()
+
+    values = build_league_values(
+        snapshot,
+        ktc_index=get_ktc_index(client.get_players(), ktc_data),
+        pick_index=get_ktc_pick_index(ktc_data)
+    )
+
+    return LeagueValueIndex(values)
+
+
+def get_league_value_index(client, league_id: str) -> LeagueValueIndex:
+    """
+    Cached value index of a league; a stale one is served while it is rebuilt.
+    """
+    return TRADE_INDEX_CACHE.get(league_id, lambda: build_league_value_index(client, league_id))
+
+
+def evaluate_trade(index: LeagueValueIndex, side_a: list[str], side_b: list[str]) -> dict:
+    """
+    Evaluate one trade: side A's assets for side B's assets.
+
+    Raises ValueError for unknown or repeated assets, or when a side's
+    assets are not all owned by one team.
+
+    Returns totals per side, the raw and adjusted value difference
+    (side A minus side B: positive means side B's owner gets more),
+    the value adjustment and each team's change in starting lineup value.
+    """
+    # Player ids may arrive as JSON numbers
+    side_a = [str(t) for t in side_a]
+    side_b = [str(t) for t in side_b]
+
+    if len(set(side_a)) != len(side_a) or len(set(side_b)) != len(side_b):
+        raise ValueError("An asset is listed twice on one side")
+
+    both = set(side_a) & set(side_b)
+    if both:
+        raise ValueError(f"Assets on both sides: {', '.join(sorted(both))}")
+
+    sides = []
+
+    for tokens in (side_a, side_b):
+        if not tokens:
+            raise ValueError("Each side needs at least one asset")
+
+        unknown = [t for t in tokens if t not in index.assets]
+        if unknown:
+            raise ValueError(f"Unknown assets: {', '.join(unknown)}")
+
+        owners = {index.assets[t][3] for t in tokens}
+        if len(owners) != 1:
+            raise ValueError("All assets of a side must belong to one team")
+
+        values = [index.assets[t][2] for t in tokens]
+
+        sides.append({
+            "owner_id": owners.pop(),
+            "assets": [
+                {"id": t, "name": index.assets[t][0], "position": index.assets[t][1], "value": index.assets[t][2]}
+                for t in tokens
+            ],
+            "total": sum(values),
+            "adjusted_total": sum(max(v - REPLACEMENT_VALUE, 0) for v in values)
+        })
+
+    a, b = sides
+
+    if a["owner_id"] == b["owner_id"]:
+        raise ValueError("Both sides belong to the same team")
+
+    difference = a["total"] - b["total"]
+    adjusted_difference = a["adjusted_total"] - b["adjusted_total"]
+
+    margin = FAIR_MARGIN * max(a["adjusted_total"], b["adjusted_total"], 1)
+
+    return {
+        "sides": sides,
+        "difference": difference,
+        "value_adjustment": adjusted_difference - difference,
+        "adjusted_difference": adjusted_difference,
+        "fair": abs(adjusted_difference) <= margin,
+        "roster_fit": roster_fit(index, a["owner_id"], side_a, b["owner_id"], side_b)
+    }
+
+
+def roster_fit(index: LeagueValueIndex, owner_a: str, side_a: list[str], owner_b: str, side_b: list[str]) -> dict:
+    """
+    owner_id → change in starting lineup value when A gives side A for side B.
+    """
+    fit = {}
+
+    # Each owner gives their side and receives the other one
+    for owner_id, gives, gets in ((owner_a, side_a, side_b), (owner_b, side_b, side_a)):
+        after = starter_value(index.roster_after(owner_id, gives, gets), index.roster_slots)
+        fit[owner_id] = after - index.starters[owner_id]
+
+    return fit
+
+
+def evaluate_trades(index: LeagueValueIndex, trades: list[dict]) -> list[dict]:
+    """
+    Evaluate many trades ({"a": [...], "b": [...]}) against one index.
+
+    Raises ValueError when `trades` is not a list or holds more than
+    MAX_BATCH_TRADES trades. Invalid trades get an "error" entry instead
+    of failing the batch, so results always line up with `trades`.
+    """
+    if not isinstance(trades, list):
+        raise ValueError("trades must be a list")
+
+    if len(trades) > MAX_BATCH_TRADES:
+        raise ValueError(f"At most {MAX_BATCH_TRADES} trades per batch, got {len(trades)}")
+
+    results = []
+
+    for trade in trades:
+        if not isinstance(trade, dict):
+            results.append({"error": "A trade must be an object with \"a\" and \"b\" lists"})
+            continue
+
+        side_a, side_b = trade.get("a") or [], trade.get("b") or []
+        if not isinstance(side_a, list) or not isinstance(side_b, list):
+            results.append({"error": "Trade sides \"a\" and \"b\" must be lists"})
+            continue
+
+        try:
+            results.append(evaluate_trade(index, side_a, side_b))
+        except ValueError as e:
+            results.append({"error": str(e)})
+
+    return results
@@ -0,0 +1,179 @@
+"""
+valuation.py
+
+Array-backed valuation engine.
+
+Every rostered asset (player or pick) is one row in three parallel
+NumPy arrays: team index, position group code and KTC value. Team
+totals, positional ranks, percentiles and standings then come from
+grouped reductions (bincount / lexsort) instead of per-roster Python
+loops, so whole-league and multi-league analytics scale with array
+operations.
+
+This module contains NO API calls.
+"""
+
+import numpy as np
+
+
+# Value groups; anything not listed maps to OTHER
+POSITION_GROUPS = ("QB", "RB", "WR", "TE", "OTHER", "PICKS")
+POSITION_CODES = {pos: code for code, pos in enumerate(POSITION_GROUPS)}
+
+OTHER = POSITION_CODES["OTHER"]
+PICKS = POSITION_CODES["PICKS"]
+
+# Groups made of players (everything except picks)
+PLAYER_GROUPS = POSITION_GROUPS[:PICKS]
+
+
+def position_code(position: str | None) -> int:
+    return POSITION_CODES.get(position, OTHER)
+
+
+class RosterValues:
+    """
+    Values of every asset across one or more teams.
+
+    Attributes:
+        teams: team keys (e.g. owner_id, or (league_id, owner_id))
+        team_idx: int array, row → index into teams
+        pos_code: int array, row → index into POSITION_GROUPS
+        values: float array, row → KTC value
+    """
+
+    def __init__(self, teams: list, team_idx, pos_code, values):
+        self.teams = list(teams)
+        self.team_idx = np.asarray(team_idx, dtype=np.intp)
+        self.pos_code = np.asarray(pos_code, dtype=np.intp)
+        self.values = np.asarray(values, dtype=np.float64)
+
+
+    @classmethod
+    def from_rows(cls, teams: list, rows):
+        """
+        Build from an iterable of (team_index, position, value) tuples.
+        """
+        rows = list(rows)
+
+        return cls(
+            teams,
+            [r[0] for r in rows],
+            [position_code(r[1]) for r in rows],
+            [r[2] for r in rows]
+        )
+
+
+    def __len__(self):
+        return len(self.values)
+
+
+    def totals(self) -> np.ndarray:
+        """
+        Total value per team and group: shape (n_teams, n_groups).
+        """
+        n_groups = len(POSITION_GROUPS)
+        flat = np.bincount(
+            self.team_idx * n_groups + self.pos_code,
+            weights=self.values,
+            minlength=len(self.teams) * n_groups
+        )
+
+        return flat.reshape(len(self.teams), n_groups)
+
+
+    def order(self) -> np.ndarray:
+        """
+        Row order sorted by team, then group, then value (highest first).
+        """
+        return np.lexsort((-self.values, self.pos_code, self.team_idx))
+
+
+    def group_ranks(self, by_team: bool = True) -> np.ndarray:
+        """
+        Rank of each row inside its group (1 = most valuable).
+
+        by_team=True ranks within (team, group); False ranks within the
+        group across all teams (e.g. "WR7 among rostered players").
+        """
+        team = self.team_idx if by_team else np.zeros_like(self.team_idx)
+        order = np.lexsort((-self.values, self.pos_code, team))
+
+        # Position of each sorted row relative to the start of its group
+        group_key = team[order] * len(POSITION_GROUPS) + self.pos_code[order]
+        starts = np.r_[True, group_key[1:] != group_key[:-1]]
+        start_pos = np.maximum.accumulate(np.where(starts, np.arange(len(order)), 0))
+
+        ranks = np.empty(len(order), dtype=np.intp)
+        ranks[order] = np.arange(len(order)) - start_pos + 1
+
+        return ranks
+
+
+def summary_columns(totals: np.ndarray) -> dict[str, np.ndarray]:
+    """
+    Expand a (n_teams, n_groups) totals matrix into named columns,
+    adding PLAYERS (all non-pick groups) and TOTAL.
+    """
+    columns = {pos: totals[:, code] for pos, code in POSITION_CODES.items()}
+    columns["PLAYERS"] = totals[:, :PICKS].sum(axis=1)
+    columns["TOTAL"] = columns["PLAYERS"] + columns["PICKS"]
+
+    return columns
+
+
+def rank_desc(values: np.ndarray) -> np.ndarray:
+    """
+    Rank entries by descending value (1 = highest, ties keep input order).
+    """
+    order = np.argsort(-values, kind="stable")
+    ranks = np.empty(len(values), dtype=np.intp)
+    ranks[order] = np.arange(1, len(values) + 1)
+
+    return ranks
+
+
+def percentiles(ranks: np.ndarray) -> np.ndarray:
+    """
+    Convert ranks into percentiles (100 = best, 0 = worst).
+    """
+    n = len(ranks)
+    if n <= 1:
+        return np.full(n, 100.0)
+
+    return (n - ranks) / (n - 1) * 100
+
+
+def group_by_position(players: list[dict], groups=PLAYER_GROUPS) -> tuple[dict, dict]:
+    """
+    Bucket display-ready players by position group, sorted by KTC value,
+    and total each bucket.
+
+    Players whose position is not in `groups` go to OTHER when it is
+    one of the groups and are dropped otherwise.
+
+    Returns:
+        positions (dict): group → players, most valuable first
+        totals (dict): group → total KTC value
+    """
+    kept = [
+        p for p in players
+        if p["position"] in groups or "OTHER" in groups
+    ]
+
+    frame = RosterValues.from_rows(
+        [None],
+        ((0, p["position"], p["ktc_value"] or 0) for p in kept)
+    )
+
+    positions = {pos: [] for pos in groups}
+    for row in frame.order():
+        positions[POSITION_GROUPS[frame.pos_code[row]]].append(kept[row])
+
+    team_totals = frame.totals()[0]
+    totals = {
+        pos: int(team_totals[POSITION_CODES[pos]])
+        for pos in groups
+    }
+
+    return positions, totals
@@ -0,0 +1,25 @@
+"""
+storage.py
+
+Location of on-disk caches and local data stores.
+
+Set SLEEPER_DATA_DIR to move every store at once, e.g. to a volume
+shared by all uvicorn workers.
+"""
+
+import os
+
+
+# Defaults to <repo>/data
+DATA_DIR = os.environ.get(
+    "SLEEPER_DATA_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+)
+
+
+def data_path(filename: str) -> str:
+    """
+    Return the absolute path of a file inside DATA_DIR, creating the directory.
+    """
+    os.makedirs(DATA_DIR, exist_ok=True)
+    return os.path.join(DATA_DIR, filename)
@@ -0,0 +1,176 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from backend.cache import SingleFlight, StaleWhileRevalidateCache
+
+
+def wait_until(condition, timeout: float = 5):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_concurrent_cold_gets_load_once():
+    cache = StaleWhileRevalidateCache("test_cold", ttl=60, shared=False)
+    calls = []
+
+    def loader():
+        calls.append(1)
+        time.sleep(0.2)
+        return "value"
+
+    with ThreadPoolExecutor(8) as pool:
+        results = list(pool.map(lambda _: cache.get("key", loader), range(8)))
+
+    assert results == ["value"] * 8
+    assert len(calls) == 1
+
+
+def test_concurrent_cold_agets_load_once():
+    cache = StaleWhileRevalidateCache("test_cold_async", ttl=60, shared=False)
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(0.2)
+        return "value"
+
+    async def main():
+        return await asyncio.gather(*(cache.aget("key", loader) for _ in range(8)))
+
+    assert asyncio.run(main()) == ["value"] * 8
+    assert len(calls) == 1
+
+
+def test_stale_value_served_during_refresh():
+    cache = StaleWhileRevalidateCache("test_stale", ttl=60, shared=False)
+    cache.set("key", "old", stored_at=time.time() - 120)
+
+    release = threading.Event()
+    calls = []
+
+    def loader():
+        calls.append(1)
+        release.wait(5)
+        return "new"
+
+    # Expired: both callers get the stale value while one refresh runs
+    assert cache.get("key", loader) == "old"
+    assert cache.get("key", loader) == "old"
+
+    release.set()
+    wait_until(lambda: cache.is_fresh("key"))
+
+    assert cache.get("key", loader) == "new"
+    assert len(calls) == 1
+
+
+def test_stale_value_served_during_async_refresh():
+    cache = StaleWhileRevalidateCache("test_stale_async", ttl=60, shared=False)
+    cache.set("key", "old", stored_at=time.time() - 120)
+    calls = []
+
+    async def main():
+        release = asyncio.Event()
+
+        async def loader():
+            calls.append(1)
+            await release.wait()
+            return "new"
+
+        stale = [await cache.aget("key", loader), await cache.aget("key", loader)]
+
+        release.set()
+        while not cache.is_fresh("key"):
+            await asyncio.sleep(0.01)
+
+        return stale, await cache.aget("key", loader)
+
+    assert asyncio.run(main()) == (["old", "old"], "new")
+    assert len(calls) == 1
+
+
+def test_thread_leader_shared_with_async_caller():
+    flight = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def fn():
+        calls.append("thread")
+        started.set()
+        release.wait(5)
+        return "value"
+
+    async def afn():
+        calls.append("async")
+        return "other"
+
+    with ThreadPoolExecutor(1) as pool:
+        leader = pool.submit(flight.do, "key", fn)
+        started.wait(5)
+
+        threading.Timer(0.1, release.set).start()
+        follower = asyncio.run(flight.ado("key", afn))
+
+        assert leader.result(5) == follower == "value"
+
+    assert calls == ["thread"]
+    assert not flight.in_flight("key")
+
+
+def test_async_leader_shared_with_thread_caller():
+    flight = SingleFlight()
+    calls = []
+
+    async def main():
+        release = asyncio.Event()
+
+        async def afn():
+            calls.append("async")
+            await release.wait()
+            return "value"
+
+        def fn():
+            calls.append("thread")
+            return "other"
+
+        leader = asyncio.create_task(flight.ado("key", afn))
+        await asyncio.sleep(0)
+
+        follower = asyncio.create_task(asyncio.to_thread(flight.do, "key", fn))
+        await asyncio.sleep(0.1)
+        release.set()
+
+        return await leader, await follower
+
+    assert asyncio.run(main()) == ("value", "value")
+    assert calls == ["async"]
+
+
+def test_errors_are_shared_and_not_cached():
+    flight = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+
+    def fail():
+        started.set()
+        release.wait(5)
+        raise RuntimeError("boom")
+
+    with ThreadPoolExecutor(2) as pool:
+        leader = pool.submit(flight.do, "key", fail)
+        started.wait(5)
+        follower = pool.submit(flight.do, "key", lambda: "unused")
+
+        time.sleep(0.1)
+        release.set()
+
+        for future in (leader, follower):
+            with pytest.raises(RuntimeError, match="boom"):
+                future.result(5)
+
+    assert flight.do("key", lambda: "retry") == "retry"
@@ -0,0 +1,151 @@
+import threading
+import time
+
+import pytest
+
+from backend.cache import MemoryBackend, SQLiteBackend, StaleWhileRevalidateCache, backends, swr
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        return MemoryBackend()
+
+    return SQLiteBackend(str(tmp_path / "cache.sqlite3"))
+
+
+@pytest.fixture
+def workers(tmp_path, monkeypatch):
+    """
+    Two caches on separate SQLiteBackend connections to one file, as
+    two uvicorn workers would have.
+    """
+    monkeypatch.setattr(swr, "SHARED_POLL_INTERVAL", 0.01)
+    path = str(tmp_path / "cache.sqlite3")
+
+    return (
+        StaleWhileRevalidateCache("shared_test", ttl=60, backend=SQLiteBackend(path)),
+        StaleWhileRevalidateCache("shared_test", ttl=60, backend=SQLiteBackend(path)),
+    )
+
+
+def test_backend_get_set(backend):
+    now = time.time()
+    backend.set("key", {"a": [1, 2]}, now, expire=60)
+
+    assert backend.get("key") == ({"a": [1, 2]}, now)
+    assert backend.get("key", newer_than=now) is None
+    assert backend.get("missing") is None
+
+    backend.delete("key")
+    assert backend.get("key") is None
+
+
+def test_backend_entries_expire(backend):
+    backend.set("key", "value", time.time(), expire=0.05)
+    time.sleep(0.1)
+
+    assert backend.get("key") is None
+
+
+def test_backend_values_are_copies(backend):
+    value = {"a": 1}
+    backend.set("key", value, time.time(), expire=60)
+    value["a"] = 2
+
+    assert backend.get("key")[0] == {"a": 1}
+
+
+def test_backend_lock(backend):
+    assert backend.acquire("lock", ttl=60)
+    assert not backend.acquire("lock", ttl=60)
+
+    backend.release("lock")
+    assert backend.acquire("lock", ttl=60)
+
+
+def test_backend_lock_expires(backend):
+    assert backend.acquire("lock", ttl=0.05)
+    time.sleep(0.1)
+
+    assert backend.acquire("lock", ttl=60)
+
+
+def test_sqlite_lock_is_shared_across_connections(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    first, second = SQLiteBackend(path), SQLiteBackend(path)
+
+    assert first.acquire("lock", ttl=60)
+    assert not second.acquire("lock", ttl=60)
+
+    first.release("lock")
+    assert second.acquire("lock", ttl=60)
+
+
+def test_worker_adopts_shared_value(workers):
+    a, b = workers
+    calls = []
+
+    assert a.get("key", lambda: calls.append("a") or "value") == "value"
+    assert b.get("key", lambda: calls.append("b") or "other") == "value"
+
+    assert calls == ["a"]
+
+
+def test_worker_adopts_newer_shared_value_over_stale(workers):
+    a, b = workers
+    a.set("key", "old", stored_at=time.time() - 120)
+
+    b.set("key", "new")
+
+    assert a.get("key", lambda: pytest.fail("should adopt the shared value")) == "new"
+
+
+def test_only_one_worker_refreshes(workers):
+    a, b = workers
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def slow_load():
+        calls.append("a")
+        started.set()
+        release.wait(5)
+        return "value"
+
+    leader = threading.Thread(target=a.get, args=("key", slow_load))
+    leader.start()
+    started.wait(5)
+
+    # a holds the refresh lock; b waits for its result instead of loading
+    assert not b.backend.acquire(b._shared_key("key"), ttl=60)
+
+    threading.Timer(0.1, release.set).start()
+    assert b.get("key", lambda: calls.append("b") or "other") == "value"
+
+    leader.join(5)
+    assert calls == ["a"]
+
+    # Released once the load finished
+    assert b.backend.acquire(b._shared_key("key"), ttl=60)
+
+
+def test_shared_backend_from_settings(tmp_path, monkeypatch):
+    monkeypatch.setattr(backends, "_SHARED_BACKEND", None)
+    monkeypatch.setattr(backends, "CACHE_BACKEND", "sqlite")
+    monkeypatch.setattr(backends, "data_path", lambda name: str(tmp_path / name))
+
+    backend = backends.get_shared_backend()
+
+    assert isinstance(backend, SQLiteBackend)
+    assert backends.get_shared_backend() is backend
+
+
+def test_broken_shared_backend_falls_back(monkeypatch):
+    monkeypatch.setattr(backends, "_SHARED_BACKEND", None)
+    monkeypatch.setattr(backends, "CACHE_BACKEND", "bogus")
+
+    assert backends.get_shared_backend() is None
+
+    cache = StaleWhileRevalidateCache("fallback_test", ttl=60)
+    assert cache.backend is None
+    assert cache.get("key", lambda: "value") == "value"
@@ -0,0 +1,66 @@
+import random
+
+from backend.services.draft_picks import PickTable
+
+
+SEASONS = [2026, 2027]
+ROUNDS = 3
+ROSTER_IDS = list(range(1, 7))
+
+
+def trade(season, rd, original, owner, previous=None):
+    return {
+        "season": str(season),
+        "round": rd,
+        "roster_id": original,
+        "owner_id": owner,
+        "previous_owner_id": previous or original,
+    }
+
+
+def test_untraded_pick_reverts_to_original_owner():
+    table = PickTable(SEASONS, ROUNDS, ROSTER_IDS)
+    key = (2026, 1, 3)
+
+    assert table.apply_trades([trade(2026, 1, 3, 5)]) == {key}
+    assert table.owners[key] == 5
+    assert table.is_traded(key)
+
+    # Applying the same records again changes nothing
+    assert table.apply_trades([trade(2026, 1, 3, 5)]) == set()
+
+    # The record disappears (trade reversed): back to the original owner
+    assert table.apply_trades([]) == {key}
+    assert table.owners[key] == 3
+    assert not table.is_traded(key)
+
+
+def test_picks_outside_the_table_are_ignored():
+    table = PickTable(SEASONS, ROUNDS, ROSTER_IDS)
+
+    assert table.apply_trades([trade(2030, 1, 3, 5), trade(2026, 9, 3, 5)]) == set()
+
+
+def test_incremental_updates_match_a_fresh_rebuild():
+    rng = random.Random(0)
+    table = PickTable(SEASONS, ROUNDS, ROSTER_IDS)
+    traded = {}
+
+    for _ in range(50):
+        # Trade, re-trade and reverse random picks
+        for _ in range(rng.randint(1, 4)):
+            key = (rng.choice(SEASONS), rng.randint(1, ROUNDS), rng.choice(ROSTER_IDS))
+
+            if key in traded and rng.random() < 0.3:
+                del traded[key]
+            else:
+                traded[key] = trade(*key, rng.choice(ROSTER_IDS))
+
+        records = list(traded.values())
+        table.apply_trades(records)
+
+        fresh = PickTable(SEASONS, ROUNDS, ROSTER_IDS)
+        fresh.apply_trades(records)
+
+        assert table.owners == fresh.owners
+        assert all(table.is_traded(key) == fresh.is_traded(key) for key in table.owners)
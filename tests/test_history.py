@@ -0,0 +1,66 @@
+import copy
+import random
+
+from backend.services.history import KEYFRAME_INTERVAL, SnapshotStore
+
+
+def league_snapshots(n: int, seed: int = 0) -> list[dict]:
+    """
+    n snapshots of one league, each changing a few teams of the previous.
+    """
+    rng = random.Random(seed)
+
+    snapshot = {
+        "league": {"league_id": "L", "season": "2025", "name": "League"},
+        "teams": {
+            str(owner): {"players": [f"p{owner}_{i}" for i in range(3)], "total": 0}
+            for owner in range(6)
+        },
+    }
+    snapshots = []
+
+    for i in range(n):
+        snapshot = copy.deepcopy(snapshot)
+
+        for owner in rng.sample(sorted(snapshot["teams"]), 2):
+            snapshot["teams"][owner]["total"] = rng.randint(0, 10_000)
+
+        # Teams leave and join, and the league is renamed now and then
+        if i % 7 == 3:
+            del snapshot["teams"][rng.choice(sorted(snapshot["teams"]))]
+        if i % 7 == 5:
+            snapshot["teams"][f"new{i}"] = {"players": [], "total": i}
+        if i % 11 == 0:
+            snapshot["league"]["name"] = f"League {i}"
+
+        snapshots.append(snapshot)
+
+    return snapshots
+
+
+def test_delta_snapshots_reconstruct(tmp_path):
+    path = str(tmp_path / "history.sqlite3")
+    snapshots = league_snapshots(2 * KEYFRAME_INTERVAL + 5)
+
+    store = SnapshotStore(path)
+    for taken_at, snapshot in enumerate(snapshots, start=1):
+        assert store.append(snapshot, taken_at=taken_at) is not None
+
+    # A new store has no cached heads: everything comes from keyframes and deltas
+    fresh = SnapshotStore(path)
+    for taken_at, snapshot in enumerate(snapshots, start=1):
+        assert fresh.load("L", at=taken_at) == {**snapshot, "taken_at": taken_at}
+
+    keyframes = fresh._connect().execute("SELECT COUNT(*) FROM snapshots WHERE keyframe = 1").fetchone()[0]
+    assert keyframes == 3
+
+
+def test_append_respects_min_interval(tmp_path):
+    store = SnapshotStore(str(tmp_path / "history.sqlite3"))
+    first, second = league_snapshots(2)
+
+    assert store.append(first, taken_at=1000, min_interval=60) is not None
+    assert store.append(second, taken_at=1030, min_interval=60) is None
+    assert store.append(second, taken_at=1060, min_interval=60) is not None
+
+    assert [s["taken_at"] for s in store.list_snapshots("L")] == [1000, 1060]
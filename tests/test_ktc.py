@@ -0,0 +1,56 @@
+import pytest
+
+from backend.cache import StaleWhileRevalidateCache
+from backend.services import ktc
+
+
+def page(start: int, n: int = 10) -> list[dict]:
+    return [
+        {"name": f"Player {i}", "position": "WR", "value": 9000 - i}
+        for i in range(start, start + n)
+    ]
+
+
+@pytest.fixture
+def scrape(monkeypatch):
+    """
+    Serve parsed pages from a list instead of KTC; returns that list.
+    """
+    pages = [page(i * 10) for i in range(ktc.KTC_PAGES)]
+
+    monkeypatch.setattr(ktc, "KTC_CACHE", StaleWhileRevalidateCache("ktc_test", 60, shared=False))
+    monkeypatch.setattr(ktc, "KTC_PAGE_HASHES", None)
+    monkeypatch.setattr(ktc, "fetch_ktc_pages", lambda: list(range(len(pages))))
+    monkeypatch.setattr(ktc, "parse_ktc_page", lambda i: pages[i])
+    monkeypatch.setattr(ktc, "_record_ktc_history", lambda data: None)
+
+    return pages
+
+
+def test_unchanged_scrape_keeps_cached_list(scrape):
+    first = ktc.refresh_ktc_values()
+    ktc.KTC_CACHE.set(ktc.KTC_KEY, first)
+
+    assert ktc.refresh_ktc_values() is first
+
+    scrape[-1] = page(1000)
+    assert ktc.refresh_ktc_values() is not first
+
+
+def test_empty_scrape_raises(scrape):
+    scrape[:] = [[] for _ in scrape]
+
+    with pytest.raises(ValueError):
+        ktc.refresh_ktc_values()
+
+
+def test_truncated_scrape_keeps_cached_list(scrape):
+    ktc.KTC_CACHE.set(ktc.KTC_KEY, ktc.refresh_ktc_values())
+
+    # One page of rows: the rest came back empty
+    scrape[1:] = [[] for _ in scrape[1:]]
+
+    with pytest.raises(ValueError):
+        ktc.refresh_ktc_values()
+
+    assert len(ktc.KTC_CACHE.peek(ktc.KTC_KEY)[0]) == 10 * ktc.KTC_PAGES
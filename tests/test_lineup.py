@@ -0,0 +1,95 @@
+import random
+from functools import lru_cache
+
+import pytest
+
+from backend.services.lineup import FLEX_ELIGIBILITY, solve_lineup, starter_value
+
+
+POSITIONS = ("QB", "RB", "WR", "TE")
+
+SLOT_MIXES = [
+    # Nested flex slots (greedy fill)
+    {"QB": 1, "RB": 2, "WR": 2, "TE": 1, "FLEX": 1},
+    {"QB": 1, "RB": 2, "WR": 3, "TE": 1, "FLEX": 2, "SUPER_FLEX": 1},
+    {"QB": 1, "RB": 1, "WR": 2, "REC_FLEX": 1, "FLEX": 1, "SUPER_FLEX": 1},
+    # Non-nested flex slots (assignment solve)
+    {"QB": 1, "RB": 1, "WR": 1, "REC_FLEX": 1, "WRRB_FLEX": 1},
+    {"QB": 1, "RB": 1, "WR": 1, "TE": 1, "REC_FLEX": 2, "WRRB_FLEX": 2, "SUPER_FLEX": 1},
+    {"RB": 1, "REC_FLEX": 1, "WRRB_FLEX": 1, "FLEX": 1},
+]
+
+
+def brute_force(values_by_pos: dict, roster_slots: dict) -> int:
+    """
+    Best lineup value over every way of filling every slot.
+
+    Within a position the best players start first, so the search only
+    tracks how many players of each position are already starting.
+    """
+    slots = [
+        FLEX_ELIGIBILITY.get(slot, (slot,))
+        for slot, count in roster_slots.items()
+        for _ in range(count)
+    ]
+    positions = sorted(values_by_pos)
+
+    @lru_cache(maxsize=None)
+    def best(i: int, taken: tuple) -> int:
+        if i == len(slots):
+            return 0
+
+        # Leaving a slot empty is allowed when nobody fits
+        result = best(i + 1, taken)
+
+        for k, pos in enumerate(positions):
+            if pos in slots[i] and taken[k] < len(values_by_pos[pos]):
+                after = taken[:k] + (taken[k] + 1,) + taken[k + 1:]
+                result = max(result, values_by_pos[pos][taken[k]] + best(i + 1, after))
+
+        return result
+
+    return best(0, (0,) * len(positions))
+
+
+def random_roster(rng: random.Random) -> dict:
+    return {
+        pos: sorted((rng.randint(0, 100) for _ in range(rng.randint(0, 4))), reverse=True)
+        for pos in POSITIONS
+    }
+
+
+@pytest.mark.parametrize("roster_slots", SLOT_MIXES)
+def test_starter_value_matches_brute_force(roster_slots):
+    rng = random.Random(repr(sorted(roster_slots.items())))
+
+    for _ in range(200):
+        values_by_pos = random_roster(rng)
+
+        assert starter_value(values_by_pos, roster_slots) == brute_force(values_by_pos, roster_slots)
+
+
+@pytest.mark.parametrize("roster_slots", SLOT_MIXES)
+def test_solve_lineup_is_valid(roster_slots):
+    rng = random.Random(repr(sorted(roster_slots.items())))
+
+    for _ in range(200):
+        values_by_pos = random_roster(rng)
+        lineup = solve_lineup(values_by_pos, roster_slots)
+
+        # Each player starts at most once, in a slot that accepts them
+        assert len({(pos, i) for _, pos, i in lineup}) == len(lineup)
+        for slot, pos, i in lineup:
+            assert pos in FLEX_ELIGIBILITY.get(slot, (slot,))
+            assert i < len(values_by_pos[pos])
+
+        # No slot is filled more often than the league has it
+        for slot, count in roster_slots.items():
+            assert sum(1 for s, _, _ in lineup if s == slot) <= count
+
+
+def test_idp_flex_takes_defensive_players():
+    values_by_pos = {"QB": [30], "WR": [25, 15], "LB": [9, 7], "DB": [12]}
+    roster_slots = {"QB": 1, "WR": 1, "FLEX": 1, "LB": 1, "IDP_FLEX": 1}
+
+    assert starter_value(values_by_pos, roster_slots) == brute_force(values_by_pos, roster_slots) == 30 + 25 + 15 + 9 + 12
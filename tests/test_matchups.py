@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+
+from backend.services.matchups import matchup_stats, scoring_weeks
+
+
+LEAGUE = {"season": "2025", "settings": {"playoff_week_start": 15}}
+
+
+@pytest.mark.parametrize("nfl_state, expected", [
+    ({"season": "2025", "season_type": "pre", "week": 0}, (0, 0)),
+    ({"season": "2025", "season_type": "regular", "week": 6}, (6, 5)),
+    ({"season": "2025", "season_type": "regular", "week": 17}, (14, 13)),
+    ({"season": "2025", "season_type": "post", "week": 18}, (14, 14)),
+    ({"season": "2025", "season_type": "off", "week": 0}, (14, 14)),
+    ({"season": "2026", "season_type": "pre", "week": 0}, (14, 14)),
+    ({"season": "2024", "season_type": "off", "week": 0}, (0, 0)),
+    ({}, (0, 0)),
+])
+def test_scoring_weeks(nfl_state, expected):
+    assert scoring_weeks(LEAGUE, nfl_state) == expected
+
+
+def test_scoring_weeks_default_playoff_start():
+    league = {"season": "2025", "settings": {}}
+
+    assert scoring_weeks(league, {"season": "2025", "season_type": "post"}) == (14, 14)
+
+
+def week(matchup_ids, points, max_points):
+    return {
+        "roster_ids": np.array([1, 2, 3, 4], dtype=np.int32),
+        "matchup_ids": np.array(matchup_ids, dtype=np.int32),
+        "points": np.array(points, dtype=np.float64),
+        "max_points": np.array(max_points, dtype=np.float64),
+    }
+
+
+def test_matchup_stats():
+    weeks = {
+        # 1 beats 2, 3 beats 4
+        1: week([1, 1, 2, 2], [100, 90, 80, 70], [110, 100, 90, 80]),
+        # 3 beats 1, 2 beats 4
+        2: week([1, 2, 1, 2], [60, 95, 85, 75], [70, 100, 90, 80]),
+        # Not played yet: ignored
+        3: week([1, 1, 2, 2], [0, 0, 0, 0], [0, 0, 0, 0]),
+    }
+
+    stats = matchup_stats(weeks)
+    teams = stats["teams"]
+
+    assert stats["weeks"] == [1, 2]
+
+    assert teams[1]["record"] == {"wins": 1, "losses": 1, "ties": 0}
+    assert teams[3]["record"] == {"wins": 2, "losses": 0, "ties": 0}
+    assert teams[4]["record"] == {"wins": 0, "losses": 2, "ties": 0}
+
+    assert teams[1]["all_play"] == {"wins": 3, "losses": 3, "ties": 0}
+    assert teams[2]["all_play"] == {"wins": 5, "losses": 1, "ties": 0}
+    assert teams[4]["all_play"] == {"wins": 1, "losses": 5, "ties": 0}
+
+    assert teams[2]["expected_wins"] == 1.67
+    assert teams[3]["luck"] == 1.0
+    assert teams[1]["luck"] == 0.0
+
+    assert teams[1]["points_for"] == 160
+    assert teams[1]["points_against"] == 175
+    assert teams[1]["max_points_for"] == 180
+    assert teams[1]["efficiency"] == 0.889
+
+    assert teams[2]["pf_percentile"] > teams[1]["pf_percentile"] > teams[4]["pf_percentile"]
+
+
+def test_matchup_stats_ties_and_byes():
+    weeks = {
+        # 1 and 2 tie; 3 and 4 have no opponent (matchup_id 0)
+        1: week([1, 1, 0, 0], [50, 50, 70, 40], [60, 60, 80, 50]),
+    }
+
+    teams = matchup_stats(weeks)["teams"]
+
+    assert teams[1]["record"] == {"wins": 0, "losses": 0, "ties": 1}
+    assert teams[3]["record"] == {"wins": 0, "losses": 0, "ties": 0}
+    assert teams[3]["points_against"] == 0
+    assert teams[1]["all_play"] == {"wins": 1, "losses": 1, "ties": 1}
+    assert teams[1]["expected_wins"] == 0.5
+
+
+def test_matchup_stats_empty():
+    assert matchup_stats({}) == {"weeks": [], "teams": {}}
@@ -0,0 +1,90 @@
+from types import SimpleNamespace
+
+from backend.services import players
+from backend.services.name_matching import MatchStore, NameIndex, similarity, trigrams
+
+
+def test_similarity():
+    assert similarity(trigrams("josh allen"), trigrams("josh allen")) == 1
+    assert similarity(trigrams("josh allen"), frozenset()) == 0
+    assert similarity(trigrams("josh allen"), trigrams("josh allen jr")) > similarity(
+        trigrams("josh allen"), trigrams("kyle allen")
+    )
+
+
+def test_nickname_matches_full_name():
+    index = NameIndex([
+        ("1", "chigoziem okonkwo", "TE", True),
+        ("2", "chris olave", "WR", True),
+    ])
+
+    key, score = index.best("chig okonkwo", "TE")
+
+    assert key == "1"
+    assert score >= 0.6
+
+
+def test_position_must_match():
+    index = NameIndex([("1", "chigoziem okonkwo", "TE", True)])
+
+    assert index.best("chig okonkwo", "WR") is None
+
+
+def test_no_close_name():
+    index = NameIndex([("1", "josh allen", "QB", True)])
+
+    assert index.best("patrick mahomes", "QB") is None
+
+
+def test_ambiguous_names_are_left_unmatched():
+    index = NameIndex([
+        ("1", "mike williams", "WR", True),
+        ("2", "mike williams", "WR", True),
+    ])
+
+    assert index.best("mike williams", "WR") is None
+
+
+def test_active_player_breaks_ties():
+    index = NameIndex([
+        ("1", "mike williams", "WR", False),
+        ("2", "mike williams", "WR", True),
+    ])
+
+    assert index.best("mike williams", "WR") == ("2", 1.0)
+
+
+def test_match_store_retain_and_expiry(tmp_path):
+    store = MatchStore(str(tmp_path / "matches.sqlite3"))
+    store.save([
+        ("Chig Okonkwo", "TE", "1", 0.7),
+        ("Gone Player", "WR", "2", 0.8),
+    ])
+
+    assert store.load() == {("Chig Okonkwo", "TE"): "1", ("Gone Player", "WR"): "2"}
+
+    # Entries no longer waiting for a fuzzy match are dropped
+    store.retain({("Chig Okonkwo", "TE")})
+    assert store.load() == {("Chig Okonkwo", "TE"): "1"}
+
+    # Old matches are not reused
+    assert store.load(max_age=-1) == {}
+
+
+def test_stored_matches_are_rechecked(tmp_path, monkeypatch):
+    store = MatchStore(str(tmp_path / "matches.sqlite3"))
+    monkeypatch.setattr(players, "get_match_store", lambda: store)
+
+    unmatched = {
+        "1": SimpleNamespace(full_name="Chigoziem Okonkwo", position="TE", team="TEN"),
+        "2": SimpleNamespace(full_name="Travis Kelce", position="TE", team="KC"),
+    }
+    leftover = [{"name": "Chig Okonkwo", "position": "TE", "value": 3000}]
+
+    # A wrong stored match no longer clears the threshold and is re-resolved
+    store.save([("Chig Okonkwo", "TE", "2", 0.9), ("Left KTC", "WR", "3", 0.9)])
+
+    resolved = players.match_unmatched_ktc(leftover, unmatched)
+
+    assert list(resolved) == ["1"]
+    assert store.load() == {("Chig Okonkwo", "TE"): "1"}
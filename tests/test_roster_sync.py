@@ -0,0 +1,100 @@
+import time
+
+from backend.services.roster_sync import RosterSync
+
+
+def roster(roster_id, owner_id, players):
+    return {"roster_id": roster_id, "owner_id": owner_id, "players": players, "settings": {"wins": 0}}
+
+
+def build_team(r):
+    return {"owner_id": r["owner_id"], "players": sorted(r["players"])}
+
+
+def test_first_sync_builds_every_team_without_events():
+    sync = RosterSync()
+
+    teams, diff = sync.sync("L", [roster(1, "a", ["p1"]), roster(2, "b", ["p2"])], build_team)
+
+    assert diff.initial
+    assert diff.changed == {1, 2}
+    assert diff.events == []
+    assert teams[1] == {"owner_id": "a", "players": ["p1"]}
+
+
+def test_add_drop_and_owner_events():
+    sync = RosterSync()
+    first = [roster(1, "a", ["p1", "p2"]), roster(2, "b", ["p3"]), roster(3, "c", ["p4"])]
+    sync.sync("L", first, build_team)
+
+    # p2 moves from team 1 to team 2; team 3 changes hands
+    second = [roster(1, "a", ["p1"]), roster(2, "b", ["p3", "p2"]), roster(3, "d", ["p4"])]
+    _, diff = sync.sync("L", second, build_team)
+
+    assert not diff.initial
+    assert diff.changed == {1, 2, 3}
+    assert [(e["type"], e["roster_id"], e.get("player_id")) for e in diff.events] == [
+        ("drop", 1, "p2"),
+        ("add", 2, "p2"),
+        ("owner", 3, None),
+    ]
+    assert diff.events[2]["owner_id"] == "d"
+    assert diff.events[2]["previous_owner_id"] == "c"
+
+
+def test_unchanged_rosters_keep_their_teams():
+    sync = RosterSync()
+    teams, _ = sync.sync("L", [roster(1, "a", ["p1"]), roster(2, "b", ["p2"])], build_team)
+
+    # A new payload object with one changed roster
+    new_teams, diff = sync.sync("L", [roster(1, "a", ["p1"]), roster(2, "b", ["p2", "p3"])], build_team)
+
+    assert diff.changed == {2}
+    assert new_teams[1] is teams[1]
+    assert new_teams[2] is not teams[2]
+
+
+def test_removed_rosters():
+    sync = RosterSync()
+    sync.sync("L", [roster(1, "a", ["p1"]), roster(2, "b", ["p2"])], build_team)
+
+    teams, diff = sync.sync("L", [roster(1, "a", ["p1"])], build_team)
+
+    assert diff.removed == {2}
+    assert list(teams) == [1]
+
+
+def test_same_payload_is_a_no_op():
+    sync = RosterSync()
+    rosters = [roster(1, "a", ["p1"])]
+    sync.sync("L", rosters, build_team)
+
+    _, diff = sync.sync("L", rosters, build_team)
+
+    assert not diff
+    assert diff.events == []
+
+
+def test_new_token_rebuilds_every_team():
+    sync = RosterSync()
+    rosters = [roster(1, "a", ["p1"])]
+    teams, _ = sync.sync("L", rosters, build_team, token=object())
+
+    new_teams, diff = sync.sync("L", list(rosters), build_team, token=object())
+
+    assert not diff
+    assert new_teams[1] is not teams[1]
+
+
+def test_events_since():
+    sync = RosterSync()
+    sync.sync("L", [roster(1, "a", ["p1"])], build_team)
+
+    _, first = sync.sync("L", [roster(1, "a", ["p1", "p2"])], build_team)
+    time.sleep(0.01)
+    _, second = sync.sync("L", [roster(1, "a", ["p2"])], build_team)
+
+    assert sync.events("L") == first.events + second.events
+    assert sync.events("L", since=first.events[0]["at"]) == second.events
+    assert sync.events("L", since=time.time()) == []
+    assert sync.events("other") == []
@@ -0,0 +1,130 @@
+import random
+
+import numpy as np
+import pytest
+
+from backend.services.trade_finder import PACKAGE_SHAPES, find_trades, match_packages
+from backend.services.trades import FAIR_MARGIN, REPLACEMENT_VALUE, LeagueValueIndex
+
+
+def packages(rng: random.Random, sizes: tuple = (1, 2, 3), n: int = 15, grid: bool = True) -> dict:
+    """
+    Random package value arrays; match_packages only reads the sums.
+
+    Grid values (multiples of 100) produce exact ties and band edges.
+    """
+    def value():
+        return rng.randint(1, 50) * 100.0 if grid else rng.uniform(100, 5000)
+
+    return {
+        k: (np.zeros((n, k), dtype=np.intp), np.sort([value() for _ in range(n)]))
+        for k in sizes
+    }
+
+
+def brute_force(gives: dict, gets: dict, margin: float = FAIR_MARGIN) -> set:
+    """
+    Every (shape, give row, get row) inside the fair band.
+    """
+    found = set()
+
+    for shape, (n_give, n_get) in enumerate(PACKAGE_SHAPES):
+        if n_give not in gives or n_get not in gets:
+            continue
+
+        for i, give in enumerate(gives[n_give][1]):
+            for j, get in enumerate(gets[n_get][1]):
+                if get * (1 - margin) <= give <= get / (1 - margin):
+                    found.add((shape, i, j))
+
+    return found
+
+
+def as_set(pairs: np.ndarray) -> set:
+    return {(int(s), int(i), int(j)) for s, i, j, _ in pairs}
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_match_packages_matches_brute_force(seed):
+    rng = random.Random(seed)
+    gives, gets = packages(rng), packages(rng)
+
+    pairs = match_packages(gives, gets, limit=10_000)
+
+    assert as_set(pairs) == brute_force(gives, gets)
+    assert len(as_set(pairs)) == len(pairs)
+
+    for shape, i, j, difference in pairs:
+        n_give, n_get = PACKAGE_SHAPES[int(shape)]
+        assert difference == gives[n_give][1][int(i)] - gets[n_get][1][int(j)]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_match_packages_narrows_band(seed):
+    rng = random.Random(seed)
+
+    # A single shape: the band is halved until it holds at most `limit` pairs
+    gives = packages(rng, sizes=(1,), n=40, grid=False)
+    gets = packages(rng, sizes=(1,), n=40, grid=False)
+    limit = 20
+    assert len(brute_force(gives, gets)) > limit
+
+    margin = FAIR_MARGIN
+    while len(brute_force(gives, gets, margin)) > limit and margin >= 1e-4:
+        margin /= 2
+
+    assert as_set(match_packages(gives, gets, limit=limit)) == brute_force(gives, gets, margin)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_match_packages_limit_keeps_closest(seed):
+    rng = random.Random(seed)
+    gives, gets = packages(rng), packages(rng)
+    limit = 15
+
+    pairs = match_packages(gives, gets, limit=limit)
+
+    assert len(pairs) <= limit
+    assert as_set(pairs) <= brute_force(gives, gets)
+
+
+def test_find_trades_never_weakens_the_searching_team():
+    rng = random.Random(0)
+    positions = ["QB", "RB", "WR", "TE"]
+
+    teams = {
+        owner: {
+            "players": [
+                {
+                    "player_id": f"{owner}{i}",
+                    "name": f"{owner}{i}",
+                    "position": rng.choice(positions),
+                    "ktc_value": rng.randint(500, 9000),
+                }
+                for i in range(12)
+            ],
+            "picks": [],
+        }
+        for owner in "abcd"
+    }
+    index = LeagueValueIndex({
+        "league": {"league_id": "L", "roster_slots": {"QB": 1, "RB": 2, "WR": 2, "TE": 1, "FLEX": 2}},
+        "teams": teams,
+    })
+
+    suggestions = find_trades(index, "a", limit=10)
+
+    assert suggestions
+    assert len({(tuple(sorted(x["id"] for x in s["sides"][0]["assets"])),
+                 tuple(sorted(x["id"] for x in s["sides"][1]["assets"]))) for s in suggestions}) == len(suggestions)
+
+    gains = [s["roster_fit"]["a"] for s in suggestions]
+    assert all(g >= 0 for g in gains)
+    assert gains == sorted(gains, reverse=True)
+
+    for s in suggestions:
+        a, b = s["sides"]
+        assert a["owner_id"] == "a" and b["owner_id"] != "a"
+
+        adjusted = [sum(x["value"] - REPLACEMENT_VALUE for x in side["assets"]) for side in (a, b)]
+        assert abs(adjusted[0] - adjusted[1]) <= FAIR_MARGIN * max(adjusted) + 1e-9
@@ -0,0 +1,84 @@
+import pytest
+
+from backend.services.trades import MAX_BATCH_TRADES, LeagueValueIndex, evaluate_trade, evaluate_trades
+
+
+ROSTER_SLOTS = {"QB": 1, "RB": 2, "WR": 2, "TE": 1, "FLEX": 1, "SUPER_FLEX": 1}
+
+
+def player(player_id, position, value):
+    return {"player_id": player_id, "name": f"Player {player_id}", "position": position, "ktc_value": value}
+
+
+def league_values():
+    return {
+        "league": {"league_id": "L", "roster_slots": ROSTER_SLOTS},
+        "teams": {
+            "a": {
+                "players": [player("1", "QB", 9000), player("2", "RB", 6000), player("3", "WR", 4000)],
+                "picks": [{"season": 2026, "round": 1, "original_owner_id": "a", "ktc_value": 5000}],
+            },
+            "b": {
+                "players": [player("4", "QB", 3000), player("5", "RB", 5500), player("6", "WR", 7000)],
+                "picks": [],
+            },
+        },
+    }
+
+
+@pytest.fixture
+def index():
+    return LeagueValueIndex(league_values())
+
+
+def test_evaluate_trade(index):
+    result = evaluate_trade(index, ["2"], [6])
+
+    a, b = result["sides"]
+    assert (a["owner_id"], b["owner_id"]) == ("a", "b")
+    assert result["difference"] == 6000 - 7000
+    assert result["adjusted_difference"] == 5000 - 6000
+    assert set(result["roster_fit"]) == {"a", "b"}
+
+
+def test_evaluate_trade_pick_token(index):
+    result = evaluate_trade(index, ["pick:2026:1:a"], ["5"])
+
+    assert result["sides"][0]["assets"][0]["position"] == "PICK"
+
+
+@pytest.mark.parametrize("side_a, side_b, message", [
+    (["2", "2"], ["6"], "twice"),
+    (["2"], ["2"], "both sides"),
+    (["2"], [], "at least one"),
+    (["2"], ["99"], "Unknown"),
+    (["2", "6"], ["5"], "one team"),
+    (["2"], ["3"], "same team"),
+])
+def test_evaluate_trade_rejects(index, side_a, side_b, message):
+    with pytest.raises(ValueError, match=message):
+        evaluate_trade(index, side_a, side_b)
+
+
+def test_evaluate_trades_error_entries(index):
+    results = evaluate_trades(index, [
+        {"a": ["2"], "b": ["6"]},
+        {"a": ["2"], "b": ["2"]},
+        ["2", "6"],
+        {"a": "2", "b": ["6"]},
+        {"a": ["2"]},
+    ])
+
+    assert "error" not in results[0]
+    assert "both sides" in results[1]["error"]
+    assert "object" in results[2]["error"]
+    assert "lists" in results[3]["error"]
+    assert "at least one" in results[4]["error"]
+
+
+def test_evaluate_trades_rejects_batches(index):
+    with pytest.raises(ValueError, match="list"):
+        evaluate_trades(index, {"a": ["2"], "b": ["6"]})
+
+    with pytest.raises(ValueError, match="At most"):
+        evaluate_trades(index, [{"a": ["2"], "b": ["6"]}] * (MAX_BATCH_TRADES + 1))